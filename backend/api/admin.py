@@ -1,6 +1,42 @@
+from datetime import timedelta
+
 from django.contrib import admin
+from django.utils import timezone
 from core.models import Client, Case, Hearing, Notification, UserProfile, AdminLog
 
+
+class CreatedWithinFilter(admin.SimpleListFilter):
+    """
+    created_at filter for the tables partitioned by month. It defaults to
+    the last 30 days so the changelist only scans the newest partitions
+    instead of the whole history; "All time" scans every partition.
+    """
+    title = 'created'
+    parameter_name = 'created_within'
+    default_days = '30'
+    periods = (('7', 'Last 7 days'), ('30', 'Last 30 days'), ('365', 'Last year'), ('all', 'All time'))
+
+    def lookups(self, request, model_admin):
+        return self.periods
+
+    def value(self):
+        value = super().value()
+        return value if value in dict(self.periods) else self.default_days
+
+    def choices(self, changelist):
+        for lookup, title in self.lookup_choices:
+            yield {
+                'selected': self.value() == lookup,
+                'query_string': changelist.get_query_string({self.parameter_name: lookup}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        if self.value() == 'all':
+            return queryset
+        return queryset.filter(created_at__gte=timezone.now() - timedelta(days=int(self.value())))
+
+
 @admin.register(Client)
 class ClientAdmin(admin.ModelAdmin):
     list_display = ('client_id', 'first_name', 'last_name', 'email', 'phone_number', 'created_at')
@@ -23,7 +59,10 @@ class HearingAdmin(admin.ModelAdmin):
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('notification_id', 'user', 'title', 'type', 'is_read', 'created_at')
     search_fields = ('title', 'message')
-    list_filter = ('type', 'is_read', 'created_at')
+    list_filter = ('type', 'is_read', CreatedWithinFilter)
+    ordering = ('-created_at',)
+    # COUNT(*) over every partition on each page load
+    show_full_result_count = False
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -35,5 +74,7 @@ class UserProfileAdmin(admin.ModelAdmin):
 class AdminLogAdmin(admin.ModelAdmin):
     list_display = ('log_id', 'user_id', 'action', 'table_name', 'created_at')
     search_fields = ('user_id', 'action', 'table_name')
-    list_filter = ('action', 'table_name', 'created_at')
+    list_filter = ('action', 'table_name', CreatedWithinFilter)
     readonly_fields = ('created_at',)
+    ordering = ('-created_at',)
+    show_full_result_count = False
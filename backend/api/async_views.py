@@ -0,0 +1,255 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import DatabaseError
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.views import exception_handler
+
+from core.models import Client, Case, Hearing, Notification
+from .authentication import CachedJWTAuthentication
+from .caching import aconditional_response, alist_etag, make_etag
+from .filters import CaseFilter, ClientFilter, HearingFilter
+from .notifications import broker, get_profile_id, to_event_payload
+from .pagination import KeysetPagination
+from .renderers import ORJSONRenderer
+from .replicas import choose_replica, current_replica, fall_back_to_primary
+from .serializers import ClientSerializer, CaseSerializer, HearingSerializer
+from .serializers import FastCaseSerializer, FastClientSerializer, FastHearingSerializer, get_fieldset
+from . import views
+
+
+class AsyncAPIView(View):
+    """
+    Base for async-native views. GET authenticates with
+    CachedJWTAuthentication, reads through the async ORM and cache API and
+    renders with ORJSONRenderer, so responses match the sync views byte for
+    byte. Writes are handed to ``sync_view`` in a worker thread.
+
+    The list/detail subclasses replace the DRF views in api/views.py when
+    API_ASYNC_VIEWS is on. Their GETs read from the replica choose_replica()
+    picks for the sync view's ``replica_models``, and are retried on the
+    primary if it fails, like ReplicaReadMixin does.
+    """
+    sync_view = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # JWT requests carry no CSRF cookie; same as DRF's APIView.as_view()
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+        try:
+            await self.authenticate(request)
+            await self.choose_replica(request)
+            try:
+                return await super().dispatch(request, *args, **kwargs)
+            except DatabaseError as exc:
+                if not fall_back_to_primary(exc):
+                    raise
+                return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            return self.handle_exception(request, exc)
+
+    async def choose_replica(self, request):
+        models = getattr(self.sync_view, 'replica_models', ())
+        if settings.DATABASE_REPLICAS and models:
+            # Health checks may connect, so run in the sync thread
+            current_replica.set(await sync_to_async(choose_replica)(request.user, models))
+
+    async def authenticate(self, request):
+        result = await CachedJWTAuthentication().aauthenticate(request)
+        if result is None:
+            raise NotAuthenticated()
+        request.user, request.auth = result
+
+    def handle_exception(self, request, exc):
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            exc.auth_header = CachedJWTAuthentication().authenticate_header(request)
+        response = exception_handler(exc, {})
+        rendered = self.render(response.data, response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(ORJSONRenderer().render(data), status=status_code, content_type='application/json')
+
+    async def delegate(self, request, *args, **kwargs):
+        return await sync_to_async(self.sync_view.as_view())(request, *args, **kwargs)
+
+
+class AsyncListView(AsyncAPIView):
+    filter_class = None
+    list_serializer_class = None
+    # Tables whose version tokens make up the list ETag
+    etag_models = ()
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    async def get(self, request):
+        etag = await alist_etag(request, *self.etag_models)
+        return await aconditional_response(request, etag, lambda: self.get_list_data(request))
+
+    async def get_list_data(self, request):
+        list_filter = self.filter_class(request.GET)
+        paginator = KeysetPagination(ordering=list_filter.get_ordering())
+        fields = get_fieldset(request.GET, self.list_serializer_class.serializer_class)
+        queryset = self.list_serializer_class.get_values(
+            list_filter.filter_queryset(self.get_queryset()), fields,
+            extra=[name for name, _ in paginator.get_fields()],
+        )
+        page = await paginator.apaginate_queryset(queryset, request)
+        if page is not None:
+            return {'next': paginator.next_cursor, 'results': self.list_serializer_class(page, fields).data}
+        rows = [row async for row in queryset]
+        return self.list_serializer_class(rows, fields).data
+
+    post = AsyncAPIView.delegate
+
+
+class AsyncDetailView(AsyncAPIView):
+    serializer_class = None
+    lookup_url_kwarg = None
+    not_found_message = None
+
+    async def get(self, request, **kwargs):
+        model = self.sync_view.read_queryset.model
+        fields = get_fieldset(request.GET, self.serializer_class)
+        queryset = self.serializer_class.only_fields(self.sync_view.read_queryset, fields)
+        try:
+            instance = await queryset.aget(pk=kwargs[self.lookup_url_kwarg])
+        except model.DoesNotExist:
+            return self.render({'error': self.not_found_message}, status.HTTP_404_NOT_FOUND)
+
+        async def build():
+            return self.serializer_class(instance, fields=fields).data
+
+        etag = make_etag(model._meta.model_name, instance.pk, instance.last_modified.isoformat(), *(fields or ()))
+        return await aconditional_response(request, etag, build, last_modified=instance.last_modified)
+
+    put = AsyncAPIView.delegate
+    delete = AsyncAPIView.delegate
+
+
+class AsyncCaseListView(AsyncListView):
+    sync_view = views.CaseListView
+    filter_class = CaseFilter
+    list_serializer_class = FastCaseSerializer
+    etag_models = (Case, Client)
+
+    def get_queryset(self):
+        return Case.objects.with_client_name()
+
+
+class AsyncCaseDetailView(AsyncDetailView):
+    sync_view = views.CaseDetailView
+    serializer_class = CaseSerializer
+    lookup_url_kwarg = 'case_id'
+    not_found_message = 'Case not found'
+
+
+class AsyncClientListView(AsyncListView):
+    sync_view = views.ClientListView
+    filter_class = ClientFilter
+    list_serializer_class = FastClientSerializer
+    etag_models = (Client,)
+
+    def get_queryset(self):
+        return Client.objects.all()
+
+
+class AsyncClientDetailView(AsyncDetailView):
+    sync_view = views.ClientDetailView
+    serializer_class = ClientSerializer
+    lookup_url_kwarg = 'client_id'
+    not_found_message = 'Client not found'
+
+
+class AsyncHearingListView(AsyncListView):
+    sync_view = views.HearingListView
+    filter_class = HearingFilter
+    list_serializer_class = FastHearingSerializer
+    etag_models = (Hearing, Case, Client)
+
+    def get_queryset(self):
+        return Hearing.objects.with_case_details()
+
+
+class AsyncHearingDetailView(AsyncDetailView):
+    sync_view = views.HearingDetailView
+    serializer_class = HearingSerializer
+    lookup_url_kwarg = 'hearing_id'
+    not_found_message = 'Hearing not found'
+
+
+class NotificationStreamView(AsyncAPIView):
+    """
+    Server-Sent Events stream of the user's new notifications (ASGI only).
+    An idle stream waits on its broker queue and costs no queries. Browsers'
+    EventSource cannot set headers, so the access token may be passed as
+    ?token=. On reconnect, unread notifications newer than Last-Event-ID are
+    replayed first.
+    """
+    retry_ms = 5000
+
+    async def authenticate(self, request):
+        token = request.GET.get('token')
+        if not token:
+            return await super().authenticate(request)
+        authenticator = CachedJWTAuthentication()
+        validated_token = authenticator.get_validated_token(token.encode())
+        request.user = await authenticator.aget_user(validated_token)
+        request.auth = validated_token
+
+    async def get(self, request):
+        if isinstance(request, WSGIRequest):
+            # A WSGI server buffers the whole stream, so it would never answer
+            return self.render(
+                {'error': 'Notification streams need the ASGI server'}, status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        profile_id = get_profile_id(request.user)
+        if profile_id is None:
+            return self.render({'error': 'User has no profile'}, status.HTTP_404_NOT_FOUND)
+        last_event_id = request.headers.get('Last-Event-ID', '')
+        last_event_id = int(last_event_id) if last_event_id.isdigit() else None
+        response = StreamingHttpResponse(self.stream(profile_id, last_event_id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, profile_id, last_event_id):
+        async with broker.subscribe(profile_id) as queue:
+            yield f'retry: {self.retry_ms}\n\n'
+            sent = last_event_id or 0
+            if last_event_id is not None:
+                missed = Notification.objects.filter(
+                    user_id=profile_id, is_read=False, notification_id__gt=last_event_id,
+                ).order_by('notification_id')
+                async for notification in missed:
+                    payload = to_event_payload(notification)
+                    sent = payload['id']
+                    yield self.format_event(payload)
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), settings.NOTIFICATION_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                # Already replayed if it was published while the backlog was read
+                if payload['id'] > sent:
+                    sent = payload['id']
+                    yield self.format_event(payload)
+
+    def format_event(self, payload):
+        return f"id: {payload['id']}\nevent: notification\ndata: {payload['data']}\n\n"
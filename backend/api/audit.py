@@ -0,0 +1,208 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from datetime import date, datetime, time as datetime_time
+from decimal import Decimal
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils.decorators import sync_and_async_middleware
+
+from core.models import AdminLog
+
+logger = logging.getLogger(__name__)
+
+# Maintained by the database or by Django on every save; not worth auditing
+IGNORED_FIELDS = {'search_vector', 'updated_at'}
+
+current_request = ContextVar('audit_request', default=None)
+
+
+@sync_and_async_middleware
+def audit_context_middleware(get_response):
+    """Makes the current request available to the audit signal receivers."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = current_request.set(request)
+            try:
+                return await get_response(request)
+            finally:
+                current_request.reset(token)
+    else:
+        def middleware(request):
+            token = current_request.set(request)
+            try:
+                return get_response(request)
+            finally:
+                current_request.reset(token)
+    return middleware
+
+
+class AuditWriter:
+    """
+    Buffers AdminLog rows in a bounded queue and inserts them with
+    bulk_create from a background thread, so auditing adds no write to the
+    request that made the change.
+
+    A batch is written when it reaches AUDIT_BATCH_SIZE or AUDIT_FLUSH_INTERVAL
+    seconds after its first entry. When the queue is full, ``submit`` blocks
+    the producer for up to AUDIT_QUEUE_TIMEOUT seconds and then writes the
+    entry itself, so a slow database slows requests down instead of losing
+    audit rows. ``close`` (registered with atexit) drains the queue.
+    """
+    def __init__(self, write_batch):
+        self.write_batch = write_batch
+        self.queue = queue.Queue(maxsize=settings.AUDIT_QUEUE_SIZE)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.closed = False
+
+    def submit(self, entry):
+        if not settings.AUDIT_ASYNC or self.closed:
+            self.write_batch([entry])
+            return
+        self.start()
+        try:
+            self.queue.put(entry, timeout=settings.AUDIT_QUEUE_TIMEOUT)
+        except queue.Full:
+            logger.warning('Audit queue full; writing entry synchronously')
+            self.write_batch([entry])
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='audit-writer', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + settings.AUDIT_FLUSH_INTERVAL
+            while len(batch) < settings.AUDIT_BATCH_SIZE and batch[-1] is not None:
+                try:
+                    batch.append(self.queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                if entries:
+                    # This thread's connection is its own: recycle it like a
+                    # request would, and do not hold it open between batches
+                    close_old_connections()
+                    self.write_batch(entries)
+            except Exception:
+                logger.exception('Failed to write %d audit entries', len(entries))
+            finally:
+                connection.close()
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """Blocks until every queued entry has been written."""
+        self.queue.join()
+
+    def close(self, timeout=10):
+        # The thread closes its connection after the last batch and exits
+        self.closed = True
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout)
+
+
+def write_admin_logs(entries):
+    AdminLog.objects.bulk_create(entries, batch_size=settings.AUDIT_BATCH_SIZE)
+
+
+audit_writer = AuditWriter(write_admin_logs)
+atexit.register(audit_writer.close)
+
+
+def to_json_value(value):
+    if isinstance(value, (datetime, date, datetime_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def audited_values(instance):
+    return {
+        field.attname: to_json_value(getattr(instance, field.attname))
+        for field in instance._meta.concrete_fields
+        if field.attname not in IGNORED_FIELDS
+    }
+
+
+@lru_cache(maxsize=None)
+def get_audited_fields(model):
+    return tuple(field.attname for field in model._meta.concrete_fields if field.attname not in IGNORED_FIELDS)
+
+
+def snapshot_values(instance):
+    """
+    Audited field values as loaded or last saved, kept on the instance so
+    the next save knows the old values without a SELECT. None when some of
+    them were deferred, e.g. by only().
+    """
+    values = instance.__dict__
+    try:
+        return {name: values[name] for name in get_audited_fields(type(instance))}
+    except KeyError:
+        return None
+
+
+def load_current_values(instance):
+    """
+    Row before ``instance`` is saved, or None for inserts: the snapshot
+    taken when it was loaded, or the stored row if there is none.
+    """
+    if instance._state.adding or instance.pk is None:
+        return None
+    snapshot = getattr(instance, '_audit_snapshot', None)
+    if snapshot is not None:
+        return {name: to_json_value(value) for name, value in snapshot.items()}
+    fields = get_audited_fields(type(instance))
+    row = type(instance)._base_manager.filter(pk=instance.pk).values(*fields).first()
+    return {name: to_json_value(value) for name, value in row.items()} if row else None
+
+
+def record_change(instance, action, old_values=None):
+    """
+    Queues an AdminLog entry for ``instance`` once the transaction commits.
+    Updates only record the fields that changed, and are skipped if none did.
+    """
+    entry = make_entry(instance, action, old_values)
+    if entry is not None:
+        transaction.on_commit(lambda: audit_writer.submit(entry))
+
+
+def make_entry(instance, action, old_values=None):
+    """The unsaved AdminLog row for record_change(), or None if nothing changed."""
+    new_values = audited_values(instance) if action != 'delete' else None
+    if action == 'update' and old_values is not None:
+        changed = [name for name, value in new_values.items() if old_values.get(name) != value]
+        if not changed:
+            return None
+        old_values = {name: old_values[name] for name in changed}
+        new_values = {name: new_values[name] for name in changed}
+
+    request = current_request.get()
+    user = getattr(request, 'user', None)
+    return AdminLog(
+        user_id=str(user.pk) if user is not None and user.is_authenticated else None,
+        action=action,
+        table_name=instance._meta.db_table,
+        record_id=str(instance.pk),
+        old_values=old_values,
+        new_values=new_values,
+        ip_address=request.META.get('REMOTE_ADDR') if request is not None else None,
+        user_agent=request.headers.get('User-Agent') if request is not None else None,
+    )
@@ -0,0 +1,142 @@
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.models import UserProfile
+
+# What request.user needs without a query; anything else is deferred.
+# In model field order, as Model.from_db() expects.
+CACHED_USER_FIELDS = ('id', 'is_superuser', 'username', 'first_name', 'last_name', 'email', 'is_staff', 'is_active')
+CACHED_PROFILE_FIELDS = ('user_id', 'django_user_id', 'role', 'is_active')
+
+
+def user_cache_key(user_id, token_id):
+    return f'auth:user:{user_id}:{token_id}'
+
+
+def user_generation_key(user_id):
+    return f'auth:user-generation:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    # Entries are per token, so they are dropped by starting a new
+    # generation; same now-and-after-commit pattern as invalidate_dashboard_stats
+    key = user_generation_key(user_id)
+    cache.set(key, uuid.uuid4().hex, timeout=None)
+    transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, timeout=None))
+
+
+def to_cache_entry(user, generation):
+    """
+    The fields authentication needs from ``user`` and its profile. The
+    password hash itself is not cached, only the digest CHECK_REVOKE_TOKEN
+    compares tokens against.
+    """
+    profile = getattr(user, 'profile', None)
+    return {
+        'generation': generation,
+        'user': [getattr(user, name) for name in CACHED_USER_FIELDS],
+        'password_digest': get_md5_hash_password(user.password),
+        'profile': [getattr(profile, name) for name in CACHED_PROFILE_FIELDS] if profile is not None else None,
+    }
+
+
+def from_cache_entry(entry):
+    # Fields that were not cached are deferred: reading one loads it
+    user = User.from_db('default', CACHED_USER_FIELDS, entry['user'])
+    profile = None
+    if entry['profile'] is not None:
+        profile = UserProfile.from_db('default', CACHED_PROFILE_FIELDS, entry['profile'])
+        UserProfile.django_user.field.set_cached_value(profile, user)
+    User.profile.related.set_cached_value(user, profile)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that caches what it needs from the token's user and
+    profile (see CACHED_USER_FIELDS) for AUTH_USER_CACHE_TIMEOUT seconds,
+    keyed by user id and token id, instead of loading auth_user on every
+    request. User and UserProfile saves and deletes start a new generation
+    that invalidates every entry of the user (see api/signals.py); the
+    timeout bounds staleness for writes that skip signals, such as
+    queryset.update(is_active=False).
+    """
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        key, generation_key = self.get_cache_keys(user_id, validated_token)
+        cached = cache.get_many([key, generation_key])
+        entry, generation = cached.get(key), cached.get(generation_key)
+        if entry is not None and generation is not None and entry['generation'] == generation:
+            user = from_cache_entry(entry)
+        else:
+            user = self.get_user_queryset(user_id).first()
+            if user is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            if generation is None:
+                generation = uuid.uuid4().hex
+                cache.add(generation_key, generation, timeout=None)
+            entry = to_cache_entry(user, generation)
+            cache.set(key, entry, settings.AUTH_USER_CACHE_TIMEOUT)
+        self.check_user(user, validated_token, entry['password_digest'])
+        return user
+
+    async def aauthenticate(self, request):
+        """authenticate() for the async views in api/async_views.py."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        key, generation_key = self.get_cache_keys(user_id, validated_token)
+        cached = await cache.aget_many([key, generation_key])
+        entry, generation = cached.get(key), cached.get(generation_key)
+        if entry is not None and generation is not None and entry['generation'] == generation:
+            user = from_cache_entry(entry)
+        else:
+            user = await self.get_user_queryset(user_id).afirst()
+            if user is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            if generation is None:
+                generation = uuid.uuid4().hex
+                await cache.aadd(generation_key, generation, timeout=None)
+            entry = to_cache_entry(user, generation)
+            await cache.aset(key, entry, settings.AUTH_USER_CACHE_TIMEOUT)
+        self.check_user(user, validated_token, entry['password_digest'])
+        return user
+
+    def get_cache_keys(self, user_id, validated_token):
+        return (
+            user_cache_key(user_id, validated_token.get(api_settings.JTI_CLAIM, '')),
+            user_generation_key(user_id),
+        )
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+    def get_user_queryset(self, user_id):
+        return User.objects.select_related('profile').filter(**{api_settings.USER_ID_FIELD: user_id})
+
+    def check_user(self, user, validated_token, password_digest):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
@@ -1,11 +1,36 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+# auth_user.email is not unique; checking a few matches covers duplicates
+# without letting one login attempt run the password hasher unboundedly.
+MAX_CANDIDATES = 5
+
 
 class EmailBackend(ModelBackend):
+    """
+    Authenticates by email (case-insensitive) or username with one query on
+    the auth_user_email_lower_idx index. It also covers plain username
+    logins, so ModelBackend is not needed as a fallback that would look the
+    user up and hash the password a second time on every failed attempt.
+    """
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            user = User.objects.get(email=username)
-            if user.check_password(password):
-                return user
-        except User.DoesNotExist:
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
             return None
+        
+        candidates = list(
+            User.objects.alias(email_lower=Lower('email'))
+            .filter(Q(email_lower=username.lower()) | Q(username=username))
+            .order_by('-is_active', 'pk')[:MAX_CANDIDATES]
+        )
+        if not candidates:
+            # Run the hasher anyway so unknown emails are as slow as wrong passwords
+            User().set_password(password)
+            return None
+        for user in candidates:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        return None
@@ -0,0 +1,229 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.validators import UniqueValidator
+
+from core.models import Client, Case, Hearing
+from .audit import audited_values, record_change
+from .serializers import ClientSerializer, CaseSerializer, HearingSerializer
+from .signals import collect_deletions, invalidate_model_caches
+
+
+class BulkWriter:
+    """
+    Validates a batch of records with the model's serializer rules and writes
+    it with bulk_create/bulk_update/delete in one transaction.
+
+    Validation reuses a single serializer instance (``run_validation`` per
+    item) and replaces the per-row database checks -- unique fields and
+    foreign keys -- with one query per batch, so validating thousands of
+    rows costs a handful of queries. Nothing is written unless every item is
+    valid; otherwise the write methods return None and ``get_errors()``
+    lists each failing item by index.
+    """
+    model = None
+    serializer_class = None
+    unique_fields = ()
+    # Write-only serializer field -> model the id must exist in
+    foreign_keys = {}
+
+    def __init__(self):
+        self.errors = {}
+        self.pk_name = self.model._meta.pk.name
+
+    def get_serializer(self, partial):
+        serializer = self.serializer_class(partial=partial)
+        for field_name in self.unique_fields:
+            field = serializer.fields[field_name]
+            field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+        return serializer
+
+    def add_error(self, index, field_name, message):
+        self.errors.setdefault(index, {}).setdefault(field_name, []).append(message)
+
+    def check_items(self, items):
+        if not isinstance(items, list):
+            raise ValidationError({'error': 'Expected a list of items.'})
+        if not items:
+            raise ValidationError({'error': 'The list is empty.'})
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise ValidationError({'error': f'At most {settings.BULK_MAX_ITEMS} items per request.'})
+
+    def validate_items(self, items, partial):
+        serializer = self.get_serializer(partial)
+        validated = {}
+        for index, item in enumerate(items):
+            try:
+                validated[index] = serializer.run_validation(item)
+            except ValidationError as exc:
+                for field_name, messages in exc.detail.items():
+                    self.errors.setdefault(index, {}).setdefault(field_name, []).extend(messages)
+        self.check_foreign_keys(validated)
+        return validated
+
+    def check_foreign_keys(self, validated):
+        for field_name, related_model in self.foreign_keys.items():
+            wanted = {data[field_name] for data in validated.values() if data.get(field_name) is not None}
+            existing = set(
+                related_model.objects.filter(pk__in=wanted).values_list('pk', flat=True)
+            ) if wanted else set()
+            for index, data in validated.items():
+                if field_name in data and data[field_name] not in existing:
+                    self.add_error(index, field_name, f'{related_model.__name__} {data[field_name]} does not exist.')
+
+    def check_unique_fields(self, validated, instance_pks):
+        for field_name in self.unique_fields:
+            seen = {}
+            for index, data in validated.items():
+                value = data.get(field_name)
+                if value is None:
+                    continue
+                if value in seen:
+                    self.add_error(index, field_name, f'Duplicate {field_name} in this batch (item {seen[value]}).')
+                else:
+                    seen[value] = index
+            if not seen:
+                continue
+            taken = dict(
+                self.model.objects.filter(**{f'{field_name}__in': list(seen)})
+                .values_list(field_name, self.pk_name)
+            )
+            for value, index in seen.items():
+                if value in taken and taken[value] != instance_pks.get(index):
+                    self.add_error(index, field_name, f'{self.model.__name__} with this {field_name} already exists.')
+
+    def get_errors(self):
+        return [{'index': index, 'errors': self.errors[index]} for index in sorted(self.errors)]
+
+    def build_instance(self, data):
+        return self.model(**data)
+
+    def apply_changes(self, instance, data):
+        """Sets ``data`` on ``instance``; returns the field names to bulk_update."""
+        for field_name, value in data.items():
+            setattr(instance, field_name, value)
+        return set(data)
+
+    def create(self, items):
+        self.check_items(items)
+        validated = self.validate_items(items, partial=False)
+        self.check_unique_fields(validated, instance_pks={})
+        if self.errors:
+            return None
+
+        instances = [self.build_instance(validated[index]) for index in range(len(items))]
+        with transaction.atomic():
+            created = self.model.objects.bulk_create(instances, batch_size=settings.BULK_BATCH_SIZE)
+            invalidate_model_caches(self.model)
+            # bulk_create sends no signals, so audit here
+            if settings.AUDIT_ENABLED:
+                for instance in created:
+                    record_change(instance, 'create')
+        return [instance.pk for instance in created]
+
+    def update(self, items):
+        self.check_items(items)
+        ids = {}
+        seen = set()
+        for index, item in enumerate(items):
+            pk = item.get(self.pk_name) if isinstance(item, dict) else None
+            if not isinstance(pk, int):
+                self.add_error(index, self.pk_name, 'This field is required and must be an integer.')
+            elif pk in seen:
+                self.add_error(index, self.pk_name, 'Duplicate id in this batch.')
+            else:
+                ids[index] = pk
+                seen.add(pk)
+        instances = self.model.objects.in_bulk(list(ids.values()))
+        for index, pk in ids.items():
+            if pk not in instances:
+                self.add_error(index, self.pk_name, f'{self.model.__name__} {pk} does not exist.')
+
+        validated = self.validate_items(items, partial=True)
+        self.check_unique_fields(validated, instance_pks=ids)
+        if self.errors:
+            return None
+
+        now = timezone.now()
+        fields = {'updated_at'}
+        old_values = {}
+        for index, data in validated.items():
+            instance = instances[ids[index]]
+            old_values[instance.pk] = audited_values(instance)
+            fields |= self.apply_changes(instance, data)
+            # bulk_update bypasses auto_now
+            instance.updated_at = now
+        with transaction.atomic():
+            self.model.objects.bulk_update(
+                list(instances.values()), sorted(fields), batch_size=settings.BULK_BATCH_SIZE
+            )
+            invalidate_model_caches(self.model)
+            if settings.AUDIT_ENABLED:
+                for instance in instances.values():
+                    record_change(instance, 'update', old_values[instance.pk])
+        return len(instances)
+
+    def delete(self, ids):
+        self.check_items(ids)
+        for index, pk in enumerate(ids):
+            if not isinstance(pk, int):
+                self.add_error(index, self.pk_name, 'Expected an integer id.')
+        if self.errors:
+            return None
+
+        existing = set(self.model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        for index, pk in enumerate(ids):
+            if pk not in existing:
+                self.add_error(index, self.pk_name, f'{self.model.__name__} {pk} does not exist.')
+        if self.errors:
+            return None
+
+        with collect_deletions():
+            self.model.objects.filter(pk__in=existing).delete()
+        return len(existing)
+
+
+class ClientBulkWriter(BulkWriter):
+    model = Client
+    serializer_class = ClientSerializer
+    unique_fields = ('email',)
+
+
+class CaseBulkWriter(BulkWriter):
+    model = Case
+    serializer_class = CaseSerializer
+    foreign_keys = {'client_id': Client}
+
+
+class HearingBulkWriter(BulkWriter):
+    model = Hearing
+    serializer_class = HearingSerializer
+    foreign_keys = {'case_id': Case}
+
+    def get_serializer(self, partial):
+        serializer = super().get_serializer(partial)
+        # One query per row; conflicts are checked by the single-record endpoints
+        serializer.context['check_conflicts'] = False
+        return serializer
+
+    def build_instance(self, data):
+        # bulk_create does not call save(), which maintains ends_at
+        instance = super().build_instance(data)
+        instance.set_ends_at()
+        return instance
+
+    def apply_changes(self, instance, data):
+        fields = super().apply_changes(instance, data)
+        if {'hearing_date', 'duration_minutes'} & fields:
+            instance.set_ends_at()
+            fields.add('ends_at')
+        return fields
+
+    def validate_items(self, items, partial):
+        validated = super().validate_items(items, partial)
+        if not partial:
+            for index, data in validated.items():
+                if 'case_id' not in data:
+                    self.add_error(index, 'case_id', 'This field is required.')
+        return validated
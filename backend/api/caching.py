@@ -0,0 +1,118 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .renderers import ORJSONRenderer
+
+TABLE_VERSION_PREFIX = 'table-version:'
+RESPONSE_CACHE_PREFIX = 'response:'
+
+
+def get_table_versions(*models):
+    """
+    Return an opaque version token per table. Tokens change whenever a row
+    is saved or deleted (see api/signals.py), so they can stand in for the
+    contents of a whole list without touching the database.
+    """
+    keys = [TABLE_VERSION_PREFIX + model._meta.db_table for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def aget_table_versions(*models):
+    keys = [TABLE_VERSION_PREFIX + model._meta.db_table for model in models]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, uuid.uuid4().hex, timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def bump_table_version(model):
+    key = TABLE_VERSION_PREFIX + model._meta.db_table
+    cache.set(key, uuid.uuid4().hex, timeout=None)
+    # Bump again once the write is visible to other connections, otherwise a
+    # concurrent read could cache pre-commit rows under the new version.
+    transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, timeout=None))
+
+
+def make_etag(*parts):
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode(), usedforsecurity=False)
+    return quote_etag(digest.hexdigest())
+
+
+def list_etag(request, *models):
+    return make_etag(request.get_full_path(), *get_table_versions(*models))
+
+
+async def alist_etag(request, *models):
+    return make_etag(request.get_full_path(), *await aget_table_versions(*models))
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    return '*' in candidates or etag in [tag.removeprefix('W/') for tag in candidates]
+
+
+def conditional_response(request, etag, build, last_modified=None):
+    """
+    Answer a GET with 304 when the client already holds ``etag``, otherwise
+    serve the payload from the response cache, calling ``build()`` (which
+    returns a Response) only on a miss. Only 200 responses are cached.
+    """
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        cache_key = RESPONSE_CACHE_PREFIX + etag.strip('"')
+        data = cache.get(cache_key)
+        if data is not None:
+            response = Response(data)
+        else:
+            response = build()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cache.set(cache_key, response.data, settings.API_RESPONSE_CACHE_TIMEOUT)
+
+    return add_validators(response, etag, last_modified)
+
+
+async def aconditional_response(request, etag, build, last_modified=None):
+    """
+    conditional_response() for the async views: ``build`` is a coroutine
+    function returning the payload, which is rendered with the default
+    ORJSONRenderer so both paths produce the same bytes.
+    """
+    if etag_matches(request, etag):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        cache_key = RESPONSE_CACHE_PREFIX + etag.strip('"')
+        data = await cache.aget(cache_key)
+        if data is None:
+            data = await build()
+            await cache.aset(cache_key, data, settings.API_RESPONSE_CACHE_TIMEOUT)
+        response = HttpResponse(ORJSONRenderer().render(data), content_type='application/json')
+    return add_validators(response, etag, last_modified)
+
+
+def add_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Let browsers keep a copy but always revalidate it with the ETag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
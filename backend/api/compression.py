@@ -0,0 +1,244 @@
+import threading
+import zlib
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import sync_and_async_middleware
+
+try:
+    import brotli
+except ImportError:  # optional, 'br' is then never offered
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, 'zstd' is then never offered
+    zstandard = None
+
+
+class IdentityStream:
+    def __init__(self, level=None):
+        pass
+
+    def compress(self, data):
+        return data
+
+    def flush(self):
+        return b''
+
+    def finish(self):
+        return b''
+
+
+class GzipStream:
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliStream:
+    def __init__(self, level):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+class ZstdStream:
+    def __init__(self, level):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+STREAMS = {'gzip': GzipStream}
+if brotli is not None:
+    STREAMS['br'] = BrotliStream
+if zstandard is not None:
+    STREAMS['zstd'] = ZstdStream
+
+
+def get_encodings():
+    # COMPRESSION_ENCODINGS order is the server's preference
+    return [encoding for encoding in settings.COMPRESSION_ENCODINGS if encoding in STREAMS]
+
+
+def choose_encoding(accept_encoding):
+    """
+    The encoding to use for an Accept-Encoding header: the one with the
+    highest q value, ties broken by COMPRESSION_ENCODINGS order. None means
+    send the body as is.
+    """
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            accepted[name.strip().lower()] = quality
+    fallback = accepted.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for encoding in get_encodings():
+        quality = accepted.get(encoding, fallback)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+stats_lock = threading.Lock()
+endpoint_stats = {}
+
+
+def record_response(endpoint, encoding, raw_bytes, sent_bytes):
+    with stats_lock:
+        stats = endpoint_stats.setdefault(endpoint, {
+            'responses': 0, 'compressed': 0, 'raw_bytes': 0, 'sent_bytes': 0, 'encodings': {},
+        })
+        stats['responses'] += 1
+        stats['raw_bytes'] += raw_bytes
+        stats['sent_bytes'] += sent_bytes
+        if encoding is not None:
+            stats['compressed'] += 1
+            stats['encodings'][encoding] = stats['encodings'].get(encoding, 0) + 1
+
+
+def get_compression_stats():
+    """
+    Body bytes before and after compression per URL name, for this process
+    since it started. ``ratio`` is sent/raw, so lower is better.
+    """
+    with stats_lock:
+        endpoints = {
+            endpoint: {**stats, 'encodings': dict(stats['encodings'])}
+            for endpoint, stats in endpoint_stats.items()
+        }
+    for stats in endpoints.values():
+        stats['saved_bytes'] = stats['raw_bytes'] - stats['sent_bytes']
+        stats['ratio'] = round(stats['sent_bytes'] / stats['raw_bytes'], 3) if stats['raw_bytes'] else None
+    return {'encodings': get_encodings(), 'min_size': settings.COMPRESSION_MIN_SIZE, 'endpoints': endpoints}
+
+
+@sync_and_async_middleware
+def compression_middleware(get_response):
+    """
+    Compresses JSON, CSV, NDJSON and iCalendar responses with the best
+    encoding the client accepts (see choose_encoding()). Bodies smaller than
+    COMPRESSION_MIN_SIZE are sent as they are. Streaming responses are
+    compressed chunk by chunk and flushed after each one, so exports still
+    arrive progressively.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return compress_response(request, await get_response(request))
+    else:
+        def middleware(request):
+            return compress_response(request, get_response(request))
+    return middleware
+
+
+def compress_response(request, response):
+    content_type = response.get('Content-Type', '').partition(';')[0].strip().lower()
+    if content_type not in settings.COMPRESSION_CONTENT_TYPES or response.has_header('Content-Encoding'):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    match = request.resolver_match
+    endpoint = match.view_name if match else 'unresolved'
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+
+    if response.streaming:
+        stream = STREAMS[encoding](settings.COMPRESSION_LEVELS[encoding]) if encoding else IdentityStream()
+        if response.is_async:
+            response.streaming_content = acompress_chunks(response.streaming_content, stream, endpoint, encoding)
+        else:
+            response.streaming_content = compress_chunks(response.streaming_content, stream, endpoint, encoding)
+        if encoding:
+            del response['Content-Length']
+            set_encoding(response, encoding)
+        return response
+
+    raw_bytes = len(response.content)
+    if not raw_bytes:
+        return response
+    if encoding is None or raw_bytes < settings.COMPRESSION_MIN_SIZE:
+        record_response(endpoint, None, raw_bytes, raw_bytes)
+        return response
+    stream = STREAMS[encoding](settings.COMPRESSION_LEVELS[encoding])
+    compressed = stream.compress(response.content) + stream.finish()
+    if len(compressed) >= raw_bytes:
+        record_response(endpoint, None, raw_bytes, raw_bytes)
+        return response
+    response.content = compressed
+    response['Content-Length'] = str(len(compressed))
+    set_encoding(response, encoding)
+    record_response(endpoint, encoding, raw_bytes, len(compressed))
+    return response
+
+
+def set_encoding(response, encoding):
+    response['Content-Encoding'] = encoding
+    # Same as Django's GZipMiddleware: the bytes differ, so the ETag is weak
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+
+
+def compress_chunks(chunks, stream, endpoint, encoding):
+    raw_bytes = sent_bytes = 0
+    try:
+        for chunk in chunks:
+            raw_bytes += len(chunk)
+            data = stream.compress(chunk) + stream.flush()
+            sent_bytes += len(data)
+            if data:
+                yield data
+        data = stream.finish()
+        sent_bytes += len(data)
+        if data:
+            yield data
+    finally:
+        record_response(endpoint, encoding, raw_bytes, sent_bytes)
+
+
+async def acompress_chunks(chunks, stream, endpoint, encoding):
+    raw_bytes = sent_bytes = 0
+    try:
+        async for chunk in chunks:
+            raw_bytes += len(chunk)
+            data = stream.compress(chunk) + stream.flush()
+            sent_bytes += len(data)
+            if data:
+                yield data
+        data = stream.finish()
+        sent_bytes += len(data)
+        if data:
+            yield data
+    finally:
+        record_response(endpoint, encoding, raw_bytes, sent_bytes)
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+counters_lock = threading.Lock()
+counters = {'requests': 0, 'connections_opened': 0}
+started_at = time.monotonic()
+
+
+@receiver(request_started, dispatch_uid='count_request')
+def count_request(sender, **kwargs):
+    with counters_lock:
+        counters['requests'] += 1
+
+
+@receiver(connection_created, dispatch_uid='count_connection')
+def count_connection(sender, connection, **kwargs):
+    # Also fires for connections a psycopg pool opens in its own threads
+    with counters_lock:
+        counters['connections_opened'] += 1
+
+
+def get_database_stats(alias='default'):
+    """
+    Connection reuse for this process since it started: requests served,
+    connections opened (one per request when DB_POOL_MODE is 'none') and,
+    in 'pool' mode, psycopg's pool statistics -- pool_size, pool_available,
+    requests_waiting, requests_wait_ms, ...
+    """
+    connection = connections[alias]
+    with counters_lock:
+        stats = dict(counters)
+    stats.update({
+        'mode': settings.DB_POOL_MODE,
+        'uptime_seconds': round(time.monotonic() - started_at),
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+        'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+        'requests_per_connection': round(stats['requests'] / max(stats['connections_opened'], 1), 1),
+    })
+    # Only the PostgreSQL backend has a pool, and only when OPTIONS['pool'] is set
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        stats['pool'] = pool.get_stats()
+    return stats
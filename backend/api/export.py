@@ -0,0 +1,91 @@
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.models import Client, Case, Hearing
+from .filters import CaseFilter, ClientFilter, HearingFilter
+
+
+class Export:
+    """
+    Column list, base queryset and filter class for one exportable table.
+    Rows are read with ``.values()`` through ``iterator(chunk_size=...)``,
+    which uses a server-side cursor on PostgreSQL, so memory stays flat no
+    matter how many rows are exported.
+    """
+
+    def __init__(self, name, queryset, filter_class, columns):
+        self.name = name
+        self.queryset = queryset
+        self.filter_class = filter_class
+        self.columns = columns
+
+    def get_rows(self, params, using=None):
+        queryset = self.filter_class(params).filter_queryset(self.queryset.using(using))
+        return queryset.values_list(*self.columns).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def model_columns(model, *extra, exclude=('search_vector',)):
+    columns = [field.attname for field in model._meta.concrete_fields if field.name not in exclude]
+    return columns + list(extra)
+
+
+EXPORTS = {
+    'clients': Export(
+        'clients', Client.objects.all(), ClientFilter, model_columns(Client),
+    ),
+    'cases': Export(
+        'cases', Case.objects.with_client_name(), CaseFilter, model_columns(Case, 'client_name'),
+    ),
+    'hearings': Export(
+        'hearings', Hearing.objects.with_case_details(), HearingFilter,
+        model_columns(Hearing, 'case_title', 'client_name'),
+    ),
+}
+
+
+def export_value(value):
+    # Same text the API serializers produce for these types
+    if isinstance(value, datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        text = value.isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow([export_value(value) for value in row]))
+        if len(buffer) >= settings.EXPORT_ROWS_PER_CHUNK:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_ndjson(columns, rows):
+    buffer = []
+    for row in rows:
+        record = {column: export_value(value) for column, value in zip(columns, row)}
+        buffer.append(json.dumps(record, ensure_ascii=False) + '\n')
+        if len(buffer) >= settings.EXPORT_ROWS_PER_CHUNK:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
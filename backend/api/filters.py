@@ -0,0 +1,183 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from core.models import Client, Case, Hearing
+
+
+class QueryFilter:
+    """
+    Translates list query parameters into database filters.
+
+    Subclasses declare which parameters map to which lookups:
+
+    - ``exact_fields``: ``?param=a&param=b`` becomes ``field__in=[a, b]``
+    - ``range_fields``: ``?param_after=`` / ``?param_before=`` (inclusive)
+    - ``search_fields``: ``?q=`` is matched case-insensitively against these
+    - ``ordering_fields``: allowed values for ``?ordering=`` (prefix ``-`` for
+      descending); the primary key is always appended as a tie-breaker so the
+      ordering stays unique for keyset pagination.
+    """
+    model = None
+    exact_fields = {}
+    range_fields = {}
+    search_fields = ()
+    ordering_fields = ()
+    default_ordering = ()
+
+    def __init__(self, params):
+        self.params = params
+
+    def filter_queryset(self, queryset):
+        for param, field_name in self.exact_fields.items():
+            values = self.get_values(param, field_name)
+            if values:
+                queryset = queryset.filter(**{f'{field_name}__in': values})
+
+        for param, field_name in self.range_fields.items():
+            after = self.params.get(f'{param}_after')
+            before = self.params.get(f'{param}_before')
+            if after:
+                queryset = queryset.filter(**{f'{field_name}__gte': self.parse_bound(f'{param}_after', field_name, after)})
+            if before:
+                queryset = queryset.filter(**{f'{field_name}__lt': self.parse_bound(f'{param}_before', field_name, before, upper=True)})
+
+        term = self.params.get('q', '').strip()
+        if term:
+            queryset = queryset.filter(self.get_search_filter(term))
+
+        return queryset.order_by(*self.get_ordering())
+
+    def get_values(self, param, field_name):
+        # Choice and id parameters also accept comma-separated lists; free-text
+        # values (e.g. lawyer names) can only be repeated: ?param=a&param=b
+        field = self.get_model_field(field_name)
+        values = [value.strip() for value in self.params.getlist(param) if value.strip()]
+        if field.choices:
+            values = [part.strip() for value in values for part in value.split(',') if part.strip()]
+            allowed = {choice for choice, _ in field.choices}
+            invalid = [value for value in values if value not in allowed]
+            if invalid:
+                raise ValidationError({param: f"Invalid choice(s): {', '.join(invalid)}."})
+        elif field.get_internal_type() in ('AutoField', 'BigAutoField', 'ForeignKey', 'IntegerField'):
+            values = [part.strip() for value in values for part in value.split(',') if part.strip()]
+            if not all(value.isdigit() for value in values):
+                raise ValidationError({param: 'Expected a comma-separated list of integers.'})
+        return values
+
+    def parse_bound(self, param, field_name, raw, upper=False):
+        # Both bounds are inclusive for the caller; the upper bound is turned
+        # into an exclusive one so a bare date covers the whole day.
+        field = self.get_model_field(field_name)
+        try:
+            if field.get_internal_type() == 'DateTimeField':
+                value = parse_datetime(raw)
+                if value is not None:
+                    if timezone.is_naive(value):
+                        value = timezone.make_aware(value)
+                    return value + timedelta(microseconds=1) if upper else value
+                day = parse_date(raw)
+                if day is not None:
+                    if upper:
+                        day += timedelta(days=1)
+                    return timezone.make_aware(datetime.combine(day, time.min))
+            else:
+                day = parse_date(raw)
+                if day is not None:
+                    return day + timedelta(days=1) if upper else day
+        except ValueError:
+            # Well formed but not a real date, e.g. 2026-02-30
+            pass
+        raise ValidationError({param: 'Expected an ISO 8601 date or datetime.'})
+
+    def get_search_filter(self, term):
+        condition = Q()
+        for field_name in self.search_fields:
+            condition |= Q(**{f'{field_name}__icontains': term})
+        return condition
+
+    def get_ordering(self):
+        pk_name = self.model._meta.pk.name
+        raw = self.params.get('ordering')
+        if not raw:
+            return self.default_ordering
+        fields = [name.strip() for name in raw.split(',') if name.strip()]
+        invalid = [name for name in fields if name.lstrip('-') not in self.ordering_fields]
+        if invalid or not fields:
+            raise ValidationError({'ordering': f"Allowed fields: {', '.join(self.ordering_fields)}."})
+        if fields[-1].lstrip('-') != pk_name:
+            descending = fields[-1].startswith('-')
+            fields.append(f"-{pk_name}" if descending else pk_name)
+        return tuple(fields)
+
+    def get_model_field(self, field_name):
+        model = self.model
+        *relations, name = field_name.split('__')
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(name)
+
+
+class ClientFilter(QueryFilter):
+    model = Client
+    exact_fields = {
+        'civil_status': 'civil_status',
+        'city': 'city',
+    }
+    range_fields = {
+        'created_at': 'created_at',
+    }
+    search_fields = ('first_name', 'last_name', 'email', 'phone_number')
+    ordering_fields = ('client_id', 'first_name', 'last_name', 'created_at', 'updated_at')
+    default_ordering = ('-created_at', '-client_id')
+
+    def get_search_filter(self, term):
+        condition = super().get_search_filter(term)
+        if term.isdigit():
+            condition |= Q(client_id=int(term))
+        return condition
+
+
+class CaseFilter(QueryFilter):
+    model = Case
+    exact_fields = {
+        'status': 'status',
+        'priority': 'priority',
+        'case_type': 'case_type',
+        'lawyer_assigned': 'lawyer_assigned',
+        'client_id': 'client_id',
+    }
+    range_fields = {
+        'start_date': 'start_date',
+        'end_date': 'end_date',
+        'created_at': 'created_at',
+    }
+    search_fields = (
+        'case_title', 'case_type', 'lawyer_assigned',
+        'client__first_name', 'client__last_name',
+    )
+    ordering_fields = ('case_id', 'case_title', 'status', 'priority', 'created_at', 'updated_at')
+    default_ordering = ('-created_at', '-case_id')
+
+
+class HearingFilter(QueryFilter):
+    model = Hearing
+    exact_fields = {
+        'status': 'status',
+        'hearing_type': 'hearing_type',
+        'case_id': 'case_id',
+        'client_id': 'case__client_id',
+        'lawyer_assigned': 'case__lawyer_assigned',
+    }
+    range_fields = {
+        'hearing_date': 'hearing_date',
+    }
+    search_fields = (
+        'case__case_title', 'judge_name', 'location',
+        'case__client__first_name', 'case__client__last_name',
+    )
+    ordering_fields = ('hearing_id', 'hearing_date', 'status', 'created_at', 'updated_at')
+    default_ordering = ('-hearing_date', '-hearing_id')
@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher with the iteration count taken from
+    PASSWORD_HASH_ITERATIONS. The algorithm name is unchanged, so existing
+    hashes keep verifying and are re-hashed at the new cost on next login.
+    """
+    iterations = settings.PASSWORD_HASH_ITERATIONS or PBKDF2PasswordHasher.iterations
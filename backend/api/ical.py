@@ -0,0 +1,142 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from core.models import Hearing
+from .caching import make_etag
+
+FEED_SALT = 'api.hearing-feed'
+EVENT_CACHE_PREFIX = 'ical:event:'
+FEED_CACHE_PREFIX = 'ical:feed:'
+EVENT_STATUS = {'cancelled': 'CANCELLED', 'postponed': 'TENTATIVE'}
+
+
+def make_feed_token(lawyer):
+    return signing.dumps(lawyer, salt=FEED_SALT, compress=True)
+
+
+def read_feed_token(token):
+    """Lawyer name signed into ``token``, or None if it was tampered with."""
+    try:
+        return signing.loads(token, salt=FEED_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def format_timestamp(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def escape_text(value):
+    return (
+        str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    # RFC 5545: lines longer than 75 octets continue on lines starting with a space
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while encoded:
+        size = 75 if not parts else 74
+        # Do not split a multi-byte character
+        while size < len(encoded) and (encoded[size] & 0xC0) == 0x80:
+            size -= 1
+        parts.append(encoded[:size].decode())
+        encoded = encoded[size:]
+    return '\r\n '.join(parts)
+
+
+def render_event(hearing):
+    summary = f"{hearing['hearing_type'] or 'Hearing'}: {hearing['case_title']}"
+    description = [f"Client: {hearing['client_name']}"]
+    if hearing['judge_name']:
+        description.append(f"Judge: {hearing['judge_name']}")
+    if hearing['notes']:
+        description.append(hearing['notes'])
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:hearing-{hearing['hearing_id']}@casevault",
+        f"DTSTAMP:{format_timestamp(hearing['updated_at'])}",
+        f"LAST-MODIFIED:{format_timestamp(hearing['updated_at'])}",
+        f"DTSTART:{format_timestamp(hearing['hearing_date'])}",
+        f"DTEND:{format_timestamp(hearing['ends_at'])}",
+        f'SUMMARY:{escape_text(summary)}',
+        f"DESCRIPTION:{escape_text(chr(10).join(description))}",
+        f"STATUS:{EVENT_STATUS.get(hearing['status'], 'CONFIRMED')}",
+    ]
+    if hearing['location']:
+        lines.append(f"LOCATION:{escape_text(hearing['location'])}")
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) + '\r\n' for line in lines)
+
+
+class HearingFeed:
+    """
+    iCalendar feed of one lawyer's hearings from HEARING_FEED_PAST_DAYS ago
+    onwards. ``get_etag`` is one aggregate over the hearings (and their case
+    and client) -- newest updated_at plus row count -- so an unchanged feed
+    is answered with a 304 or from the cache without loading any rows. When
+    it has changed, only the events whose rows changed are rendered again;
+    the others come from the per-event cache.
+    """
+    def __init__(self, lawyer):
+        self.lawyer = lawyer
+        self.since = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(
+            days=settings.HEARING_FEED_PAST_DAYS
+        )
+        self.hearings = Hearing.objects.filter(case__lawyer_assigned=lawyer, hearing_date__gte=self.since)
+
+    def get_etag(self):
+        stats = self.hearings.aggregate(
+            count=Count('hearing_id'),
+            hearings=Max('updated_at'),
+            cases=Max('case__updated_at'),
+            clients=Max('case__client__updated_at'),
+        )
+        return make_etag('ical', self.lawyer, self.since.date(), *stats.values())
+
+    def render(self, etag):
+        cache_key = FEED_CACHE_PREFIX + etag.strip('"')
+        body = cache.get(cache_key)
+        if body is None:
+            body = self.build()
+            cache.set(cache_key, body, settings.HEARING_FEED_CACHE_TIMEOUT)
+        return body
+
+    def build(self):
+        rows = list(
+            self.hearings.with_case_details()
+            .annotate(case_updated_at=F('case__updated_at'), client_updated_at=F('case__client__updated_at'))
+            .order_by('hearing_date', 'hearing_id')
+            .values(
+                'hearing_id', 'hearing_date', 'ends_at', 'hearing_type', 'location', 'judge_name', 'notes',
+                'status', 'updated_at', 'case_title', 'client_name', 'case_updated_at', 'client_updated_at',
+            )
+        )
+        keys = {
+            row['hearing_id']: EVENT_CACHE_PREFIX + make_etag(
+                row['hearing_id'], row['updated_at'], row['case_updated_at'], row['client_updated_at'],
+            ).strip('"')
+            for row in rows
+        }
+        events = cache.get_many(keys.values())
+        missing = {}
+        for row in rows:
+            key = keys[row['hearing_id']]
+            if key not in events:
+                events[key] = missing[key] = render_event(row)
+        if missing:
+            cache.set_many(missing, settings.HEARING_FEED_CACHE_TIMEOUT)
+        header = (
+            'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//CaseVault//Hearings//EN\r\nCALSCALE:GREGORIAN\r\n'
+            f"{fold('X-WR-CALNAME:' + escape_text(f'Hearings - {self.lawyer}'))}\r\n"
+        )
+        return header + ''.join(events[keys[row['hearing_id']]] for row in rows) + 'END:VCALENDAR\r\n'
@@ -0,0 +1,188 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import AdminLog, Client
+from api.audit import make_entry
+from api.bulk import ClientBulkWriter, CaseBulkWriter
+from api.signals import invalidate_model_caches
+
+WRITERS = {
+    'clients': ClientBulkWriter,
+    'cases': CaseBulkWriter,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream clients or cases from a CSV or JSONL file into the database. '
+        'Rows are validated with the API serializer rules and inserted in '
+        'batches; invalid rows are reported and skipped. Cases may reference '
+        'their client by "client_email" instead of "client_id".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('entity', choices=sorted(WRITERS))
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=settings.IMPORT_BATCH_SIZE)
+        parser.add_argument('--checkpoint', help='Progress file (default: <path>.checkpoint).')
+        parser.add_argument('--resume', action='store_true', help='Skip the records a previous run got through.')
+        parser.add_argument('--max-errors', type=int, default=100, help='Row errors to print before going quiet.')
+
+    def handle(self, *args, **options):
+        entity = options['entity']
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f'{path} does not exist.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        file_format = options['format'] or self.guess_format(path)
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+
+        state = {'entity': entity, 'source': os.path.abspath(path), 'records': 0, 'created': 0, 'skipped': 0}
+        if options['resume']:
+            state = self.load_checkpoint(checkpoint_path, state)
+        writer_class = WRITERS[entity]
+        # Built once so client references cost no queries per row
+        client_ids = self.load_client_ids() if entity == 'cases' else None
+
+        self.errors_left = options['max_errors']
+        records = islice(self.read_records(path, file_format), state['records'], None)
+        started = time.monotonic()
+        processed = created_now = 0
+        try:
+            while True:
+                batch = list(islice(records, options['batch_size']))
+                if not batch:
+                    break
+                previous = dict(state)
+                with transaction.atomic():
+                    instances = self.import_batch(writer_class, batch, client_ids)
+                    state['records'] += len(batch)
+                    state['created'] += len(instances)
+                    state['skipped'] += len(batch) - len(instances)
+                    if instances:
+                        # Saved before the commit; on --resume, whether the
+                        # first row exists tells if the batch committed
+                        self.save_checkpoint(checkpoint_path, {
+                            **state, 'unconfirmed': {'pk': instances[0].pk, 'previous': previous},
+                        })
+                self.save_checkpoint(checkpoint_path, state)
+                processed += len(batch)
+                created_now += len(instances)
+                rate = processed / max(time.monotonic() - started, 1e-6)
+                self.stdout.write(
+                    f"{state['records']} records: {state['created']} created, "
+                    f"{state['skipped']} skipped ({rate:,.0f} rows/s)"
+                )
+        finally:
+            # bulk_create sends no signals
+            if created_now:
+                invalidate_model_caches(writer_class.model)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {state['created']} {entity} ({state['skipped']} skipped). "
+            f"Checkpoint: {checkpoint_path}"
+        ))
+
+    def guess_format(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            return 'csv'
+        if extension in ('.jsonl', '.ndjson'):
+            return 'jsonl'
+        raise CommandError(f'Cannot tell the format of {path}; pass --format.')
+
+    def read_records(self, path, file_format):
+        """Yields (line number, record) without loading the file into memory."""
+        with open(path, newline='', encoding='utf-8-sig') as source:
+            if file_format == 'csv':
+                reader = csv.DictReader(source)
+                for row in reader:
+                    # Empty cells mean "not provided" so model defaults apply
+                    yield reader.line_num, {key: value for key, value in row.items() if key and value != ''}
+            else:
+                for line_number, line in enumerate(source, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError:
+                        # Rejected by the serializer as "not a dictionary"
+                        yield line_number, line
+
+    def load_checkpoint(self, checkpoint_path, state):
+        if not os.path.exists(checkpoint_path):
+            self.stdout.write(f'No checkpoint at {checkpoint_path}; starting from the beginning.')
+            return state
+        with open(checkpoint_path) as source:
+            saved = json.load(source)
+        if saved.get('entity') != state['entity'] or saved.get('source') != state['source']:
+            raise CommandError(f"{checkpoint_path} belongs to an import of {saved.get('entity')} from {saved.get('source')}.")
+        unconfirmed = saved.pop('unconfirmed', None)
+        if unconfirmed is not None:
+            model = WRITERS[saved['entity']].model
+            if not model.objects.filter(pk=unconfirmed['pk']).exists():
+                # Stopped before the last batch committed
+                saved = unconfirmed['previous']
+        self.stdout.write(f"Resuming after {saved['records']} records.")
+        return saved
+
+    def save_checkpoint(self, checkpoint_path, state):
+        temporary = f'{checkpoint_path}.tmp'
+        with open(temporary, 'w') as target:
+            json.dump(state, target)
+        os.replace(temporary, checkpoint_path)
+
+    def load_client_ids(self):
+        return {
+            email.lower(): client_id
+            for email, client_id in Client.objects.exclude(email=None).values_list('email', 'client_id').iterator()
+        }
+
+    def import_batch(self, writer_class, batch, client_ids):
+        writer = writer_class()
+        items = [record for _, record in batch]
+        if client_ids is not None:
+            self.resolve_clients(writer, items, client_ids)
+        validated = writer.validate_items(items, partial=False)
+        writer.check_unique_fields(validated, instance_pks={})
+
+        instances = [
+            writer.build_instance(data) for index, data in validated.items() if index not in writer.errors
+        ]
+        writer.model.objects.bulk_create(instances, batch_size=settings.BULK_BATCH_SIZE)
+        # Same audit rows as the bulk endpoints, written in the batch's transaction
+        if settings.AUDIT_ENABLED:
+            AdminLog.objects.bulk_create(
+                [make_entry(instance, 'create') for instance in instances], batch_size=settings.AUDIT_BATCH_SIZE,
+            )
+
+        for index in sorted(writer.errors):
+            self.report_error(batch[index][0], writer.errors[index])
+        return instances
+
+    def resolve_clients(self, writer, items, client_ids):
+        for index, record in enumerate(items):
+            if not isinstance(record, dict) or 'client_email' not in record:
+                continue
+            email = record.pop('client_email')
+            client_id = client_ids.get(str(email).strip().lower())
+            if client_id is None:
+                writer.add_error(index, 'client_email', f'No client with email {email}.')
+            else:
+                record['client_id'] = client_id
+
+    def report_error(self, line_number, errors):
+        if self.errors_left > 0:
+            self.stderr.write(f'line {line_number}: {json.dumps(errors)}')
+        elif self.errors_left == 0:
+            self.stderr.write('Further row errors are not shown.')
+        self.errors_left -= 1
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.partitions import PartitionManager, partition_name
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the upcoming monthly partitions of admin_logs and notifications '
+        'and drop or detach the ones past their retention (PARTITIONED_TABLES). '
+        'Run it daily from cron; it is a no-op when nothing is due.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Print what would change without changing it.')
+        parser.add_argument('--skip-expire', action='store_true', help='Only create partitions.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Partitioning requires PostgreSQL.')
+        now = timezone.now()
+        dry_run = options['dry_run']
+        prefix = '[dry run] ' if dry_run else ''
+        for table, policy in settings.PARTITIONED_TABLES.items():
+            with transaction.atomic(), connection.cursor() as cursor:
+                manager = PartitionManager(cursor, table, policy)
+                if not manager.is_partitioned():
+                    self.stderr.write(f'{table} is not partitioned; run migrate first.')
+                    continue
+                for month in manager.missing_months(now):
+                    name = partition_name(table, month)
+                    if not dry_run:
+                        manager.create(month)
+                    self.stdout.write(f'{prefix}{table}: created {name}')
+                if options['skip_expire']:
+                    continue
+                for name in manager.expired_partitions(now):
+                    if not dry_run:
+                        manager.expire(name)
+                    verb = 'detached' if policy['expire'] == 'detach' else 'dropped'
+                    self.stdout.write(f'{prefix}{table}: {verb} {name}')
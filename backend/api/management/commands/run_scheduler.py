@@ -0,0 +1,53 @@
+import logging
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from api.reminders import ReminderScheduler
+from api.sync import prune_tombstones
+
+logger = logging.getLogger('api.reminders')
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the background scheduler: every --interval seconds, notify the '
+        'assigned lawyers of scheduled hearings that start within '
+        'HEARING_REMINDER_LEAD_MINUTES, and prune /api/sync/ tombstones older '
+        'than SYNC_TOMBSTONE_DAYS. Safe to restart; reminders are never sent '
+        'twice. Prints one metrics line per tick.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=settings.SCHEDULER_INTERVAL)
+        parser.add_argument('--once', action='store_true', help='Run a single tick and exit.')
+        parser.add_argument('--batch-size', type=int, default=settings.HEARING_REMINDER_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['interval'] <= 0 or options['batch_size'] < 1:
+            raise CommandError('--interval and --batch-size must be positive.')
+        scheduler = ReminderScheduler(batch_size=options['batch_size'])
+        stopping = threading.Event()
+        if not options['once']:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *args: stopping.set())
+
+        while True:
+            try:
+                metrics = scheduler.run_once()
+                metrics['tombstones_pruned'] = prune_tombstones()
+            except Exception:
+                if options['once']:
+                    raise
+                logger.exception('Scheduler tick failed')
+            else:
+                line = ' '.join(f'{name}={value}' for name, value in metrics.items())
+                self.stdout.write(line)
+                logger.info('Scheduler tick: %s', line)
+            if options['once'] or stopping.wait(options['interval']):
+                break
+            # Between ticks, like between requests
+            close_old_connections()
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:10
+
+from django.db import migrations
+
+# auth_user belongs to django.contrib.auth, so the expression index used by
+# api.backends.EmailBackend (lower(email) = %s) is created here in plain SQL.
+# It is not unique: existing rows may already share an email.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX auth_user_email_lower_idx ON auth_user (lower(email));',
+            reverse_sql='DROP INDEX auth_user_email_lower_idx;',
+        ),
+    ]
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import select
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Notification
+from .serializers import NotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationBroker:
+    """
+    In-process pub/sub from Notification writes to the SSE streams of
+    /api/notifications/stream/. Each open stream holds a bounded asyncio
+    queue keyed by UserProfile id; waiting on it costs no queries.
+
+    ``publish`` may be called from any thread. Without
+    NOTIFICATIONS_PG_CHANNEL only streams in the publishing process are
+    reached; with it, publishes go through PostgreSQL NOTIFY and a LISTEN
+    thread in every process that has open streams fans them out locally, so
+    notifications created by other workers (or the scheduler) arrive too.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.listener = None
+
+    @asynccontextmanager
+    async def subscribe(self, profile_id):
+        queue = asyncio.Queue(maxsize=settings.NOTIFICATION_QUEUE_SIZE)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self.lock:
+            self.subscribers.setdefault(profile_id, set()).add(subscriber)
+        if settings.NOTIFICATIONS_PG_CHANNEL:
+            self.start_listener()
+        try:
+            yield queue
+        finally:
+            with self.lock:
+                subscribers = self.subscribers.get(profile_id, set())
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    self.subscribers.pop(profile_id, None)
+
+    def subscriber_count(self, profile_id=None):
+        with self.lock:
+            if profile_id is not None:
+                return len(self.subscribers.get(profile_id, ()))
+            return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+    def publish(self, notifications):
+        if settings.NOTIFICATIONS_PG_CHANNEL and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for notification in notifications:
+                    cursor.execute(
+                        'SELECT pg_notify(%s, %s)',
+                        [settings.NOTIFICATIONS_PG_CHANNEL, str(notification.notification_id)],
+                    )
+        else:
+            self.deliver(notifications)
+
+    def deliver(self, notifications):
+        for notification in notifications:
+            with self.lock:
+                subscribers = list(self.subscribers.get(notification.user_id, ()))
+            if not subscribers:
+                continue
+            payload = to_event_payload(notification)
+            for loop, queue in subscribers:
+                loop.call_soon_threadsafe(self.put, queue, payload)
+
+    def put(self, queue, payload):
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # The client falls behind; it catches up from Last-Event-ID on reconnect
+            logger.warning('Notification stream queue full, dropping notification %s', payload['id'])
+
+    def start_listener(self):
+        with self.lock:
+            if self.listener is None or not self.listener.is_alive():
+                self.listener = threading.Thread(target=self.listen, name='notification-listener', daemon=True)
+                self.listener.start()
+
+    def listen(self):
+        # Runs in its own thread, so it gets its own database connection
+        while True:
+            try:
+                connection.ensure_connection()
+                raw = connection.connection
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {connection.ops.quote_name(settings.NOTIFICATIONS_PG_CHANNEL)}')
+                while True:
+                    ids = self.wait_for_notifies(raw, 30)
+                    if ids and self.subscriber_count():
+                        self.deliver(Notification.objects.filter(notification_id__in=ids).order_by('notification_id'))
+            except Exception:
+                logger.exception('Notification listener failed; reconnecting')
+                connection.close()
+                time.sleep(1)
+
+    def wait_for_notifies(self, raw, timeout):
+        if hasattr(raw, 'poll'):
+            # psycopg2
+            if select.select([raw], [], [], timeout) == ([], [], []):
+                return []
+            raw.poll()
+            ids = []
+            while raw.notifies:
+                ids.append(int(raw.notifies.pop(0).payload))
+            return ids
+        # psycopg 3 (DB_POOL_MODE=pool): wait for one, then take what else is queued
+        ids = [int(notify.payload) for notify in raw.notifies(timeout=timeout, stop_after=1)]
+        if ids:
+            ids += [int(notify.payload) for notify in raw.notifies(timeout=0.01)]
+        return ids
+
+
+def get_profile_id(user):
+    # CachedJWTAuthentication loads the profile with the user, so this is free
+    profile = getattr(user, 'profile', None)
+    return profile.user_id if profile is not None else None
+
+
+def to_event_payload(notification):
+    return {
+        'id': notification.notification_id,
+        'data': JSONRenderer().render(NotificationSerializer(notification).data).decode(),
+    }
+
+
+broker = NotificationBroker()
+
+
+def publish_notifications(notifications):
+    """
+    Push new notifications to open streams once the transaction commits.
+    The post_save signal calls this for single saves; code that uses
+    bulk_create must call it itself.
+    """
+    notifications = list(notifications)
+    if notifications:
+        transaction.on_commit(lambda: broker.publish(notifications))
@@ -0,0 +1,121 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in cursor pagination over a fixed, unique ordering such as
+    ('-created_at', '-case_id'). Pages are fetched with a WHERE clause on the
+    last row's key instead of OFFSET, so every page costs the same regardless
+    of how deep the client has scrolled.
+
+    Pagination only kicks in when the request carries ``cursor`` or
+    ``page_size``; otherwise the view keeps returning the full list.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+        self.current_page_size = self.page_size
+        self.next_cursor = None
+
+    def get_params(self, request):
+        # DRF requests have query_params; the async views pass Django's HttpRequest
+        return getattr(request, 'query_params', request.GET)
+
+    def is_requested(self, request):
+        params = self.get_params(request)
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        raw = self.get_params(request).get(self.page_size_query_param)
+        if raw is None:
+            return self.page_size
+        try:
+            page_size = int(raw)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: 'A valid integer is required.'})
+        if page_size < 1:
+            raise ValidationError({self.page_size_query_param: 'Must be at least 1.'})
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return self.get_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        if not self.is_requested(request):
+            return None
+        return self.get_page([row async for row in self.get_page_queryset(queryset, request)])
+
+    def get_page_queryset(self, queryset, request):
+        # One row more than the page so get_page() knows whether a next page exists
+        self.current_page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        raw_cursor = self.get_params(request).get(self.cursor_query_param)
+        if raw_cursor:
+            position = self.decode_cursor(raw_cursor, queryset.model)
+            queryset = queryset.filter(self.get_position_filter(position))
+        return queryset[:self.current_page_size + 1]
+
+    def get_page(self, rows):
+        if len(rows) > self.current_page_size:
+            rows = rows[:self.current_page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.next_cursor,
+            'results': data,
+        })
+
+    def get_position_filter(self, position):
+        # (a, b) < (x, y) expands to: a < x OR (a = x AND b < y)
+        condition = Q()
+        for index, (field_name, descending) in enumerate(self.get_fields()):
+            lookup = 'lt' if descending else 'gt'
+            clause = Q(**{f'{field_name}__{lookup}': position[index]})
+            for prior_index, (prior_name, _) in enumerate(self.get_fields()[:index]):
+                clause &= Q(**{prior_name: position[prior_index]})
+            condition |= clause
+        return condition
+
+    def get_fields(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def encode_cursor(self, instance):
+        values = []
+        for field_name, _ in self.get_fields():
+            # Rows are model instances or, for the fast list serializers, dicts
+            value = instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        payload = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def decode_cursor(self, raw_cursor, model):
+        try:
+            padded = raw_cursor + '=' * (-len(raw_cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            fields = self.get_fields()
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [
+                model._meta.get_field(field_name).to_python(value)
+                for (field_name, _), value in zip(fields, values)
+            ]
+        except (ValueError, TypeError, binascii.Error, DjangoValidationError):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
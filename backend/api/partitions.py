@@ -0,0 +1,95 @@
+import re
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+PARTITION_NAME = re.compile(r'^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$')
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y_%m}'
+
+
+def parse_partition_month(table, name):
+    """Month a monthly partition of ``table`` covers, or None for other tables."""
+    match = PARTITION_NAME.match(name)
+    if match is None or match['table'] != table:
+        return None
+    return datetime(int(match['year']), int(match['month']), 1, tzinfo=timezone.utc)
+
+
+def bound(month):
+    return f"'{month:%Y-%m-%d} 00:00+00'"
+
+
+class PartitionManager:
+    """
+    Keeps the monthly created_at partitions of a table made by
+    core/migrations/0004 in step with PARTITIONED_TABLES: ``ensure`` creates
+    partitions up to PARTITION_MONTHS_AHEAD, ``expire`` drops or detaches
+    the ones older than ``retention_months``.
+    """
+    def __init__(self, cursor, table, policy):
+        self.cursor = cursor
+        self.table = table
+        self.policy = policy
+
+    def is_partitioned(self):
+        self.cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [self.table],
+        )
+        return self.cursor.fetchone() is not None
+
+    def partitions(self):
+        self.cursor.execute("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+        """, [self.table])
+        months = {}
+        for (name,) in self.cursor.fetchall():
+            month = parse_partition_month(self.table, name)
+            if month is not None:
+                months[month] = name
+        return months
+
+    def missing_months(self, now):
+        existing = self.partitions()
+        first = month_start(now)
+        months = (add_months(first, offset) for offset in range(settings.PARTITION_MONTHS_AHEAD + 1))
+        return [month for month in months if month not in existing]
+
+    def expired_partitions(self, now):
+        cutoff = add_months(month_start(now), -self.policy['retention_months'])
+        return [name for month, name in sorted(self.partitions().items()) if month < cutoff]
+
+    def create(self, month):
+        # Rows for the month may already sit in the default partition, which
+        # would make a plain CREATE ... PARTITION OF fail; move them across.
+        name = partition_name(self.table, month)
+        start, end = bound(month), bound(add_months(month, 1))
+        self.cursor.execute(f'CREATE TABLE {name} (LIKE {self.table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        self.cursor.execute(f"""
+            WITH moved AS (
+                DELETE FROM {self.table}_default WHERE created_at >= {start} AND created_at < {end} RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """)
+        self.cursor.execute(f'ALTER TABLE {self.table} ATTACH PARTITION {name} FOR VALUES FROM ({start}) TO ({end})')
+        return name
+
+    def expire(self, name):
+        if self.policy['expire'] == 'detach':
+            # Kept as a standalone table to be dumped or moved to cheaper storage
+            self.cursor.execute(f'ALTER TABLE {self.table} DETACH PARTITION {name}')
+        else:
+            self.cursor.execute(f'DROP TABLE {name}')
@@ -0,0 +1,161 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models import Hearing, HearingReminder, Notification, UserProfile
+from .notifications import publish_notifications
+
+logger = logging.getLogger(__name__)
+
+
+def load_lawyer_profiles():
+    """
+    Case.lawyer_assigned is free text, so map each active profile's email,
+    username and full name (lowercased) to its id.
+    """
+    profiles = {}
+    rows = UserProfile.objects.filter(is_active=True, django_user__is_active=True).values_list(
+        'user_id', 'django_user__email', 'django_user__username',
+        'django_user__first_name', 'django_user__last_name',
+    )
+    for profile_id, email, username, first_name, last_name in rows:
+        for key in (email, username, f'{first_name} {last_name}'):
+            key = key.strip().lower()
+            if key:
+                profiles.setdefault(key, profile_id)
+    return profiles
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class ReminderScheduler:
+    """
+    Creates "upcoming hearing" notifications for the profile of each
+    scheduled hearing's assigned lawyer, HEARING_REMINDER_LEAD_MINUTES before
+    the hearing.
+
+    Each tick pages through the scheduled hearings due within the longest
+    lead time using hearings_upcoming_idx. It checks which reminders were
+    already sent with one query per page. New notifications and their
+    HearingReminder rows are bulk inserted in the same transaction, so a
+    tick can be repeated or restarted without sending anything twice. A
+    hearing first seen inside several lead times gets one notification.
+
+    ``run_once`` returns the tick's metrics. The lag is how long after it
+    fell due (or after the hearing was last saved, if later) a reminder was
+    sent; a growing lag means ticks are too slow or too far apart.
+    """
+    def __init__(self, lead_minutes=None, batch_size=None):
+        self.lead_minutes = sorted(lead_minutes or settings.HEARING_REMINDER_LEAD_MINUTES)
+        self.batch_size = batch_size or settings.HEARING_REMINDER_BATCH_SIZE
+
+    def run_once(self, now=None):
+        now = now or timezone.now()
+        started = timezone.now()
+        metrics = {'scanned': 0, 'created': 0, 'already_sent': 0, 'unmatched': 0, 'conflicts': 0}
+        lags = []
+        profiles = load_lawyer_profiles()
+        for page in self.due_hearings(now):
+            metrics['scanned'] += len(page)
+            self.process_page(page, profiles, now, metrics, lags)
+        # Reminders for past hearings can never be due again
+        HearingReminder.objects.filter(hearing_date__lt=now).delete()
+        metrics['max_lag_seconds'] = round(max(lags), 1) if lags else 0
+        metrics['p95_lag_seconds'] = round(percentile(lags, 0.95), 1) if lags else 0
+        metrics['duration_seconds'] = round((timezone.now() - started).total_seconds(), 3)
+        return metrics
+
+    def due_hearings(self, now):
+        hearings = (
+            Hearing.objects.filter(
+                status='scheduled', hearing_date__gt=now,
+                hearing_date__lte=now + timedelta(minutes=self.lead_minutes[-1]),
+            )
+            .annotate(case_title=F('case__case_title'), lawyer_assigned=F('case__lawyer_assigned'))
+            .order_by('hearing_date', 'hearing_id')
+            .values(
+                'hearing_id', 'hearing_date', 'hearing_type', 'location', 'updated_at',
+                'case_title', 'lawyer_assigned',
+            )
+        )
+        last = None
+        while True:
+            page = hearings
+            if last is not None:
+                page = page.filter(
+                    Q(hearing_date__gt=last['hearing_date'])
+                    | Q(hearing_date=last['hearing_date'], hearing_id__gt=last['hearing_id'])
+                )
+            page = list(page[:self.batch_size])
+            if not page:
+                return
+            yield page
+            if len(page) < self.batch_size:
+                return
+            last = page[-1]
+
+    def process_page(self, page, profiles, now, metrics, lags):
+        sent = set(
+            HearingReminder.objects.filter(hearing_id__in=[hearing['hearing_id'] for hearing in page])
+            .values_list('hearing_id', 'user_id', 'lead_minutes', 'hearing_date')
+        )
+        reminders = []
+        notifications = []
+        for hearing in page:
+            profile_id = profiles.get((hearing['lawyer_assigned'] or '').strip().lower())
+            if profile_id is None:
+                metrics['unmatched'] += 1
+                continue
+            key = (hearing['hearing_id'], profile_id)
+            due = [
+                lead for lead in self.lead_minutes
+                if hearing['hearing_date'] - timedelta(minutes=lead) <= now
+                and (*key, lead, hearing['hearing_date']) not in sent
+            ]
+            if not due:
+                metrics['already_sent'] += 1
+                continue
+            reminders.extend(
+                HearingReminder(
+                    hearing_id=hearing['hearing_id'], user_id=profile_id,
+                    lead_minutes=lead, hearing_date=hearing['hearing_date'],
+                )
+                for lead in due
+            )
+            notifications.append(self.build_notification(hearing, profile_id))
+            # The tightest lead is the one that fell due last
+            due_at = max(hearing['hearing_date'] - timedelta(minutes=due[0]), hearing['updated_at'])
+            lags.append(max((now - due_at).total_seconds(), 0))
+        if not notifications:
+            return
+        try:
+            with transaction.atomic():
+                HearingReminder.objects.bulk_create(reminders)
+                created = Notification.objects.bulk_create(notifications)
+                # bulk_create sends no post_save, so publish to the open streams here
+                publish_notifications(created)
+        except IntegrityError:
+            # Another scheduler sent this page first; its reminders stand
+            logger.warning('Reminder page already handled by another scheduler')
+            metrics['conflicts'] += 1
+            return
+        metrics['created'] += len(created)
+
+    def build_notification(self, hearing, profile_id):
+        starts = timezone.localtime(hearing['hearing_date'])
+        message = f"{hearing['hearing_type'] or 'Hearing'} on {starts:%b %d, %Y at %H:%M}"
+        if hearing['location']:
+            message += f" at {hearing['location']}"
+        return Notification(
+            user_id=profile_id,
+            title=f"Upcoming hearing: {hearing['case_title']}",
+            message=message,
+            type='info',
+        )
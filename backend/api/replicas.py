@@ -0,0 +1,189 @@
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, transaction
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+TABLE_WRITTEN_PREFIX = 'table-written:'
+USER_WRITTEN_PREFIX = 'user-written:'
+
+# The replica the current request reads from; None means the primary
+current_replica = ContextVar('current_replica', default=None)
+
+replica_status_lock = threading.Lock()
+replica_status = {}  # alias -> (checked_at, healthy)
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the replica ReplicaReadMixin chose for the current
+    request, everything else to the primary ('default'). Replicas are
+    copies of the primary, so nothing is migrated on them.
+    """
+    def db_for_read(self, model, **hints):
+        return current_replica.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+@sync_and_async_middleware
+def replica_middleware(get_response):
+    """
+    Keeps a user's reads on the primary for READ_REPLICA_STICKY_SECONDS
+    after a successful POST/PUT/PATCH/DELETE, so they see their own writes.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = current_replica.set(None)
+            try:
+                response = await get_response(request)
+            finally:
+                current_replica.reset(token)
+            note_request_write(request, response)
+            return response
+    else:
+        def middleware(request):
+            token = current_replica.set(None)
+            try:
+                response = get_response(request)
+            finally:
+                current_replica.reset(token)
+            note_request_write(request, response)
+            return response
+    return middleware
+
+
+def note_request_write(request, response):
+    # request.user is the user DRF authenticated, e.g. from the JWT
+    user = getattr(request, 'user', None)
+    if (
+        settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS
+        and response.status_code < 400 and user is not None and user.is_authenticated
+    ):
+        cache.set(f'{USER_WRITTEN_PREFIX}{user.pk}', True, settings.READ_REPLICA_STICKY_SECONDS)
+
+
+def note_table_write(model):
+    """
+    Keep reads of ``model``'s table on the primary until the replicas have
+    had READ_REPLICA_MAX_LAG seconds to apply the write. Otherwise a replica
+    read could cache old rows under the table version the write created.
+    """
+    if settings.DATABASE_REPLICAS:
+        key = TABLE_WRITTEN_PREFIX + model._meta.db_table
+        transaction.on_commit(lambda: cache.set(key, True, settings.READ_REPLICA_MAX_LAG))
+
+
+def check_replica(alias):
+    connection = connections[alias]
+    try:
+        connection.ensure_connection()
+        if connection.vendor != 'postgresql':
+            return True
+        with connection.cursor() as cursor:
+            # Replay timestamps stop moving while the primary is idle, so
+            # a replica that has replayed everything it received is current
+            cursor.execute(
+                'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+                'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+            )
+            lag = cursor.fetchone()[0]
+    except DatabaseError as exc:
+        logger.warning('Read replica %s unavailable: %s', alias, exc)
+        return False
+    if lag is not None and lag > settings.READ_REPLICA_MAX_LAG:
+        logger.warning('Read replica %s is %.1fs behind', alias, lag)
+        return False
+    return True
+
+
+def replica_is_healthy(alias):
+    now = time.monotonic()
+    with replica_status_lock:
+        checked_at, healthy = replica_status.get(alias, (None, None))
+    if checked_at is None or now - checked_at >= settings.READ_REPLICA_CHECK_INTERVAL:
+        healthy = check_replica(alias)
+        with replica_status_lock:
+            replica_status[alias] = (now, healthy)
+    return healthy
+
+
+def mark_replica_down(alias):
+    with replica_status_lock:
+        replica_status[alias] = (time.monotonic(), False)
+
+
+def fall_back_to_primary(exc):
+    """
+    If ``exc`` is a failed read from the current replica, marks the replica
+    down, switches the request to the primary and returns True: the caller
+    should run the read again.
+    """
+    alias = current_replica.get()
+    if alias is None or not isinstance(exc, DatabaseError):
+        return False
+    logger.warning('Read from replica %s failed, retrying on the primary: %s', alias, exc)
+    mark_replica_down(alias)
+    current_replica.set(None)
+    return True
+
+
+def choose_replica(user, models):
+    """
+    A healthy replica for a read of ``models`` tables, or None when the read
+    must go to the primary: no replicas are configured or reachable, the
+    user wrote recently, or one of the tables did.
+    """
+    if not settings.DATABASE_REPLICAS:
+        return None
+    keys = [TABLE_WRITTEN_PREFIX + model._meta.db_table for model in models]
+    if user is not None and user.is_authenticated:
+        keys.append(f'{USER_WRITTEN_PREFIX}{user.pk}')
+    if cache.get_many(keys):
+        return None
+    aliases = list(settings.DATABASE_REPLICAS)
+    random.shuffle(aliases)
+    for alias in aliases:
+        if replica_is_healthy(alias):
+            return alias
+    return None
+
+
+class ReplicaReadMixin:
+    """
+    For APIViews: GET/HEAD requests read from a replica when
+    choose_replica() allows it for ``replica_models``, the tables the view
+    reads. If the replica fails during the request it is marked down and
+    the handler runs again on the primary.
+    """
+    replica_models = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)  # authenticates the user first
+        if request.method in SAFE_METHODS:
+            current_replica.set(choose_replica(request.user, self.replica_models))
+
+    def handle_exception(self, exc):
+        if fall_back_to_primary(exc):
+            handler = getattr(self, self.request.method.lower())
+            try:
+                return handler(self.request, *self.args, **self.kwargs)
+            except Exception as retry_exc:
+                exc = retry_exc
+        return super().handle_exception(exc)
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.db.models import F
+
+from core.models import Case, Hearing
+
+
+def get_case_lawyer(case_id):
+    return Case.objects.filter(case_id=case_id).values_list('lawyer_assigned', flat=True).first()
+
+
+def find_conflicts(start, duration_minutes, lawyer=None, judge_name=None, location=None, exclude_pk=None):
+    """
+    Scheduled hearings overlapping [start, start + duration) that share the
+    lawyer, judge or location, each with the resources it clashes on.
+    Served by the GiST period indexes from core migration 0005.
+    """
+    end = start + timedelta(minutes=duration_minutes)
+    rows = (
+        Hearing.objects.conflicting(start, end, lawyer, judge_name, location, exclude_pk)
+        .annotate(case_title=F('case__case_title'), lawyer_assigned=F('case__lawyer_assigned'))
+        .order_by('hearing_date', 'hearing_id')
+        .values(
+            'hearing_id', 'case_id', 'case_title', 'hearing_date', 'ends_at',
+            'lawyer_assigned', 'judge_name', 'location',
+        )
+    )
+    conflicts = []
+    for row in rows:
+        clashes = {
+            'lawyer': bool(lawyer) and row['lawyer_assigned'] == lawyer,
+            'judge': bool(judge_name) and row['judge_name'] == judge_name,
+            'location': bool(location) and row['location'] == location,
+        }
+        row['conflicts_on'] = [name for name, clash in clashes.items() if clash]
+        conflicts.append(row)
+    return conflicts
@@ -0,0 +1,147 @@
+import html
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.functions import Coalesce, Concat
+
+from core.models import Client, Case, Hearing
+
+SEARCH_CONFIG = 'english'
+
+# ts_headline does not escape the document, so matches are delimited with
+# control characters and only turned into <mark> after escaping the text
+MATCH_START, MATCH_STOP = '\x02', '\x03'
+
+
+def text_of(*field_names):
+    parts = []
+    for field_name in field_names:
+        if parts:
+            parts.append(Value(' ', output_field=TextField()))
+        parts.append(Coalesce(field_name, Value(''), output_field=TextField()))
+    return Concat(*parts, output_field=TextField())
+
+
+def to_highlight(headline):
+    """ts_headline output as HTML: the text escaped, the matches in <mark>."""
+    if not headline:
+        return None
+    return html.escape(headline).replace(MATCH_START, '<mark>').replace(MATCH_STOP, '</mark>')
+
+
+class SearchTarget:
+    """
+    One searchable table. On PostgreSQL hits come from the trigger-maintained
+    ``search_vector`` column (GIN indexed) and are ranked with ts_rank and
+    highlighted with ts_headline; other databases fall back to icontains so
+    the endpoint keeps working in development.
+    """
+    type = None
+    text_fields = ()
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def to_hit(self, row):
+        raise NotImplementedError
+
+    def search(self, term, limit):
+        queryset = self.get_queryset()
+        if connections[queryset.db].vendor == 'postgresql':
+            query = SearchQuery(term, search_type='websearch', config=SEARCH_CONFIG)
+            queryset = queryset.filter(search_vector=query).annotate(
+                rank=SearchRank(F('search_vector'), query),
+                highlight=SearchHeadline(
+                    text_of(*self.text_fields), query, config=SEARCH_CONFIG,
+                    start_sel=MATCH_START, stop_sel=MATCH_STOP, max_fragments=2,
+                ),
+            ).order_by('-rank', '-pk')
+        else:
+            condition = Q()
+            for field_name in self.text_fields:
+                condition |= Q(**{f'{field_name}__icontains': term})
+            queryset = queryset.filter(condition).annotate(
+                rank=Value(None, output_field=FloatField()),
+                highlight=Value(None, output_field=TextField()),
+            ).order_by('-pk')
+
+        hits = []
+        for row in queryset[:limit]:
+            hit = self.to_hit(row)
+            hit.update({'type': self.type, 'rank': row.rank, 'highlight': to_highlight(row.highlight)})
+            hits.append(hit)
+        return hits
+
+
+class ClientSearch(SearchTarget):
+    type = 'client'
+    text_fields = ('first_name', 'middle_name', 'last_name', 'email', 'phone_number', 'opposing_parties', 'notes')
+
+    def get_queryset(self):
+        return Client.objects.only('client_id', 'first_name', 'last_name', 'email')
+
+    def to_hit(self, client):
+        return {
+            'id': client.client_id,
+            'title': f'{client.first_name} {client.last_name}',
+            'subtitle': client.email,
+        }
+
+
+class CaseSearch(SearchTarget):
+    type = 'case'
+    text_fields = ('case_title', 'case_type', 'description')
+
+    def get_queryset(self):
+        return Case.objects.with_client_name().only('case_id', 'case_title', 'status')
+
+    def to_hit(self, case):
+        return {
+            'id': case.case_id,
+            'title': case.case_title,
+            'subtitle': case.client_name,
+            'status': case.status,
+        }
+
+
+class HearingSearch(SearchTarget):
+    type = 'hearing'
+    text_fields = ('judge_name', 'location', 'hearing_type', 'notes')
+
+    def get_queryset(self):
+        return Hearing.objects.with_case_details().only('hearing_id', 'hearing_date', 'judge_name', 'status')
+
+    def to_hit(self, hearing):
+        return {
+            'id': hearing.hearing_id,
+            'title': hearing.case_title,
+            'subtitle': hearing.judge_name,
+            'status': hearing.status,
+            'hearing_date': hearing.hearing_date,
+        }
+
+
+SEARCH_TARGETS = {
+    'clients': ClientSearch(),
+    'cases': CaseSearch(),
+    'hearings': HearingSearch(),
+}
+
+
+def search(term, types, offset, limit):
+    """
+    Returns ``limit`` hits starting at ``offset`` across ``types``, merged by
+    rank, plus whether more hits exist. Each table is asked for at most
+    ``offset + limit + 1`` rows so deep pages stay bounded by
+    SEARCH_MAX_RESULTS rather than by table size.
+    """
+    window = offset + limit + 1
+    hits = []
+    for type_name in types:
+        hits.extend(SEARCH_TARGETS[type_name].search(term, window))
+    hits.sort(key=lambda hit: hit['rank'] or 0, reverse=True)
+    page = hits[offset:offset + limit]
+    has_more = len(hits) > offset + limit and offset + limit < settings.SEARCH_MAX_RESULTS
+    return page, has_more
@@ -1,6 +1,66 @@
-from rest_framework import serializers
+from functools import cache
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from django.contrib.auth.models import User
 from core.models import Client, Case, Hearing, Notification, UserProfile
+from .scheduling import find_conflicts, get_case_lawyer
+
+@cache
+def get_readable_fields(serializer_class):
+    return tuple(name for name, field in serializer_class().fields.items() if not field.write_only)
+
+def parse_field_names(params, param):
+    raw = params.get(param)
+    if raw is None:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+def get_fieldset(params, serializer_class):
+    """
+    The fields picked by ``?fields=a,b`` and/or ``?exclude=c,d`` from
+    ``serializer_class``'s output, in its order, or None for all of them.
+    """
+    fields = parse_field_names(params, 'fields')
+    exclude = parse_field_names(params, 'exclude')
+    if fields is None and exclude is None:
+        return None
+    available = get_readable_fields(serializer_class)
+    for param, names in (('fields', fields), ('exclude', exclude)):
+        unknown = sorted((names or set()) - set(available))
+        if unknown:
+            raise serializers.ValidationError(
+                {param: f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}."}
+            )
+    selected = tuple(
+        name for name in available if (fields is None or name in fields) and name not in (exclude or ())
+    )
+    if not selected:
+        raise serializers.ValidationError({'fields': 'Select at least one field.'})
+    return selected
+
+class SparseFieldsMixin:
+    """
+    ``fields=`` (see get_fieldset()) limits the output to those fields. Pair
+    it with ``only_fields()`` on the queryset so the rest are not loaded.
+    """
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+    
+    @classmethod
+    def only_fields(cls, queryset, fields):
+        if fields is None:
+            return queryset
+        # Model columns behind the selected fields; annotations stay as they are
+        serializer_fields = cls().fields
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        sources = {serializer_fields[name].source for name in fields}
+        return queryset.only(queryset.model._meta.pk.name, *sorted(sources & concrete))
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -17,23 +77,26 @@ class UserSerializer(serializers.ModelSerializer):
         )
         return user
 
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Client
-        fields = '__all__'
+        exclude = ('search_vector',)
 
-class CaseSerializer(serializers.ModelSerializer):
+class CaseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     client_name = serializers.SerializerMethodField(read_only=True)
     client_id = serializers.IntegerField(write_only=True)
     
     class Meta:
         model = Case
-        fields = '__all__'
+        exclude = ('search_vector',)
         extra_kwargs = {
             'client': {'read_only': True}
         }
     
     def get_client_name(self, obj):
+        # Annotated in SQL by Case.objects.with_client_name()
+        if hasattr(obj, 'client_name'):
+            return obj.client_name
         return f"{obj.client.first_name} {obj.client.last_name}"
     
     def create(self, validated_data):
@@ -42,36 +105,114 @@ class CaseSerializer(serializers.ModelSerializer):
         validated_data['client'] = client
         return super().create(validated_data)
 
-class HearingSerializer(serializers.ModelSerializer):
+# Changing any of these can create or move a hearing conflict
+SCHEDULING_FIELDS = frozenset(('hearing_date', 'duration_minutes', 'case_id', 'judge_name', 'location', 'status'))
+
+class HearingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     case_title = serializers.SerializerMethodField(read_only=True)
     client_name = serializers.SerializerMethodField(read_only=True)
     case_id = serializers.IntegerField(write_only=True, required=False)
+    # Save even if the lawyer, judge or location is already booked then
+    allow_conflicts = serializers.BooleanField(write_only=True, required=False, default=False)
     
     class Meta:
         model = Hearing
-        fields = '__all__'
+        exclude = ('search_vector',)
         extra_kwargs = {
             'case': {'read_only': True}
         }
     
+    # Both are annotated in SQL by Hearing.objects.with_case_details()
     def get_case_title(self, obj):
+        if hasattr(obj, 'case_title'):
+            return obj.case_title
         return obj.case.case_title
     
     def get_client_name(self, obj):
+        if hasattr(obj, 'client_name'):
+            return obj.client_name
         return f"{obj.case.client.first_name} {obj.case.client.last_name}"
     
+    def validate(self, attrs):
+        allow_conflicts = attrs.pop('allow_conflicts', False)
+        # HearingBulkWriter turns this off; bulk writes are not checked
+        if allow_conflicts or not self.context.get('check_conflicts', True):
+            return attrs
+        instance = self.instance
+        # Edits that leave the booking alone (e.g. only the notes) are not
+        # rechecked, so a hearing saved with allow_conflicts stays editable
+        if instance is not None and not SCHEDULING_FIELDS.intersection(attrs):
+            return attrs
+        
+        def current(name, default=None):
+            return attrs[name] if name in attrs else getattr(instance, name, default)
+        
+        if current('status', 'scheduled') != 'scheduled' or current('hearing_date') is None:
+            return attrs
+        if 'case_id' in attrs:
+            lawyer = get_case_lawyer(attrs['case_id'])
+        else:
+            lawyer = instance.case.lawyer_assigned if instance is not None else None
+        conflicts = find_conflicts(
+            current('hearing_date'), current('duration_minutes', 60),
+            lawyer=lawyer, judge_name=current('judge_name'), location=current('location'),
+            exclude_pk=instance.pk if instance is not None else None,
+        )
+        if conflicts:
+            raise serializers.ValidationError({'hearing_date': [
+                f"Conflicts with hearing {conflict['hearing_id']} ({conflict['case_title']}) "
+                f"from {conflict['hearing_date'].isoformat()} to {conflict['ends_at'].isoformat()}: "
+                f"same {', '.join(conflict['conflicts_on'])}."
+                for conflict in conflicts
+            ]})
+        return attrs
+    
     def create(self, validated_data):
         case_id = validated_data.pop('case_id')
-        case = Case.objects.get(case_id=case_id)
+        case = Case.objects.select_related('client').get(case_id=case_id)
         validated_data['case'] = case
         return super().create(validated_data)
     
     def update(self, instance, validated_data):
         if 'case_id' in validated_data:
             case_id = validated_data.pop('case_id')
-            instance.case = Case.objects.get(case_id=case_id)
+            instance.case = Case.objects.select_related('client').get(case_id=case_id)
         return super().update(instance, validated_data)
 
+class HearingConflictQuerySerializer(serializers.Serializer):
+    hearing_date = serializers.DateTimeField()
+    duration_minutes = serializers.IntegerField(min_value=1, default=60)
+    case_id = serializers.IntegerField(required=False)
+    lawyer = serializers.CharField(required=False)
+    judge_name = serializers.CharField(required=False)
+    location = serializers.CharField(required=False)
+    # The hearing being edited, so it does not conflict with itself
+    exclude = serializers.IntegerField(required=False)
+
+class HearingCalendarQuerySerializer(serializers.Serializer):
+    start = serializers.DateTimeField(input_formats=['iso-8601', '%Y-%m-%d'])
+    end = serializers.DateTimeField(input_formats=['iso-8601', '%Y-%m-%d'])
+    lawyer = serializers.CharField(required=False)
+    status = serializers.ChoiceField(choices=Hearing.STATUS_CHOICES, required=False)
+    
+    def validate(self, attrs):
+        if attrs['end'] <= attrs['start']:
+            raise serializers.ValidationError({'end': ['Must be after start.']})
+        if (attrs['end'] - attrs['start']).days > settings.HEARING_CALENDAR_MAX_DAYS:
+            raise serializers.ValidationError({'end': [f'The window is limited to {settings.HEARING_CALENDAR_MAX_DAYS} days.']})
+        return attrs
+
+class HearingConflictSerializer(serializers.Serializer):
+    hearing_id = serializers.IntegerField()
+    case_id = serializers.IntegerField()
+    case_title = serializers.CharField()
+    hearing_date = serializers.DateTimeField()
+    ends_at = serializers.DateTimeField()
+    lawyer_assigned = serializers.CharField()
+    judge_name = serializers.CharField()
+    location = serializers.CharField()
+    conflicts_on = serializers.ListField(child=serializers.CharField())
+
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
@@ -90,3 +231,86 @@ class UserProfileSerializer(serializers.ModelSerializer):
     
     def get_username(self, obj):
         return obj.django_user.username
+
+class FastSerializer:
+    """
+    Read-only list counterpart of ``serializer_class`` for the large list
+    endpoints. Rows come from ``get_values(queryset)`` and become dicts with
+    the same keys, order and values the ModelSerializer produces, without
+    its per-row field machinery: text, integer and boolean columns are
+    copied as they are and ISO datetimes are formatted inline; other fields
+    still go through to_representation(). SerializerMethodFields are read
+    from the annotation of the same name.
+    """
+    serializer_class = None
+    # to_representation() returns database values of these unchanged
+    passthrough_fields = (
+        serializers.BooleanField, serializers.CharField, serializers.IntegerField,
+        serializers.PrimaryKeyRelatedField, serializers.ReadOnlyField, serializers.SerializerMethodField,
+    )
+    
+    def __init__(self, rows, fields=None):
+        self.rows = rows
+        self.fields = fields
+    
+    @classmethod
+    def get_columns(cls, fields=None):
+        # Built once per subclass: (output key, values() key, serializer field)
+        if '_columns' not in cls.__dict__:
+            cls._columns = [
+                (name, name if field.source == '*' else field.source.replace('.', '__'), field)
+                for name, field in cls.serializer_class().fields.items()
+                if not field.write_only
+            ]
+        if fields is None:
+            return cls._columns
+        return [column for column in cls._columns if column[0] in fields]
+    
+    @classmethod
+    def get_values(cls, queryset, fields=None, extra=()):
+        """
+        Selects only the columns behind ``fields`` (see get_fieldset()), plus
+        ``extra`` ones the caller needs, such as the keyset ordering.
+        """
+        sources = [source for _, source, _ in cls.get_columns(fields)]
+        return queryset.values(*dict.fromkeys([*sources, *extra]))
+    
+    def get_converter(self, field, tz):
+        if isinstance(field, self.passthrough_fields):
+            return None
+        if (
+            type(field) is serializers.DateTimeField and tz is not None and not hasattr(field, 'timezone')
+            and getattr(field, 'format', api_settings.DATETIME_FORMAT).lower() == ISO_8601
+        ):
+            # DateTimeField.to_representation() for the aware values the ORM returns
+            def convert(value):
+                text = value.astimezone(tz).isoformat()
+                return text[:-6] + 'Z' if text.endswith('+00:00') else text
+            return convert
+        return field.to_representation
+    
+    @property
+    def data(self):
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        columns = [
+            (name, source, self.get_converter(field, tz)) for name, source, field in self.get_columns(self.fields)
+        ]
+        data = []
+        for row in self.rows:
+            item = {}
+            for name, source, convert in columns:
+                value = row[source]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+class FastClientSerializer(FastSerializer):
+    serializer_class = ClientSerializer
+
+class FastCaseSerializer(FastSerializer):
+    # Needs Case.objects.with_client_name()
+    serializer_class = CaseSerializer
+
+class FastHearingSerializer(FastSerializer):
+    # Needs Hearing.objects.with_case_details()
+    serializer_class = HearingSerializer
@@ -0,0 +1,121 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.contrib.auth.models import User
+from django.dispatch import receiver
+
+from core.models import Client, Case, Hearing, Notification, Tombstone, UserProfile
+from .audit import audited_values, load_current_values, record_change, snapshot_values
+from .authentication import invalidate_cached_user
+from .caching import bump_table_version
+from .notifications import publish_notifications
+from .replicas import note_table_write
+from .stats import invalidate_dashboard_stats
+
+# model -> ids deleted inside collect_deletions(); None outside it
+pending_deletions = ContextVar('pending_deletions', default=None)
+
+
+def invalidate_model_caches(model):
+    """
+    Expire everything cached from ``model``'s table. Called from the signals
+    below and directly by code paths that skip them (bulk_create/bulk_update).
+    """
+    bump_table_version(model)
+    invalidate_dashboard_stats()
+    note_table_write(model)
+
+
+@contextmanager
+def collect_deletions():
+    """
+    Batches the bookkeeping for the rows deleted inside the block, cascades
+    included: one tombstone INSERT and one cache invalidation per model
+    instead of one of each per row. Both happen in the deleting transaction.
+    """
+    deleted = {}
+    token = pending_deletions.set(deleted)
+    try:
+        with transaction.atomic():
+            yield
+            Tombstone.objects.bulk_create([
+                Tombstone(table_name=model._meta.db_table, record_id=pk)
+                for model, ids in deleted.items() for pk in ids
+            ], batch_size=1000)
+            for model in deleted:
+                invalidate_model_caches(model)
+    finally:
+        pending_deletions.reset(token)
+
+
+@receiver(post_save, sender=Client, dispatch_uid='invalidate_client_caches')
+@receiver(post_save, sender=Case, dispatch_uid='invalidate_case_caches')
+@receiver(post_save, sender=Hearing, dispatch_uid='invalidate_hearing_caches')
+def expire_model_caches(sender, **kwargs):
+    invalidate_model_caches(sender)
+
+
+@receiver(post_init, sender=Client, dispatch_uid='audit_client_loaded')
+@receiver(post_init, sender=Case, dispatch_uid='audit_case_loaded')
+@receiver(post_init, sender=Hearing, dispatch_uid='audit_hearing_loaded')
+def snapshot_audited_values(sender, instance, **kwargs):
+    if settings.AUDIT_ENABLED:
+        instance._audit_snapshot = snapshot_values(instance)
+
+
+@receiver(pre_save, sender=Client, dispatch_uid='audit_client_before_save')
+@receiver(pre_save, sender=Case, dispatch_uid='audit_case_before_save')
+@receiver(pre_save, sender=Hearing, dispatch_uid='audit_hearing_before_save')
+def remember_audited_values(sender, instance, raw=False, **kwargs):
+    if settings.AUDIT_ENABLED and not raw:
+        instance._audit_old_values = load_current_values(instance)
+
+
+@receiver(post_save, sender=Client, dispatch_uid='audit_client_save')
+@receiver(post_save, sender=Case, dispatch_uid='audit_case_save')
+@receiver(post_save, sender=Hearing, dispatch_uid='audit_hearing_save')
+def audit_save(sender, instance, created, raw=False, **kwargs):
+    if settings.AUDIT_ENABLED and not raw:
+        old_values = getattr(instance, '_audit_old_values', None)
+        record_change(instance, 'create' if created else 'update', old_values)
+        instance._audit_snapshot = snapshot_values(instance)
+
+
+@receiver(post_delete, sender=Client, dispatch_uid='audit_client_delete')
+@receiver(post_delete, sender=Case, dispatch_uid='audit_case_delete')
+@receiver(post_delete, sender=Hearing, dispatch_uid='audit_hearing_delete')
+def audit_delete(sender, instance, **kwargs):
+    if settings.AUDIT_ENABLED:
+        record_change(instance, 'delete', audited_values(instance))
+
+
+@receiver(post_delete, sender=Client, dispatch_uid='tombstone_client')
+@receiver(post_delete, sender=Case, dispatch_uid='tombstone_case')
+@receiver(post_delete, sender=Hearing, dispatch_uid='tombstone_hearing')
+def record_deletion(sender, instance, **kwargs):
+    # Tombstones let /api/sync/ tell offline copies about deletions
+    deleted = pending_deletions.get()
+    if deleted is not None:
+        deleted.setdefault(sender, []).append(instance.pk)
+        return
+    Tombstone.objects.create(table_name=sender._meta.db_table, record_id=instance.pk)
+    invalidate_model_caches(sender)
+
+
+@receiver([post_save, post_delete], sender=User, dispatch_uid='invalidate_cached_user')
+def expire_cached_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=UserProfile, dispatch_uid='invalidate_cached_user_profile')
+def expire_cached_user_profile(sender, instance, **kwargs):
+    invalidate_cached_user(instance.django_user_id)
+
+
+@receiver(post_save, sender=Notification, dispatch_uid='publish_notification')
+def publish_new_notification(sender, instance, created, **kwargs):
+    if created:
+        publish_notifications([instance])
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.models import Client, Case, Hearing
+
+DASHBOARD_STATS_CACHE_KEY = 'dashboard:stats'
+
+
+def compute_dashboard_stats():
+    now = timezone.now()
+
+    case_totals = Case.objects.aggregate(
+        total=Count('case_id'),
+        **{f'status_{value}': Count('case_id', filter=Q(status=value)) for value, _ in Case.STATUS_CHOICES},
+        **{f'priority_{value}': Count('case_id', filter=Q(priority=value)) for value, _ in Case.PRIORITY_CHOICES},
+    )
+    by_lawyer = list(
+        Case.objects.values('lawyer_assigned')
+        .annotate(total=Count('case_id'), active=Count('case_id', filter=Q(status='active')))
+        .order_by('-total', 'lawyer_assigned')
+    )
+    per_client = {
+        row['client_id']: row['total']
+        for row in Case.objects.values('client_id').annotate(total=Count('case_id')).order_by()
+    }
+
+    upcoming = Hearing.objects.filter(status='scheduled', hearing_date__gte=now)
+    upcoming_hearings = list(
+        upcoming.with_case_details()
+        .order_by('hearing_date', 'hearing_id')
+        .values('hearing_id', 'case_id', 'case_title', 'client_name', 'hearing_date',
+                'hearing_type', 'location')[:settings.DASHBOARD_UPCOMING_HEARINGS]
+    )
+
+    return {
+        'clients': {
+            'total': Client.objects.count(),
+        },
+        'cases': {
+            'total': case_totals['total'],
+            'by_status': {value: case_totals[f'status_{value}'] for value, _ in Case.STATUS_CHOICES},
+            'by_priority': {value: case_totals[f'priority_{value}'] for value, _ in Case.PRIORITY_CHOICES},
+            'by_lawyer': by_lawyer,
+            'per_client': per_client,
+        },
+        'hearings': {
+            'upcoming_week': upcoming.filter(hearing_date__lt=now + timedelta(days=7)).count(),
+            'upcoming': upcoming_hearings,
+        },
+        'generated_at': now,
+    }
+
+
+def get_dashboard_stats():
+    stats = cache.get(DASHBOARD_STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        cache.set(DASHBOARD_STATS_CACHE_KEY, stats, settings.DASHBOARD_STATS_TIMEOUT)
+    return stats
+
+
+def invalidate_dashboard_stats():
+    # Delete now and again after commit, so a request that recomputes while
+    # the writing transaction is still open cannot cache pre-commit numbers.
+    cache.delete(DASHBOARD_STATS_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(DASHBOARD_STATS_CACHE_KEY))
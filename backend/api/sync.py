@@ -0,0 +1,163 @@
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.models import Client, Case, Hearing, Tombstone
+from .serializers import ClientSerializer, CaseSerializer, HearingSerializer
+
+
+class SyncEntity:
+    def __init__(self, name, queryset, serializer_class):
+        self.name = name
+        # last_modified also covers the related rows the payload shows
+        # (client_name, case_title), so renaming a client resends its cases
+        self.queryset = queryset.with_last_modified()
+        self.serializer_class = serializer_class
+        self.table_name = queryset.model._meta.db_table
+
+
+SYNC_ENTITIES = [
+    SyncEntity('clients', Client.objects.all(), ClientSerializer),
+    SyncEntity('cases', Case.objects.with_client_name(), CaseSerializer),
+    SyncEntity('hearings', Hearing.objects.with_case_details(), HearingSerializer),
+]
+
+# Foreign keys to the rows each payload shows fields of
+RELATED_FIELDS = {
+    Case: ('client',),
+    Hearing: ('case',),
+}
+
+
+class SyncTokenError(ValueError):
+    pass
+
+
+class SyncTokenExpired(SyncTokenError):
+    pass
+
+
+def encode_token(state):
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def read_datetime(value):
+    try:
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+    except ValueError:  # well formed but out of range, e.g. February 30
+        parsed = None
+    if parsed is None or timezone.is_naive(parsed):
+        raise SyncTokenError('Invalid sync token.')
+    return parsed
+
+
+def decode_token(token):
+    """
+    Token state: ``s`` is the watermark the changes are read from (None for
+    a full sync); while a sync is being paged, ``u`` is when it started and
+    ``c`` the last (updated_at, id) sent per entity.
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise SyncTokenError('Invalid sync token.')
+    if not isinstance(state, dict) or not isinstance(state.get('c', {}), dict):
+        raise SyncTokenError('Invalid sync token.')
+    since = read_datetime(state['s']) if state.get('s') is not None else None
+    if since is not None and since < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+        # Deletions older than this have been pruned
+        raise SyncTokenExpired('Sync token expired; start again with a full sync.')
+    cursors = {}
+    for name, cursor in state.get('c', {}).items():
+        if not isinstance(cursor, list) or len(cursor) != 2 or not isinstance(cursor[1], int):
+            raise SyncTokenError('Invalid sync token.')
+        cursors[name] = (read_datetime(cursor[0]), cursor[1])
+    started = read_datetime(state['u']) if 'u' in state else None
+    return since, started, cursors if 'c' in state else None
+
+
+def changed_since(model, moment):
+    """
+    Primary keys of ``model`` rows saved since ``moment`` or showing a
+    related row that was: a union of lookups on the updated_at and foreign
+    key indexes, rather than a scan comparing last_modified on every row.
+    """
+    changed = model.objects.filter(updated_at__gte=moment).values('pk')
+    for field_name in RELATED_FIELDS.get(model, ()):
+        related_model = model._meta.get_field(field_name).related_model
+        changed = changed.union(
+            model.objects.filter(**{f'{field_name}__in': changed_since(related_model, moment)}).values('pk')
+        )
+    return changed
+
+
+def get_changes(token=None):
+    """
+    Rows of every SYNC_ENTITIES table changed since the token's watermark,
+    oldest first by (last_modified, id), and the ids deleted since then. A
+    full sync pages by the rows' own indexed (updated_at, id) instead: it
+    sends every row anyway, and related changes made while it runs are
+    after the next watermark.
+
+    At most SYNC_PAGE_SIZE rows per table are returned. ``has_more`` says to
+    call again with ``next`` straight away.
+
+    The next watermark is SYNC_OVERLAP_SECONDS before the sync started, so
+    rows committed late by a concurrent transaction are not skipped. Such
+    rows may be sent twice; clients apply them as upserts.
+    """
+    since, started, cursors = decode_token(token) if token else (None, None, None)
+    started = started or timezone.now()
+    first_page = cursors is None
+    cursors = cursors or {}
+    has_more = False
+    data = {}
+    next_cursors = {}
+    for entity in SYNC_ENTITIES:
+        queryset = entity.queryset.all()
+        if since is None:
+            order_field = 'updated_at'
+        else:
+            order_field = 'last_modified'
+            queryset = queryset.filter(pk__in=changed_since(queryset.model, since))
+        cursor = cursors.get(entity.name)
+        if cursor is not None:
+            queryset = queryset.filter(
+                Q(**{f'{order_field}__gt': cursor[0]}) | Q(**{order_field: cursor[0], 'pk__gt': cursor[1]})
+            )
+        rows = list(queryset.order_by(order_field, 'pk')[:settings.SYNC_PAGE_SIZE + 1])
+        if len(rows) > settings.SYNC_PAGE_SIZE:
+            has_more = True
+            rows = rows[:settings.SYNC_PAGE_SIZE]
+        if rows:
+            next_cursors[entity.name] = [getattr(rows[-1], order_field).isoformat(), rows[-1].pk]
+        elif cursor is not None:
+            next_cursors[entity.name] = [cursor[0].isoformat(), cursor[1]]
+
+        deleted = []
+        if since is not None and first_page:
+            deleted = list(
+                Tombstone.objects.filter(table_name=entity.table_name, deleted_at__gte=since)
+                .order_by('record_id').values_list('record_id', flat=True).distinct()
+            )
+        data[entity.name] = {
+            'updated': entity.serializer_class(rows, many=True).data,
+            'deleted': deleted,
+        }
+
+    if has_more:
+        state = {'s': since.isoformat() if since else None, 'u': started.isoformat(), 'c': next_cursors}
+    else:
+        state = {'s': (started - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)).isoformat()}
+    return {**data, 'next': encode_token(state), 'has_more': has_more}
+
+
+def prune_tombstones(now=None):
+    cutoff = (now or timezone.now()) - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    return Tombstone.objects.filter(deleted_at__lt=cutoff).delete()[0]
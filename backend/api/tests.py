@@ -1,3 +1,1557 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, connections
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.async_views import (
+    AsyncCaseDetailView, AsyncCaseListView, AsyncClientListView, AsyncHearingDetailView, AsyncHearingListView,
+    NotificationStreamView,
+)
+from api.audit import AuditWriter, write_admin_logs
+from api.authentication import CachedJWTAuthentication, user_cache_key
+from api.backends import EmailBackend
+from api.compression import choose_encoding, endpoint_stats
+from api.ical import fold, render_event
+from api.notifications import broker
+from api.partitions import PartitionManager, parse_partition_month, partition_name
+from api.reminders import ReminderScheduler
+from api.renderers import ORJSONRenderer
+from api.replicas import ReplicaRouter, choose_replica, current_replica, replica_status
+from api.serializers import (
+    CaseSerializer, ClientSerializer, FastCaseSerializer, FastClientSerializer, FastHearingSerializer,
+    HearingSerializer,
+)
+from api.search import to_highlight
+from api.sync import encode_token, prune_tombstones
+from api.views import ClientListView
+from core.models import AdminLog, Client, Case, Hearing, HearingReminder, Notification, Tombstone, UserProfile
+
+
+class APITestMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('lawyer@example.com', 'lawyer@example.com', 'testpass123')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def create_client(self, index=0, **kwargs):
+        data = {
+            'first_name': f'First{index}',
+            'last_name': f'Last{index}',
+            'email': f'client{index}@example.com',
+        }
+        data.update(kwargs)
+        return Client.objects.create(**data)
+
+    def create_case(self, client, index=0, **kwargs):
+        data = {'client': client, 'case_title': f'Case {index}'}
+        data.update(kwargs)
+        return Case.objects.create(**data)
+
+    def create_hearing(self, case, **kwargs):
+        data = {'case': case, 'hearing_date': timezone.now() + timedelta(days=1)}
+        data.update(kwargs)
+        return Hearing.objects.create(**data)
+
+
+class KeysetPaginationTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client_obj = self.create_client()
+        self.cases = [self.create_case(self.client_obj, index) for index in range(5)]
+        # Shared created_at forces the case_id tie-breaker to keep pages stable
+        Case.objects.filter(case_id__in=[c.case_id for c in self.cases[:3]]).update(
+            created_at=self.cases[0].created_at
+        )
+
+    def collect_pages(self, url, page_size):
+        seen, cursor = [], None
+        while True:
+            params = {'page_size': page_size}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.api.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), page_size)
+            seen.append(response.data['results'])
+            cursor = response.data['next']
+            if cursor is None:
+                return seen
+
+    def test_list_is_unpaginated_by_default(self):
+        response = self.api.get('/api/cases/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+
+    def test_pages_cover_every_row_once_in_order(self):
+        pages = self.collect_pages('/api/cases/', page_size=2)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        ids = [row['case_id'] for page in pages for row in page]
+        expected = list(
+            Case.objects.order_by('-created_at', '-case_id').values_list('case_id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_hearings_page_on_hearing_date(self):
+        case = self.cases[0]
+        now = timezone.now()
+        for offset in range(3):
+            self.create_hearing(case, hearing_date=now + timedelta(days=offset))
+        pages = self.collect_pages('/api/hearings/', page_size=2)
+        dates = [row['hearing_date'] for page in pages for row in page]
+        self.assertEqual(len(dates), 3)
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        response = self.api.get('/api/clients/', {'page_size': 1000})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('next', response.data)
+
+        for index in range(1, 5):
+            self.create_client(index)
+        response = self.api.get('/api/clients/', {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.api.get('/api/cases/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+        response = self.api.get('/api/cases/', {'page_size': 'ten'})
+        self.assertEqual(response.status_code, 400)
+
+
+class QueryPlanTests(APITestMixin, TestCase):
+    """Every endpoint must issue the same number of queries for 1 row as for many."""
+
+    def seed(self, count):
+        for index in range(count):
+            client = self.create_client(index)
+            case = self.create_case(client, index)
+            self.create_hearing(case)
+
+    def assertConstantQueries(self, url, expected, params=None):
+        for count in (1, 10):
+            Client.objects.all().delete()
+            self.seed(count)
+            with self.assertNumQueries(expected):
+                response = self.api.get(url, params or {})
+            self.assertEqual(response.status_code, 200)
+
+    def test_case_list(self):
+        self.assertConstantQueries('/api/cases/', 1)
+        self.assertConstantQueries('/api/cases/', 1, {'page_size': 5})
+
+    def test_client_list(self):
+        self.assertConstantQueries('/api/clients/', 1)
+
+    def test_hearing_list(self):
+        self.assertConstantQueries('/api/hearings/', 1)
+        self.assertConstantQueries('/api/hearings/', 1, {'page_size': 5})
+
+    def test_detail_views(self):
+        self.seed(1)
+        case = Case.objects.get()
+        hearing = Hearing.objects.get()
+        with self.assertNumQueries(1):
+            response = self.api.get(f'/api/cases/{case.case_id}/')
+        self.assertEqual(response.data['client_name'], 'First0 Last0')
+        with self.assertNumQueries(1):
+            response = self.api.get(f'/api/hearings/{hearing.hearing_id}/')
+        self.assertEqual(response.data['case_title'], 'Case 0')
+        self.assertEqual(response.data['client_name'], 'First0 Last0')
+
+    def test_update_reports_reassigned_client(self):
+        self.seed(2)
+        case = Case.objects.get(case_title='Case 0')
+        other = Client.objects.get(first_name='First1')
+        response = self.api.put(
+            f'/api/cases/{case.case_id}/', {'client_id': other.client_id}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['client_name'], 'First1 Last1')
+
+
+class ListFilterTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = self.create_client(1, first_name='Alice', last_name='Reyes', phone_number='0917-555-0101')
+        self.bob = self.create_client(2, first_name='Bob', last_name='Santos')
+        self.active = self.create_case(self.alice, 1, status='active', priority='high',
+                                       lawyer_assigned='Atty. Neyra', start_date='2025-01-10')
+        self.pending = self.create_case(self.bob, 2, status='pending', priority='low',
+                                        lawyer_assigned='Atty. Marcos', start_date='2025-03-01')
+        self.closed = self.create_case(self.bob, 3, status='closed', case_title='Land Dispute')
+        now = timezone.now()
+        self.next_week = self.create_hearing(self.active, hearing_date=now + timedelta(days=7))
+        self.last_week = self.create_hearing(self.pending, hearing_date=now - timedelta(days=7),
+                                             status='completed', judge_name='Judge Cruz')
+
+    def ids(self, url, params, key):
+        response = self.api.get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return {row[key] for row in response.data}
+
+    def test_case_choice_filters(self):
+        self.assertEqual(self.ids('/api/cases/', {'status': 'active,pending'}, 'case_id'),
+                         {self.active.case_id, self.pending.case_id})
+        self.assertEqual(self.ids('/api/cases/', {'priority': 'low'}, 'case_id'), {self.pending.case_id})
+        response = self.api.get('/api/cases/', {'status': 'archived'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_case_lawyer_client_and_date_filters(self):
+        self.assertEqual(self.ids('/api/cases/', {'lawyer_assigned': 'Atty. Neyra'}, 'case_id'),
+                         {self.active.case_id})
+        self.assertEqual(self.ids('/api/cases/', {'client_id': self.bob.client_id}, 'case_id'),
+                         {self.pending.case_id, self.closed.case_id})
+        self.assertEqual(self.ids('/api/cases/', {'start_date_after': '2025-02-01'}, 'case_id'),
+                         {self.pending.case_id})
+        self.assertEqual(self.ids('/api/cases/', {'start_date_before': '2025-01-10'}, 'case_id'),
+                         {self.active.case_id})
+
+    def test_search(self):
+        self.assertEqual(self.ids('/api/cases/', {'q': 'land'}, 'case_id'), {self.closed.case_id})
+        self.assertEqual(self.ids('/api/cases/', {'q': 'reyes'}, 'case_id'), {self.active.case_id})
+        self.assertEqual(self.ids('/api/clients/', {'q': '0917'}, 'client_id'), {self.alice.client_id})
+        self.assertEqual(self.ids('/api/clients/', {'q': str(self.bob.client_id)}, 'client_id'),
+                         {self.bob.client_id})
+        self.assertEqual(self.ids('/api/hearings/', {'q': 'cruz'}, 'hearing_id'), {self.last_week.hearing_id})
+
+    def test_hearing_filters(self):
+        today = timezone.localdate().isoformat()
+        self.assertEqual(self.ids('/api/hearings/', {'hearing_date_after': today}, 'hearing_id'),
+                         {self.next_week.hearing_id})
+        self.assertEqual(self.ids('/api/hearings/', {'status': 'completed'}, 'hearing_id'),
+                         {self.last_week.hearing_id})
+        self.assertEqual(self.ids('/api/hearings/', {'lawyer_assigned': 'Atty. Neyra'}, 'hearing_id'),
+                         {self.next_week.hearing_id})
+        self.assertEqual(self.ids('/api/hearings/', {'client_id': self.bob.client_id}, 'hearing_id'),
+                         {self.last_week.hearing_id})
+        response = self.api.get('/api/hearings/', {'hearing_date_after': 'tomorrow'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_impossible_dates_are_rejected(self):
+        response = self.api.get('/api/cases/', {'created_at_after': '2026-13-01'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('created_at_after', response.data)
+        response = self.api.get('/api/hearings/', {'hearing_date_after': '2026-02-30T10:00:00'})
+        self.assertEqual(response.status_code, 400)
+        response = self.api.get('/api/cases/', {'start_date_before': '2026-02-30'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_ordering(self):
+        response = self.api.get('/api/clients/', {'ordering': 'last_name'})
+        self.assertEqual([row['last_name'] for row in response.data], ['Reyes', 'Santos'])
+        response = self.api.get('/api/clients/', {'ordering': '-last_name'})
+        self.assertEqual([row['last_name'] for row in response.data], ['Santos', 'Reyes'])
+        response = self.api.get('/api/clients/', {'ordering': 'notes'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_ordering_with_cursor_pagination(self):
+        response = self.api.get('/api/cases/', {'ordering': 'case_title', 'page_size': 2})
+        titles = [row['case_title'] for row in response.data['results']]
+        response = self.api.get('/api/cases/', {'ordering': 'case_title', 'page_size': 2,
+                                                'cursor': response.data['next']})
+        titles += [row['case_title'] for row in response.data['results']]
+        self.assertEqual(titles, ['Case 1', 'Case 2', 'Land Dispute'])
+
+
+class SearchViewTests(APITestMixin, TestCase):
+    # Runs the icontains fallback on non-PostgreSQL test databases
+    def setUp(self):
+        super().setUp()
+        self.client_obj = self.create_client(1, first_name='Maria', last_name='Clara', notes='Prefers email contact')
+        self.case = self.create_case(self.client_obj, 1, case_title='Estate of Maria', description='Probate matter')
+        self.hearing = self.create_hearing(self.case, judge_name='Judge Ibarra', notes='Bring probate documents')
+
+    def test_hits_span_all_types(self):
+        response = self.api.get('/api/search/', {'q': 'probate'})
+        self.assertEqual(response.status_code, 200)
+        hits = {(hit['type'], hit['id']) for hit in response.data['results']}
+        self.assertEqual(hits, {('case', self.case.case_id), ('hearing', self.hearing.hearing_id)})
+        case_hit = next(hit for hit in response.data['results'] if hit['type'] == 'case')
+        self.assertEqual(case_hit['subtitle'], 'Maria Clara')
+
+    def test_type_filter_and_paging(self):
+        response = self.api.get('/api/search/', {'q': 'maria', 'type': 'clients', 'page_size': 1})
+        self.assertEqual([hit['type'] for hit in response.data['results']], ['client'])
+        self.assertIsNone(response.data['next'])
+
+        response = self.api.get('/api/search/', {'q': 'maria', 'page_size': 1})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['next'], 2)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.api.get('/api/search/').status_code, 400)
+        self.assertEqual(self.api.get('/api/search/', {'q': 'x', 'type': 'notes'}).status_code, 400)
+        self.assertEqual(self.api.get('/api/search/', {'q': 'x', 'page': 0}).status_code, 400)
+
+    def test_highlights_escape_the_document(self):
+        headline = 'Bring <img src=x onerror=alert(1)> \x02probate\x03 & more'
+        self.assertEqual(
+            to_highlight(headline), 'Bring &lt;img src=x onerror=alert(1)&gt; <mark>probate</mark> &amp; more',
+        )
+        self.assertIsNone(to_highlight(''))
+
+    def test_search_vector_is_not_serialized(self):
+        response = self.api.get(f'/api/clients/{self.client_obj.client_id}/')
+        self.assertNotIn('search_vector', response.data)
+
+
+class DashboardStatsTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = self.create_client(1)
+        self.bob = self.create_client(2)
+        self.create_case(self.alice, 1, status='active', priority='high', lawyer_assigned='Atty. Neyra')
+        self.create_case(self.alice, 2, status='pending', lawyer_assigned='Atty. Neyra')
+        self.case = self.create_case(self.bob, 3, status='active', lawyer_assigned='Atty. Marcos')
+        self.create_hearing(self.case, hearing_date=timezone.now() + timedelta(days=2))
+        self.create_hearing(self.case, hearing_date=timezone.now() + timedelta(days=30))
+        self.create_hearing(self.case, hearing_date=timezone.now() - timedelta(days=2))
+
+    def test_counts(self):
+        response = self.api.get('/api/dashboard/stats/')
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual(data['clients']['total'], 2)
+        self.assertEqual(data['cases']['total'], 3)
+        self.assertEqual(data['cases']['by_status'], {'active': 2, 'pending': 1, 'closed': 0})
+        self.assertEqual(data['cases']['by_priority'], {'low': 0, 'medium': 2, 'high': 1})
+        self.assertEqual(data['cases']['by_lawyer'][0],
+                         {'lawyer_assigned': 'Atty. Neyra', 'total': 2, 'active': 1})
+        self.assertEqual(data['cases']['per_client'], {self.alice.client_id: 2, self.bob.client_id: 1})
+        self.assertEqual(data['hearings']['upcoming_week'], 1)
+        self.assertEqual(len(data['hearings']['upcoming']), 2)
+        self.assertEqual(data['hearings']['upcoming'][0]['client_name'], 'First2 Last2')
+
+    def test_cached_until_a_write(self):
+        self.api.get('/api/dashboard/stats/')
+        with self.assertNumQueries(0):
+            self.api.get('/api/dashboard/stats/')
+
+        self.create_case(self.bob, 4, status='closed')
+        response = self.api.get('/api/dashboard/stats/')
+        self.assertEqual(response.data['cases']['by_status']['closed'], 1)
+
+        Client.objects.get(pk=self.bob.pk).delete()
+        response = self.api.get('/api/dashboard/stats/')
+        self.assertEqual(response.data['clients']['total'], 1)
+        self.assertEqual(response.data['cases']['total'], 2)
+
+
+class ConditionalGetTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client_obj = self.create_client(1)
+        self.case = self.create_case(self.client_obj, 1)
+
+    def test_list_revalidates_without_queries(self):
+        response = self.api.get('/api/cases/')
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        with self.assertNumQueries(0):
+            response = self.api.get('/api/cases/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            response = self.api.get('/api/cases/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+    def test_list_etag_changes_on_related_writes(self):
+        etag = self.api.get('/api/cases/')['ETag']
+        self.client_obj.first_name = 'Renamed'
+        self.client_obj.save()
+
+        response = self.api.get('/api/cases/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['client_name'], 'Renamed Last1')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_depends_on_query(self):
+        all_cases = self.api.get('/api/cases/')['ETag']
+        closed = self.api.get('/api/cases/', {'status': 'closed'})
+        self.assertNotEqual(closed['ETag'], all_cases)
+        self.assertEqual(closed.data, [])
+
+    def test_detail_etag_and_last_modified(self):
+        url = f'/api/cases/{self.case.case_id}/'
+        response = self.api.get(url)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        response = self.api.get(url, HTTP_IF_NONE_MATCH=f'W/{etag}')
+        self.assertEqual(response.status_code, 304)
+
+        self.client_obj.last_name = 'Changed'
+        self.client_obj.save()
+        response = self.api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['client_name'], 'First1 Changed')
+
+    def test_missing_detail_is_not_cached(self):
+        response = self.api.get('/api/hearings/999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+
+
+class BulkEndpointTests(APITestMixin, TestCase):
+    def test_create_clients_in_one_insert(self):
+        items = [{'first_name': f'F{i}', 'last_name': f'L{i}', 'email': f'bulk{i}@example.com'} for i in range(50)]
+        with self.assertNumQueries(4):  # email check, then SAVEPOINT, INSERT, RELEASE
+            response = self.api.post('/api/clients/bulk/', items, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['created'], 50)
+        self.assertEqual(Client.objects.count(), 50)
+
+    def test_invalid_items_reject_whole_batch(self):
+        self.create_client(0, email='taken@example.com')
+        items = [
+            {'first_name': 'Ok', 'last_name': 'Row', 'email': 'new@example.com'},
+            {'last_name': 'No first name'},
+            {'first_name': 'Dup', 'last_name': 'Row', 'email': 'taken@example.com'},
+            {'first_name': 'Dup', 'last_name': 'Batch', 'email': 'new@example.com'},
+        ]
+        response = self.api.post('/api/clients/bulk/', items, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = {entry['index']: entry['errors'] for entry in response.data['errors']}
+        self.assertEqual(sorted(errors), [1, 2, 3])
+        self.assertIn('first_name', errors[1])
+        self.assertIn('email', errors[2])
+        self.assertIn('email', errors[3])
+        self.assertEqual(Client.objects.count(), 1)
+
+    def test_create_cases_checks_clients(self):
+        client = self.create_client(1)
+        items = [
+            {'client_id': client.client_id, 'case_title': 'One'},
+            {'client_id': 9999, 'case_title': 'Orphan'},
+        ]
+        response = self.api.post('/api/cases/bulk/', items, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+
+        response = self.api.post('/api/cases/bulk/', items[:1], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Case.objects.get().client, client)
+
+    def test_reschedule_hearings(self):
+        case = self.create_case(self.create_client(1))
+        hearings = [self.create_hearing(case) for _ in range(3)]
+        before = hearings[0].updated_at
+        new_date = timezone.now() + timedelta(days=14)
+        items = [{'hearing_id': h.hearing_id, 'hearing_date': new_date.isoformat(), 'status': 'postponed'}
+                 for h in hearings]
+        response = self.api.put('/api/hearings/bulk/', items, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['updated'], 3)
+        hearing = Hearing.objects.get(pk=hearings[0].pk)
+        self.assertEqual(hearing.status, 'postponed')
+        self.assertEqual(hearing.hearing_date, new_date)
+        self.assertGreater(hearing.updated_at, before)
+
+        response = self.api.put('/api/hearings/bulk/', [{'hearing_id': 9999, 'status': 'done'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'hearing_id', 'status'})
+
+    def test_bulk_writes_expire_cached_lists(self):
+        etag = self.api.get('/api/clients/')['ETag']
+        self.api.post('/api/clients/bulk/', [{'first_name': 'A', 'last_name': 'B'}], format='json')
+        response = self.api.get('/api/clients/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+    def test_delete(self):
+        clients = [self.create_client(i) for i in range(3)]
+        response = self.api.delete('/api/clients/bulk/', [clients[0].pk, 9999], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Client.objects.count(), 3)
+        response = self.api.delete('/api/clients/bulk/', [c.pk for c in clients[:2]], format='json')
+        self.assertEqual(response.data, {'deleted': 2})
+        self.assertEqual(Client.objects.count(), 1)
+
+    @override_settings(BULK_MAX_ITEMS=2)
+    def test_batch_size_cap(self):
+        response = self.api.post('/api/clients/bulk/', [{}, {}, {}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        client = self.create_client(1, notes='Line one, "quoted"')
+        self.create_case(client, 1, status='active', estimated_value='1500.50')
+        self.create_case(client, 2, status='closed')
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_streams_filtered_rows(self):
+        response = self.api.get('/api/export/cases/', {'format': 'csv', 'status': 'active'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertIn('attachment; filename="cases-', response['Content-Disposition'])
+        lines = self.read(response).splitlines()
+        self.assertEqual(len(lines), 2)
+        header = lines[0].split(',')
+        self.assertIn('client_name', header)
+        self.assertNotIn('search_vector', header)
+        self.assertIn('1500.50', lines[1])
+
+    def test_ndjson(self):
+        response = self.api.get('/api/export/clients/', {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(records[0]['notes'], 'Line one, "quoted"')
+        self.assertTrue(records[0]['created_at'].endswith('Z'))
+
+    def test_invalid_filters_and_entities(self):
+        response = self.api.get('/api/export/cases/', {'format': 'csv', 'status': 'archived'})
+        self.assertEqual(response.status_code, 400)
+        response = self.api.get('/api/export/notes/', {'format': 'csv'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ImportCommandTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as target:
+            target.write(content)
+        return path
+
+    def run_import(self, *args, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_casevault', *args, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_csv_clients_skip_invalid_rows(self):
+        self.create_client(1)
+        path = self.write_file('clients.csv', (
+            'first_name,last_name,email,city\n'
+            'Ana,Cruz,ana@example.com,Manila\n'
+            ',Reyes,missing@example.com,\n'
+            'Ben,Santos,client1@example.com,\n'
+            'Cara,Lim,,Cebu\n'
+        ))
+        stdout, stderr = self.run_import('clients', path, batch_size=2)
+        self.assertEqual(
+            sorted(Client.objects.values_list('first_name', flat=True)),
+            ['Ana', 'Cara', 'First1'],
+        )
+        self.assertIn('line 3: {"first_name"', stderr)
+        self.assertIn('line 4: {"email"', stderr)
+        self.assertIn('Imported 2 clients (2 skipped)', stdout)
+
+    def test_jsonl_cases_resolve_client_email(self):
+        client = self.create_client(1, email='Mixed.Case@example.com')
+        path = self.write_file('cases.jsonl', '\n'.join([
+            json.dumps({'client_email': 'mixed.case@example.com', 'case_title': 'Lease', 'status': 'active'}),
+            json.dumps({'client_email': 'nobody@example.com', 'case_title': 'Orphan'}),
+            json.dumps({'client_id': client.client_id, 'case_title': 'Will', 'status': 'bogus'}),
+            '{not json',
+        ]))
+        stdout, stderr = self.run_import('cases', path)
+        self.assertEqual(list(Case.objects.values_list('case_title', 'client_id')), [('Lease', client.client_id)])
+        self.assertIn('No client with email nobody@example.com', stderr)
+        self.assertIn('line 3: {"status"', stderr)
+        self.assertIn('line 4: {"non_field_errors"', stderr)
+
+    def test_resume_skips_checkpointed_records(self):
+        client = self.create_client(1)
+        lines = [json.dumps({'client_id': client.client_id, 'case_title': f'Case {n}'}) for n in range(5)]
+        path = self.write_file('cases.jsonl', '\n'.join(lines[:3]))
+        self.run_import('cases', path, batch_size=2)
+        self.assertEqual(Case.objects.count(), 3)
+
+        with open(path, 'a') as target:
+            target.write('\n' + '\n'.join(lines[3:]))
+        stdout, _ = self.run_import('cases', path, resume=True)
+        self.assertIn('Resuming after 3 records', stdout)
+        self.assertEqual(Case.objects.count(), 5)
+        with open(f'{path}.checkpoint') as source:
+            self.assertEqual(json.load(source)['records'], 5)
+
+    def test_resume_after_a_crash_around_the_commit(self):
+        client = self.create_client(1)
+        lines = [json.dumps({'client_id': client.client_id, 'case_title': f'Case {n}'}) for n in range(4)]
+        path = self.write_file('cases.jsonl', '\n'.join(lines))
+        self.run_import('cases', path, batch_size=2)
+        last_pk = Case.objects.order_by('case_id').last().pk
+        state = {'entity': 'cases', 'source': os.path.abspath(path), 'skipped': 0}
+        before = {**state, 'records': 2, 'created': 2}
+        # Checkpoint written, then the process died: committed or not
+        for pk, expected in ((last_pk - 1, 'after 4 records'), (last_pk + 1, 'after 2 records')):
+            with open(f'{path}.checkpoint', 'w') as target:
+                json.dump({**state, 'records': 4, 'created': 4, 'unconfirmed': {'pk': pk, 'previous': before}}, target)
+            stdout, _ = self.run_import('cases', path, resume=True)
+            self.assertIn(f'Resuming {expected}', stdout)
+        self.assertEqual(Case.objects.count(), 6)
+
+    @override_settings(AUDIT_ASYNC=False)
+    def test_imports_are_audited(self):
+        path = self.write_file('clients.csv', 'first_name,last_name\nAna,Cruz\nBen,Santos\n')
+        self.run_import('clients', path)
+        logs = AdminLog.objects.order_by('log_id')
+        self.assertEqual([(log.table_name, log.action) for log in logs], [('clients', 'create')] * 2)
+        self.assertEqual(logs[0].new_values['first_name'], 'Ana')
+
+    def test_import_expires_list_caches(self):
+        client = self.create_client(1)
+        self.assertEqual(len(self.api.get('/api/cases/').data), 0)
+        path = self.write_file('cases.jsonl', json.dumps({'client_id': client.client_id, 'case_title': 'New'}))
+        self.run_import('cases', path)
+        self.assertEqual(len(self.api.get('/api/cases/').data), 1)
+
+
+class EmailBackendTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('lawyer', 'Lawyer@Example.com', 'testpass123')
+        self.backend = EmailBackend()
+
+    def test_email_is_case_insensitive_and_username_works(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend.authenticate(None, 'lawyer@example.COM', 'testpass123'), self.user)
+        self.assertEqual(self.backend.authenticate(None, 'lawyer', 'testpass123'), self.user)
+        self.assertIsNone(self.backend.authenticate(None, 'lawyer@example.com', 'wrong'))
+        self.assertIsNone(self.backend.authenticate(None, 'nobody@example.com', 'testpass123'))
+
+    def test_duplicate_emails_and_inactive_users(self):
+        other = User.objects.create_user('lawyer2', 'lawyer@example.com', 'otherpass456')
+        self.assertEqual(self.backend.authenticate(None, 'lawyer@example.com', 'otherpass456'), other)
+        other.is_active = False
+        other.save()
+        self.assertIsNone(self.backend.authenticate(None, 'lawyer@example.com', 'otherpass456'))
+
+    def test_token_endpoint_accepts_email(self):
+        response = APIClient().post('/api/token/', {'username': 'LAWYER@example.com', 'password': 'testpass123'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('lawyer@example.com', 'lawyer@example.com', 'testpass123')
+        self.profile = UserProfile.objects.create(django_user=self.user)
+        self.api = APIClient()
+        self.auth_header = f'Bearer {AccessToken.for_user(self.user)}'
+        self.api.credentials(HTTP_AUTHORIZATION=self.auth_header)
+
+    def test_user_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.api.get('/api/profile/').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.api.get('/api/profile/')
+        self.assertEqual(response.data['email'], 'lawyer@example.com')
+
+    def test_profile_is_cached_with_the_user(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=self.auth_header)
+        CachedJWTAuthentication().authenticate(request)
+        with self.assertNumQueries(0):
+            user, _ = CachedJWTAuthentication().authenticate(request)
+            self.assertEqual(user.profile.role, 'lawyer')
+
+    def test_cache_holds_no_password_hash(self):
+        token = AccessToken.for_user(self.user)
+        self.api.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.api.get('/api/profile/')
+        entry = cache.get(user_cache_key(self.user.pk, token['jti']))
+        self.assertNotIn(self.user.password, str(entry))
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        user, _ = CachedJWTAuthentication().authenticate(request)
+        with self.assertNumQueries(1):  # deferred: loaded on first use
+            self.assertEqual(user.password, self.user.password)
+
+    def test_saves_expire_the_cached_user(self):
+        self.api.get('/api/profile/')
+        self.profile.role = 'admin'
+        self.profile.save()
+        with self.assertNumQueries(1):
+            self.api.get('/api/profile/')
+
+        self.api.get('/api/profile/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.api.get('/api/profile/').status_code, 401)
+
+
+class AsyncViewTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        client = self.create_client(1)
+        self.case = self.create_case(client, 1, status='active', estimated_value='99.90')
+        self.create_case(client, 2, status='closed')
+        self.hearing = self.create_hearing(self.case, location='Hall A')
+        self.factory = AsyncRequestFactory()
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def call(self, view_class, path, method='get', headers=None, **kwargs):
+        request = getattr(self.factory, method)(path, headers=self.headers if headers is None else headers)
+        return await view_class.as_view()(request, **kwargs)
+
+    async def assert_same_as_sync(self, view_class, path, **kwargs):
+        response = await self.call(view_class, path, **kwargs)
+        await cache.aclear()
+        expected = await sync_to_async(self.api.get)(path)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+
+    async def test_lists_match_sync_views(self):
+        await self.assert_same_as_sync(AsyncCaseListView, '/api/cases/?status=active,closed')
+        await self.assert_same_as_sync(AsyncCaseListView, '/api/cases/?page_size=1')
+        await self.assert_same_as_sync(AsyncClientListView, '/api/clients/')
+        await self.assert_same_as_sync(AsyncHearingListView, '/api/hearings/?status=scheduled')
+        await self.assert_same_as_sync(AsyncCaseListView, '/api/cases/?fields=case_title,client_name&page_size=1')
+        await self.assert_same_as_sync(AsyncClientListView, '/api/clients/?fields=nickname')
+
+    async def test_details_match_sync_views(self):
+        await self.assert_same_as_sync(AsyncCaseDetailView, f'/api/cases/{self.case.case_id}/', case_id=self.case.case_id)
+        await self.assert_same_as_sync(
+            AsyncHearingDetailView, f'/api/hearings/{self.hearing.hearing_id}/', hearing_id=self.hearing.hearing_id
+        )
+        await self.assert_same_as_sync(
+            AsyncCaseDetailView, f'/api/cases/{self.case.case_id}/?exclude=description', case_id=self.case.case_id
+        )
+        response = await self.call(AsyncCaseDetailView, '/api/cases/0/', case_id=0)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), {'error': 'Case not found'})
+
+    async def test_errors_and_conditional_get(self):
+        response = await self.call(AsyncCaseListView, '/api/cases/', headers={})
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+        response = await self.call(AsyncCaseListView, '/api/cases/?status=archived')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', json.loads(response.content))
+
+        first = await self.call(AsyncCaseListView, '/api/cases/')
+        self.headers['If-None-Match'] = first['ETag']
+        response = await self.call(AsyncCaseListView, '/api/cases/')
+        self.assertEqual(response.status_code, 304)
+
+    async def test_writes_are_delegated_to_sync_views(self):
+        request = self.factory.put(
+            f'/api/cases/{self.case.case_id}/', data={'status': 'closed'},
+            content_type='application/json', headers=self.headers,
+        )
+        response = await AsyncCaseDetailView.as_view()(request, case_id=self.case.case_id)
+        await sync_to_async(response.render)()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await Case.objects.aget(pk=self.case.case_id)).status, 'closed')
+
+
+class HearingConflictTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        client = self.create_client(1)
+        self.case = self.create_case(client, 1, lawyer_assigned='Atty. Reyes')
+        self.other_case = self.create_case(client, 2, lawyer_assigned='Atty. Reyes')
+        self.start = timezone.now().replace(microsecond=0) + timedelta(days=2)
+        self.hearing = self.create_hearing(
+            self.case, hearing_date=self.start, duration_minutes=90, judge_name='Judge Cruz', location='Room 1',
+        )
+
+    def post_hearing(self, case, minutes_after, **kwargs):
+        data = {'case_id': case.case_id, 'hearing_date': (self.start + timedelta(minutes=minutes_after)).isoformat()}
+        data.update(kwargs)
+        return self.api.post('/api/hearings/', data, format='json')
+
+    def test_overlapping_hearing_for_same_lawyer_is_rejected(self):
+        self.assertEqual(self.hearing.ends_at, self.start + timedelta(minutes=90))
+        response = self.post_hearing(self.other_case, 60)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f'hearing {self.hearing.hearing_id}', response.data['hearing_date'][0])
+        self.assertIn('same lawyer', response.data['hearing_date'][0])
+        # Back to back is fine, and so is overriding the check
+        self.assertEqual(self.post_hearing(self.other_case, 90).status_code, 201)
+        self.assertEqual(self.post_hearing(self.other_case, 30, allow_conflicts=True).status_code, 201)
+
+    def test_judge_and_location_conflicts_across_lawyers(self):
+        other = self.create_case(self.create_client(2), 3, lawyer_assigned='Atty. Santos')
+        self.assertEqual(self.post_hearing(other, 30, location='Room 2').status_code, 201)
+        self.assertEqual(self.post_hearing(other, 45, judge_name='Judge Cruz').status_code, 400)
+        self.assertEqual(self.post_hearing(other, 60, location='Room 1').status_code, 400)
+
+    def test_updates_skip_self_and_cancelled_hearings(self):
+        response = self.api.put(
+            f'/api/hearings/{self.hearing.hearing_id}/', {'duration_minutes': 120}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['ends_at'], (self.start + timedelta(minutes=120)).isoformat().replace('+00:00', 'Z'))
+        self.hearing.status = 'cancelled'
+        self.hearing.save()
+        self.assertEqual(self.post_hearing(self.other_case, 0, judge_name='Judge Cruz').status_code, 201)
+
+    def test_editing_notes_of_a_conflicting_hearing(self):
+        response = self.post_hearing(self.other_case, 30, allow_conflicts=True)
+        self.assertEqual(response.status_code, 201)
+        url = f"/api/hearings/{response.data['hearing_id']}/"
+        response = self.api.put(url, {'notes': 'Bring exhibits'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['notes'], 'Bring exhibits')
+        # Moving it is still checked
+        response = self.api.put(url, {'duration_minutes': 120}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_conflict_check_endpoint(self):
+        response = self.api.get('/api/hearings/conflicts/', {
+            'hearing_date': (self.start + timedelta(minutes=30)).isoformat(),
+            'case_id': self.other_case.case_id, 'location': 'Room 1',
+        })
+        self.assertEqual(response.status_code, 200)
+        [conflict] = response.data['conflicts']
+        self.assertEqual(conflict['hearing_id'], self.hearing.hearing_id)
+        self.assertEqual(conflict['conflicts_on'], ['lawyer', 'location'])
+        response = self.api.get('/api/hearings/conflicts/', {
+            'hearing_date': self.start.isoformat(), 'lawyer': 'Atty. Reyes', 'exclude': self.hearing.hearing_id,
+        })
+        self.assertEqual(response.data['conflicts'], [])
+        self.assertEqual(self.api.get('/api/hearings/conflicts/').status_code, 400)
+
+    def test_bulk_writes_maintain_ends_at(self):
+        response = self.api.post('/api/hearings/bulk/', [
+            {'case_id': self.other_case.case_id, 'hearing_date': self.start.isoformat(), 'duration_minutes': 30},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        hearing = Hearing.objects.get(case=self.other_case)
+        self.assertEqual(hearing.ends_at, self.start + timedelta(minutes=30))
+        self.api.put('/api/hearings/bulk/', [{'hearing_id': hearing.hearing_id, 'duration_minutes': 45}], format='json')
+        hearing.refresh_from_db()
+        self.assertEqual(hearing.ends_at, self.start + timedelta(minutes=45))
+
+
+class HearingCalendarTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        client = self.create_client(1)
+        self.case = self.create_case(client, 1, lawyer_assigned='Atty. Reyes')
+        other_case = self.create_case(client, 2, lawyer_assigned='Atty. Santos')
+        self.start = timezone.now().replace(hour=9, minute=0, second=0, microsecond=0) + timedelta(days=7)
+        self.hearings = [
+            self.create_hearing(self.case, hearing_date=self.start + timedelta(days=1), location='Room 1, Hall A'),
+            self.create_hearing(self.case, hearing_date=self.start, notes='Bring exhibits'),
+            self.create_hearing(other_case, hearing_date=self.start + timedelta(hours=2)),
+            self.create_hearing(self.case, hearing_date=self.start + timedelta(days=40)),
+        ]
+
+    def test_window_and_lawyer_filter(self):
+        params = {'start': self.start.isoformat(), 'end': (self.start + timedelta(days=30)).isoformat()}
+        response = self.api.get('/api/hearings/calendar/', params)
+        self.assertEqual(
+            [hearing['hearing_id'] for hearing in response.data],
+            [self.hearings[1].hearing_id, self.hearings[2].hearing_id, self.hearings[0].hearing_id],
+        )
+        response = self.api.get('/api/hearings/calendar/', {**params, 'lawyer': 'Atty. Reyes'})
+        self.assertEqual(len(response.data), 2)
+        response = self.api.get('/api/hearings/calendar/', {'start': '2026-01-01', 'end': '2028-01-01'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.api.get('/api/hearings/calendar/', {'start': '2026-01-01'}).status_code, 400)
+
+    def test_ics_feed(self):
+        url = self.api.get('/api/hearings/calendar/feed/', {'lawyer': 'Atty. Reyes'}).data['url']
+        anonymous = APIClient()
+        response = anonymous.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = response.content.decode()
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 3)
+        self.assertIn(f'UID:hearing-{self.hearings[1].hearing_id}@casevault', body)
+        self.assertIn(f"DTSTART:{self.start:%Y%m%dT%H%M%S}Z", body)
+        self.assertIn('LOCATION:Room 1\\, Hall A', body)
+        self.assertIn('DESCRIPTION:Client: First1 Last1\\nBring exhibits', body)
+        self.assertNotIn('Atty. Santos', body)
+
+        self.assertEqual(anonymous.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(anonymous.get(url.replace('.ics', 'x.ics')).status_code, 404)
+
+    def test_feed_rerenders_only_changed_events(self):
+        url = self.api.get('/api/hearings/calendar/feed/', {'lawyer': 'Atty. Reyes'}).data['url']
+        first = self.client.get(url)
+        hearing = self.hearings[0]
+        hearing.status = 'cancelled'
+        hearing.save()
+        with mock.patch('api.ical.render_event', wraps=render_event) as render:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual([call.args[0]['hearing_id'] for call in render.call_args_list], [hearing.hearing_id])
+        self.assertIn('STATUS:CANCELLED', second.content.decode())
+
+    def test_long_lines_are_folded(self):
+        line = 'DESCRIPTION:' + 'é' * 80
+        folded = fold(line)
+        self.assertTrue(all(len(part.encode()) <= 75 for part in folded.split('\r\n')))
+        self.assertEqual(folded.replace('\r\n ', ''), line)
+
+
+class SyncTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.clients = [self.create_client(n) for n in range(3)]
+        self.case = self.create_case(self.clients[0], 1)
+        self.hearing = self.create_hearing(self.case)
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        for model in (Client, Case, Hearing):
+            model.objects.update(updated_at=an_hour_ago)
+
+    def sync(self, since=None):
+        response = self.api.get('/api/sync/', {'since': since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def ids(self, data, entity, key):
+        return [row[key] for row in data[entity]['updated']]
+
+    def test_full_then_delta_sync(self):
+        full = self.sync()
+        self.assertEqual(len(full['clients']['updated']), 3)
+        self.assertEqual(self.ids(full, 'cases', 'case_id'), [self.case.case_id])
+        self.assertEqual(full['hearings']['updated'][0]['case_title'], 'Case 1')
+        self.assertFalse(full['has_more'])
+
+        self.assertEqual(self.sync(full['next'])['clients'], {'updated': [], 'deleted': []})
+
+        changed = self.clients[1]
+        changed.first_name = 'Changed'
+        changed.save()
+        new = self.create_client(9)
+        deleted_ids = (self.clients[0].client_id, self.case.case_id, self.hearing.hearing_id)
+        self.clients[0].delete()  # cascades to the case and hearing
+        delta = self.sync(full['next'])
+        self.assertEqual(self.ids(delta, 'clients', 'client_id'), [changed.client_id, new.client_id])
+        self.assertEqual(delta['clients']['deleted'], [deleted_ids[0]])
+        self.assertEqual(delta['cases'], {'updated': [], 'deleted': [deleted_ids[1]]})
+        self.assertEqual(delta['hearings']['deleted'], [deleted_ids[2]])
+
+    def test_related_changes_resend_rows(self):
+        full = self.sync()
+        client = self.clients[0]
+        client.last_name = 'Renamed'
+        client.save()
+        delta = self.sync(full['next'])
+        self.assertEqual(self.ids(delta, 'clients', 'client_id'), [client.client_id])
+        self.assertEqual(self.ids(delta, 'cases', 'case_id'), [self.case.case_id])
+        self.assertEqual(delta['hearings']['updated'][0]['client_name'], 'First0 Renamed')
+        other = self.create_case(self.clients[1], 2)
+        Case.objects.filter(pk=other.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.case.case_title = 'Retitled'
+        self.case.save()
+        delta = self.sync(delta['next'])
+        self.assertEqual(self.ids(delta, 'cases', 'case_id'), [self.case.case_id])
+        self.assertEqual(delta['hearings']['updated'][0]['case_title'], 'Retitled')
+
+    def test_pages_related_changes(self):
+        full = self.sync()
+        second = self.create_hearing(self.case)
+        Hearing.objects.filter(pk=second.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.case.save()
+        with self.settings(SYNC_PAGE_SIZE=1):
+            first = self.sync(full['next'])
+            self.assertTrue(first['has_more'])
+            rest = self.sync(first['next'])
+        self.assertFalse(rest['has_more'])
+        self.assertEqual(
+            self.ids(first, 'hearings', 'hearing_id') + self.ids(rest, 'hearings', 'hearing_id'),
+            [self.hearing.hearing_id, second.hearing_id],
+        )
+
+    @override_settings(SYNC_PAGE_SIZE=2)
+    def test_pages_large_syncs(self):
+        first = self.sync()
+        self.assertTrue(first['has_more'])
+        second = self.sync(first['next'])
+        self.assertFalse(second['has_more'])
+        client_ids = self.ids(first, 'clients', 'client_id') + self.ids(second, 'clients', 'client_id')
+        self.assertEqual(client_ids, [client.client_id for client in self.clients])
+        self.assertEqual(second['cases']['updated'], [])
+
+    def test_bulk_delete_batches_tombstones(self):
+        for n in range(2, 6):
+            self.create_hearing(self.create_case(self.clients[1], n))
+        ids = [self.clients[0].client_id, self.clients[1].client_id]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.delete('/api/clients/bulk/', ids, format='json')
+        self.assertEqual(response.status_code, 200)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "tombstones"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Tombstone.objects.filter(table_name='clients').count(), 2)
+        self.assertEqual(Tombstone.objects.filter(table_name='cases').count(), 5)
+        self.assertEqual(Tombstone.objects.filter(table_name='hearings').count(), 5)
+
+    def test_bad_and_expired_tokens(self):
+        self.assertEqual(self.api.get('/api/sync/', {'since': 'not-a-token'}).status_code, 400)
+        impossible = encode_token({'s': '2026-02-30T00:00:00+00:00'})
+        self.assertEqual(self.api.get('/api/sync/', {'since': impossible}).status_code, 400)
+        expired = encode_token({'s': (timezone.now() - timedelta(days=60)).isoformat()})
+        response = self.api.get('/api/sync/', {'since': expired})
+        self.assertEqual(response.status_code, 410)
+        Tombstone.objects.create(table_name='clients', record_id=1)
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=60))
+        self.assertEqual(prune_tombstones(), 1)
+
+
+class NotificationTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.profile = UserProfile.objects.create(django_user=self.user)
+        other = UserProfile.objects.create(django_user=User.objects.create_user('other', 'other@example.com', 'x'))
+        self.mine = [Notification.objects.create(user=self.profile, title=f'N{n}') for n in range(3)]
+        self.theirs = Notification.objects.create(user=other, title='Other')
+
+    def test_list_only_own_notifications(self):
+        Notification.objects.filter(pk=self.mine[0].pk).update(is_read=True)
+        response = self.api.get('/api/notifications/')
+        self.assertEqual(len(response.data), 3)
+        response = self.api.get('/api/notifications/', {'unread': '1', 'page_size': 1})
+        self.assertEqual([row['notification_id'] for row in response.data['results']], [self.mine[2].pk])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_mark_read(self):
+        response = self.api.post(
+            '/api/notifications/mark-read/', {'ids': [self.mine[0].pk, self.theirs.pk]}, format='json'
+        )
+        self.assertEqual(response.data, {'updated': 1})
+        self.assertFalse(Notification.objects.get(pk=self.theirs.pk).is_read)
+        response = self.api.post('/api/notifications/mark-read/', {'all': True}, format='json')
+        self.assertEqual(response.data, {'updated': 2})
+        response = self.api.post('/api/notifications/mark-read/', {'ids': 'all'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ReminderSchedulerTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.first_name, self.user.last_name = 'Ana', 'Reyes'
+        self.user.save()
+        self.profile = UserProfile.objects.create(django_user=self.user)
+        client = self.create_client(1)
+        case = self.create_case(client, 1, lawyer_assigned='Ana Reyes')
+        unknown = self.create_case(client, 2, lawyer_assigned='Atty. Nobody')
+        self.now = timezone.now()
+        self.soon = self.create_hearing(case, hearing_date=self.now + timedelta(minutes=30))
+        self.later = self.create_hearing(case, hearing_date=self.now + timedelta(hours=10), location='Room 4')
+        self.create_hearing(case, hearing_date=self.now + timedelta(days=3))
+        self.create_hearing(case, hearing_date=self.now + timedelta(minutes=20), status='cancelled')
+        self.create_hearing(unknown, hearing_date=self.now + timedelta(hours=1))
+
+    def test_reminders_are_created_once_and_published(self):
+        with mock.patch('api.notifications.broker.publish') as publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            metrics = ReminderScheduler(batch_size=1).run_once(self.now)
+        self.assertEqual(
+            (metrics['scanned'], metrics['created'], metrics['unmatched']), (3, 2, 1),
+        )
+        published = [n for call in publish.call_args_list for n in call.args[0]]
+        self.assertEqual(len(published), 2)
+        notifications = Notification.objects.filter(user=self.profile).order_by('notification_id')
+        self.assertEqual([n.title for n in notifications], ['Upcoming hearing: Case 1'] * 2)
+        self.assertTrue(notifications[1].message.endswith('at Room 4'))
+        # The 30-minute hearing was past both leads: one notification, two reminder rows
+        self.assertEqual(HearingReminder.objects.filter(hearing=self.soon).count(), 2)
+
+        metrics = ReminderScheduler().run_once(self.now + timedelta(minutes=5))
+        self.assertEqual((metrics['created'], metrics['already_sent']), (0, 2))
+
+        # The one-hour lead falls due for the later hearing
+        metrics = ReminderScheduler().run_once(self.now + timedelta(hours=9, minutes=30))
+        self.assertEqual(metrics['created'], 1)
+        self.assertFalse(HearingReminder.objects.filter(hearing=self.soon).exists())
+
+    def test_rescheduled_hearing_is_announced_again(self):
+        ReminderScheduler().run_once(self.now)
+        self.later.hearing_date = self.now + timedelta(hours=20)
+        self.later.save()
+        metrics = ReminderScheduler().run_once(self.now)
+        self.assertEqual(metrics['created'], 1)
+        self.assertEqual(Notification.objects.filter(user=self.profile).count(), 3)
+
+    def test_command_prints_metrics(self):
+        stdout = StringIO()
+        with mock.patch('api.management.commands.run_scheduler.close_old_connections') as close:
+            call_command('run_scheduler', '--once', stdout=stdout)
+        close.assert_not_called()
+        self.assertRegex(stdout.getvalue(), r'scanned=3 created=2 .*p95_lag_seconds=')
+
+    def test_failed_tick_fails_the_command_with_once(self):
+        with mock.patch.object(ReminderScheduler, 'run_once', side_effect=RuntimeError('boom')):
+            with self.assertRaisesMessage(RuntimeError, 'boom'):
+                call_command('run_scheduler', '--once', stdout=StringIO())
+
+
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('lawyer@example.com', 'lawyer@example.com', 'testpass123')
+        self.profile = UserProfile.objects.create(django_user=self.user)
+        self.token = str(AccessToken.for_user(self.user))
+        self.old = Notification.objects.create(user=self.profile, title='Before disconnect')
+
+    async def open_stream(self, **headers):
+        request = AsyncRequestFactory().get(f'/api/notifications/stream/?token={self.token}', headers=headers)
+        response = await NotificationStreamView.as_view()(request)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return response.streaming_content
+
+    async def disconnect(self, stream):
+        # A client disconnect cancels the task reading the stream
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+
+    async def test_new_notifications_are_pushed(self):
+        stream = await self.open_stream()
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        self.assertEqual(broker.subscriber_count(self.profile.user_id), 1)
+
+        notification = Notification(notification_id=999, user=self.profile, title='Hearing moved')
+        await sync_to_async(broker.publish)([notification])
+        event = (await anext(stream)).decode()
+        self.assertIn('id: 999\nevent: notification\n', event)
+        self.assertEqual(json.loads(event.split('data: ')[1])['title'], 'Hearing moved')
+
+        await self.disconnect(stream)
+        self.assertEqual(broker.subscriber_count(self.profile.user_id), 0)
+
+    async def test_reconnect_replays_missed_unread(self):
+        stream = await self.open_stream(**{'Last-Event-ID': str(self.old.pk - 1)})
+        await anext(stream)
+        self.assertIn(f'id: {self.old.pk}\n', (await anext(stream)).decode())
+        await self.disconnect(stream)
+
+    def test_saved_notifications_are_published_on_commit(self):
+        with mock.patch.object(broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                notification = Notification.objects.create(user=self.profile, title='New')
+        publish.assert_called_once_with([notification])
+
+    def test_requires_token(self):
+        request = AsyncRequestFactory().get('/api/notifications/stream/')
+        response = async_to_sync(NotificationStreamView.as_view())(request)
+        self.assertEqual(response.status_code, 401)
+
+    def test_not_available_under_wsgi(self):
+        response = self.client.get(f'/api/notifications/stream/?token={self.token}')
+        self.assertEqual(response.status_code, 501)
+
+
+@override_settings(AUDIT_ASYNC=False)
+class AuditLogTests(APITestMixin, TestCase):
+    def test_changes_are_logged_with_request_context(self):
+        client = self.create_client(1)
+        case = self.create_case(client, 1, status='active')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.put(
+                f'/api/cases/{case.case_id}/', {'status': 'closed', 'case_title': 'Case 1'},
+                format='json', HTTP_USER_AGENT='pytest-agent',
+            )
+        log = AdminLog.objects.get()
+        self.assertEqual(
+            (log.action, log.table_name, log.record_id, log.user_id),
+            ('update', 'cases', str(case.case_id), str(self.user.pk)),
+        )
+        self.assertEqual((log.old_values, log.new_values), ({'status': 'active'}, {'status': 'closed'}))
+        self.assertEqual((log.ip_address, log.user_agent), ('127.0.0.1', 'pytest-agent'))
+
+    def test_creates_deletes_and_cascades(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post('/api/clients/', {'first_name': 'Ana', 'last_name': 'Cruz'}, format='json')
+            client = Client.objects.get(pk=response.data['client_id'])
+            self.create_case(client, 1, estimated_value=Decimal('10.50'))
+            client.save()  # nothing changed: not logged
+            self.api.delete(f'/api/clients/{client.client_id}/')
+        actions = list(AdminLog.objects.order_by('log_id').values_list('table_name', 'action'))
+        self.assertEqual(actions, [
+            ('clients', 'create'), ('cases', 'create'), ('cases', 'delete'), ('clients', 'delete'),
+        ])
+        deleted_case = AdminLog.objects.get(table_name='cases', action='delete')
+        self.assertEqual(deleted_case.old_values['estimated_value'], '10.50')
+        self.assertIsNone(deleted_case.new_values)
+
+    def test_old_values_come_from_the_loaded_instance(self):
+        case = Case.objects.get(pk=self.create_case(self.create_client(1), 1, status='active').pk)
+        case.status = 'closed'
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            case.save()
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT')])
+        case.priority = 'high'
+        with self.captureOnCommitCallbacks(execute=True):
+            case.save()
+            # Deferred fields leave no snapshot: the row is read instead
+            deferred = Case.objects.only('case_id', 'status').get(pk=case.pk)
+            deferred.status = 'pending'
+            deferred.save()
+        logs = AdminLog.objects.order_by('log_id')
+        self.assertEqual([(log.old_values, log.new_values) for log in logs], [
+            ({'status': 'active'}, {'status': 'closed'}),
+            ({'priority': 'medium'}, {'priority': 'high'}),
+            ({'status': 'closed'}, {'status': 'pending'}),
+        ])
+
+    def test_bulk_writes_are_logged(self):
+        client = self.create_client(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.post('/api/cases/bulk/', [{'client_id': client.client_id, 'case_title': 'A'}], format='json')
+            case = Case.objects.get(case_title='A')
+            self.api.put('/api/cases/bulk/', [{'case_id': case.case_id, 'priority': 'high'}], format='json')
+        logs = AdminLog.objects.order_by('log_id')
+        self.assertEqual([log.action for log in logs], ['create', 'update'])
+        self.assertEqual(logs[1].new_values, {'priority': 'high'})
+
+
+@override_settings(AUDIT_ASYNC=True)
+class AuditWriterTests(TestCase):
+    @override_settings(AUDIT_BATCH_SIZE=2, AUDIT_FLUSH_INTERVAL=0.05)
+    def test_entries_are_batched_and_drained_on_close(self):
+        batches = []
+        writer = AuditWriter(batches.append)
+        for n in range(5):
+            writer.submit(n)
+        writer.flush()
+        self.assertEqual(sorted(n for batch in batches for n in batch), list(range(5)))
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        writer.submit(5)
+        writer.close()
+        self.assertFalse(writer.thread.is_alive())
+        self.assertEqual(sum(len(batch) for batch in batches), 6)
+
+    @override_settings(AUDIT_QUEUE_SIZE=1, AUDIT_QUEUE_TIMEOUT=0.01, AUDIT_BATCH_SIZE=1)
+    def test_full_queue_writes_in_caller_thread(self):
+        release = threading.Event()
+        writers = []
+
+        def write_batch(entries):
+            writers.append(threading.current_thread().name)
+            if threading.current_thread().name == 'audit-writer':
+                release.wait(5)
+
+        writer = AuditWriter(write_batch)
+        writer.submit(1)  # picked up by the thread, which then blocks
+        while not writers:
+            time.sleep(0.001)
+        writer.submit(2)  # fills the queue
+        with self.assertLogs('api.audit', 'WARNING'):
+            writer.submit(3)  # queue full: written by the caller
+        self.assertEqual(writers[-1], threading.current_thread().name)
+        release.set()
+        writer.close()
+
+
+class AsyncAuditWriterTests(TransactionTestCase):
+    @override_settings(AUDIT_ASYNC=True)
+    def test_thread_writes_and_closes_its_connection(self):
+        connections_used = []
+
+        def write_batch(entries):
+            write_admin_logs(entries)
+            connections_used.append(connections['default'])  # the writer thread's own
+
+        writer = AuditWriter(write_batch)
+        writer.submit(AdminLog(action='create', table_name='clients', record_id='1'))
+        writer.close()
+        self.assertFalse(writer.thread.is_alive())
+        self.assertEqual(AdminLog.objects.count(), 1)
+        [used] = connections_used
+        self.assertIsNot(used, connections['default'])
+        # Django keeps in-memory SQLite test databases open
+        if not (used.vendor == 'sqlite' and used.is_in_memory_db()):
+            self.assertIsNone(used.connection)
+
+
+class DatabaseStatsTests(APITestMixin, TestCase):
+    def test_requires_staff(self):
+        response = self.api.get('/api/health/database/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_counts_requests(self):
+        self.user.is_staff = True
+        self.user.save()
+        first = self.api.get('/api/health/database/').json()
+        second = self.api.get('/api/health/database/').json()
+        self.assertEqual(first['mode'], 'persistent')
+        self.assertNotIn('pool', first)
+        self.assertEqual(second['requests'], first['requests'] + 1)
+        self.assertIn('requests_per_connection', second)
+
+
+@override_settings(DATABASE_REPLICAS=['default'])
+class ReplicaRoutingTests(APITestMixin, TestCase):
+    # The default database stands in for the replica
+    def setUp(self):
+        super().setUp()
+        replica_status.clear()
+
+    def test_router(self):
+        router = ReplicaRouter()
+        token = current_replica.set('default')
+        self.assertEqual(router.db_for_read(Client), 'default')
+        current_replica.reset(token)
+        self.assertIsNone(router.db_for_read(Client))
+        self.assertEqual(router.db_for_write(Client), 'default')
+        with override_settings(DATABASE_REPLICAS=['replica1']):
+            self.assertFalse(router.allow_migrate('replica1', 'core'))
+            self.assertTrue(router.allow_migrate('default', 'core'))
+
+    def test_recent_writes_read_from_primary(self):
+        other = User.objects.create_user('other@example.com', 'other@example.com', 'testpass123')
+        self.assertEqual(choose_replica(self.user, [Client]), 'default')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post('/api/clients/', {
+                'first_name': 'Ana', 'last_name': 'Cruz', 'email': 'ana@example.com',
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(choose_replica(self.user, [Hearing]))  # the writer is sticky
+        self.assertIsNone(choose_replica(other, [Client]))  # so is the written table
+        self.assertEqual(choose_replica(other, [Hearing]), 'default')
+
+    def test_unavailable_replica_is_skipped(self):
+        with mock.patch.object(connections['default'], 'ensure_connection', side_effect=OperationalError('down')):
+            with self.assertLogs('api.replicas', 'WARNING'):
+                self.assertIsNone(choose_replica(self.user, [Client]))
+        # Not rechecked until READ_REPLICA_CHECK_INTERVAL has passed
+        self.assertIsNone(choose_replica(self.user, [Client]))
+
+    def test_failed_replica_read_retries_on_primary(self):
+        self.create_client()
+        build = ClientListView.get_list_response
+        used = []
+
+        def flaky(view, request):
+            used.append(current_replica.get())
+            if len(used) == 1:
+                raise OperationalError('replica went away')
+            return build(view, request)
+
+        with mock.patch.object(ClientListView, 'get_list_response', flaky), self.assertLogs('api.replicas', 'WARNING'):
+            response = self.api.get('/api/clients/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(used, ['default', None])
+
+    def test_async_views_read_from_replicas(self):
+        self.create_client()
+        build = AsyncClientListView.get_list_data
+        used = []
+
+        async def flaky(view, request):
+            used.append(current_replica.get())
+            if len(used) == 1:
+                raise OperationalError('replica went away')
+            return await build(view, request)
+
+        request = AsyncRequestFactory().get(
+            '/api/clients/', headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'},
+        )
+        token = current_replica.set(None)
+        try:
+            with mock.patch.object(AsyncClientListView, 'get_list_data', flaky), \
+                    self.assertLogs('api.replicas', 'WARNING'):
+                response = async_to_sync(AsyncClientListView.as_view())(request)
+        finally:
+            current_replica.reset(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)), 1)
+        self.assertEqual(used, ['default', None])
+
+
+class FastSerializerTests(APITestMixin, TestCase):
+    def test_same_output_as_model_serializers(self):
+        client = self.create_client(first_name='Ma\u00f1a', date_of_birth='1990-02-03')
+        self.create_client(1, email=None)
+        case = self.create_case(client, estimated_value=Decimal('1234.5'), start_date='2024-01-31')
+        self.create_case(client, 1)
+        self.create_hearing(case, location='Hall\u2028B')
+        for fast_serializer, serializer, queryset in [
+            (FastClientSerializer, ClientSerializer, Client.objects.all()),
+            (FastCaseSerializer, CaseSerializer, Case.objects.with_client_name()),
+            (FastHearingSerializer, HearingSerializer, Hearing.objects.with_case_details()),
+        ]:
+            with self.subTest(serializer=serializer.__name__):
+                expected = serializer(queryset.order_by('pk'), many=True).data
+                data = fast_serializer(fast_serializer.get_values(queryset.order_by('pk'))).data
+                self.assertEqual(data, expected)
+                self.assertEqual([list(row) for row in data], [list(row) for row in expected])
+
+    def test_renderer_matches_json_renderer(self):
+        data = {
+            'per_client': {3: 1, 12: 4},
+            'at': datetime(2024, 5, 1, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'local': datetime(2024, 5, 1, 9, 30, tzinfo=dt_timezone(timedelta(hours=8))),
+            'day': date(2024, 5, 1),
+            'amount': Decimal('10.50'),
+            'text': 'caf\u00e9 \u2028 "quoted"',
+            'rows': [{'id': 1, 'ok': True, 'none': None, 'ratio': 0.25}],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+        indented = ORJSONRenderer().render(data, 'application/json; indent=4')
+        self.assertEqual(indented, JSONRenderer().render(data, 'application/json; indent=4'))
+
+    def test_paginated_list(self):
+        client = self.create_client()
+        for index in range(3):
+            self.create_case(client, index)
+        first = self.api.get('/api/cases/?page_size=2').json()
+        second = self.api.get(f"/api/cases/?page_size=2&cursor={first['next']}").json()
+        self.assertEqual([row['case_title'] for row in first['results'] + second['results']], ['Case 2', 'Case 1', 'Case 0'])
+        self.assertEqual(first['results'][0]['client_name'], 'First0 Last0')
+        self.assertIsNone(second['next'])
+
+
+class SparseFieldsetTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client_record = self.create_client(notes='Long notes', opposing_parties='Someone')
+        self.case = self.create_case(self.client_record, description='Long description')
+        self.create_case(self.client_record, 1)
+
+    def test_list_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get('/api/clients/?fields=client_id,first_name,last_name')
+        self.assertEqual(response.json(), [
+            {'client_id': self.client_record.client_id, 'first_name': 'First0', 'last_name': 'Last0'},
+        ])
+        select = queries.captured_queries[-1]['sql']
+        self.assertIn('first_name', select)
+        self.assertNotIn('notes', select)
+
+    def test_list_exclude_keeps_cursor(self):
+        first = self.api.get('/api/cases/?exclude=description,created_at&page_size=1').json()
+        self.assertNotIn('description', first['results'][0])
+        self.assertNotIn('created_at', first['results'][0])
+        self.assertIn('client_name', first['results'][0])
+        second = self.api.get(f"/api/cases/?exclude=description,created_at&page_size=1&cursor={first['next']}").json()
+        self.assertEqual([first['results'][0]['case_title'], second['results'][0]['case_title']], ['Case 1', 'Case 0'])
+
+    def test_detail_fields(self):
+        path = f'/api/cases/{self.case.case_id}/'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get(f'{path}?fields=case_title,client_name')
+        self.assertEqual(response.json(), {'case_title': 'Case 0', 'client_name': 'First0 Last0'})
+        self.assertNotIn('description', queries.captured_queries[-1]['sql'])
+        # Each selection is cached under its own ETag
+        self.assertNotEqual(response['ETag'], self.api.get(path)['ETag'])
+        self.assertIn('description', self.api.get(path).json())
+
+    def test_unknown_field(self):
+        response = self.api.get('/api/hearings/?fields=case_title,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.json()['fields'])
+        response = self.api.get(f'/api/clients/{self.client_record.client_id}/?exclude=first_name,missing')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exclude', response.json())
+
+
+class CompressionTests(APITestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        endpoint_stats.clear()
+        for index in range(20):
+            self.create_client(index, notes='Repeated note ' * 5)
+
+    def test_gzip_list(self):
+        plain = self.api.get('/api/clients/')
+        response = self.api.get('/api/clients/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        # The weak ETag still revalidates
+        response = self.api.get('/api/clients/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_small_or_refused_bodies_are_not_compressed(self):
+        client = Client.objects.first()
+        response = self.api.get(f'/api/clients/{client.client_id}/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        response = self.api.get('/api/clients/', HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_streamed_export(self):
+        response = self.api.get('/api/export/clients/?format=csv', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertEqual(len(body.splitlines()), 21)
+
+    def test_negotiation(self):
+        with override_settings(COMPRESSION_ENCODINGS=('gzip',)):
+            self.assertEqual(choose_encoding('GZIP'), 'gzip')
+            self.assertEqual(choose_encoding('br, *;q=0.5'), 'gzip')
+            self.assertIsNone(choose_encoding('br'))
+            self.assertIsNone(choose_encoding('*;q=0'))
+            self.assertIsNone(choose_encoding(''))
+
+    def test_stats(self):
+        self.api.get('/api/clients/', HTTP_ACCEPT_ENCODING='gzip')
+        self.api.get('/api/clients/')
+        self.user.is_staff = True
+        self.user.save()
+        stats = self.api.get('/api/health/compression/').json()['endpoints']['client_list']
+        self.assertEqual((stats['responses'], stats['compressed'], stats['encodings']), (2, 1, {'gzip': 1}))
+        self.assertGreater(stats['saved_bytes'], 0)
+        self.assertLess(stats['ratio'], 1)
+
+
+class PartitionTests(TestCase):
+    def test_admin_changelist_defaults_to_recent_partitions(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'adminpass123')
+        self.client.force_login(admin_user)
+        recent = AdminLog.objects.create(action='create', table_name='cases')
+        old = AdminLog.objects.create(action='create', table_name='cases')
+        AdminLog.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=400))
+
+        response = self.client.get('/admin/core/adminlog/')
+        self.assertEqual([log.pk for log in response.context['cl'].result_list], [recent.pk])
+        response = self.client.get('/admin/core/adminlog/?created_within=all')
+        self.assertEqual([log.pk for log in response.context['cl'].result_list], [recent.pk, old.pk])
+
+    def test_due_partitions(self):
+        now = datetime(2026, 10, 17, tzinfo=dt_timezone.utc)
+        manager = PartitionManager(None, 'notifications', {'retention_months': 12, 'expire': 'drop'})
+        existing = {
+            parse_partition_month('notifications', name): name
+            for name in ('notifications_p2025_09', 'notifications_p2025_10', 'notifications_p2026_10')
+        }
+        with mock.patch.object(manager, 'partitions', return_value=existing), \
+                override_settings(PARTITION_MONTHS_AHEAD=3):
+            missing = [partition_name('notifications', month) for month in manager.missing_months(now)]
+            expired = manager.expired_partitions(now)
+        self.assertEqual(missing, ['notifications_p2026_11', 'notifications_p2026_12', 'notifications_p2027_01'])
+        self.assertEqual(expired, ['notifications_p2025_09'])
+        self.assertIsNone(parse_partition_month('notifications', 'admin_logs_p2026_10'))
+
+    def test_command_requires_postgresql(self):
+        with mock.patch('api.management.commands.manage_partitions.connection') as connection, \
+                self.assertRaises(CommandError):
+            connection.vendor = 'sqlite'
+            call_command('manage_partitions', stdout=StringIO())
@@ -1,14 +1,44 @@
+from django.conf import settings
 from django.urls import path
 from . import views
+from .async_views import NotificationStreamView
+
+# Async-native list/detail views for ASGI deployments (see api/async_views.py)
+if settings.API_ASYNC_VIEWS:
+    from .async_views import (
+        AsyncCaseListView as CaseListView, AsyncCaseDetailView as CaseDetailView,
+        AsyncClientListView as ClientListView, AsyncClientDetailView as ClientDetailView,
+        AsyncHearingListView as HearingListView, AsyncHearingDetailView as HearingDetailView,
+    )
+else:
+    from .views import (
+        CaseListView, CaseDetailView, ClientListView, ClientDetailView, HearingListView, HearingDetailView,
+    )
 
 urlpatterns = [
     path('health/', views.health_check, name='health_check'),
-    path('cases/', views.CaseListView.as_view(), name='case_list'),
-    path('cases/<int:case_id>/', views.CaseDetailView.as_view(), name='case_detail'),
-    path('clients/', views.ClientListView.as_view(), name='client_list'),
-    path('clients/<int:client_id>/', views.ClientDetailView.as_view(), name='client_detail'),
-    path('hearings/', views.HearingListView.as_view(), name='hearing_list'),
-    path('hearings/<int:hearing_id>/', views.HearingDetailView.as_view(), name='hearing_detail'),
+    path('health/database/', views.DatabaseStatsView.as_view(), name='database_stats'),
+    path('health/compression/', views.CompressionStatsView.as_view(), name='compression_stats'),
+    path('cases/', CaseListView.as_view(), name='case_list'),
+    path('cases/<int:case_id>/', CaseDetailView.as_view(), name='case_detail'),
+    path('cases/bulk/', views.CaseBulkView.as_view(), name='case_bulk'),
+    path('clients/', ClientListView.as_view(), name='client_list'),
+    path('clients/<int:client_id>/', ClientDetailView.as_view(), name='client_detail'),
+    path('clients/bulk/', views.ClientBulkView.as_view(), name='client_bulk'),
+    path('hearings/', HearingListView.as_view(), name='hearing_list'),
+    path('hearings/<int:hearing_id>/', HearingDetailView.as_view(), name='hearing_detail'),
+    path('hearings/bulk/', views.HearingBulkView.as_view(), name='hearing_bulk'),
+    path('hearings/conflicts/', views.HearingConflictView.as_view(), name='hearing_conflicts'),
+    path('hearings/calendar/', views.HearingCalendarView.as_view(), name='hearing_calendar'),
+    path('hearings/calendar/feed/', views.HearingFeedLinkView.as_view(), name='hearing_feed_link'),
+    path('hearings/calendar/<str:token>.ics', views.HearingFeedView.as_view(), name='hearing_feed'),
+    path('dashboard/stats/', views.DashboardStatsView.as_view(), name='dashboard_stats'),
+    path('export/<str:entity>/', views.ExportView.as_view(), name='export'),
+    path('notifications/', views.NotificationListView.as_view(), name='notification_list'),
+    path('notifications/mark-read/', views.NotificationMarkReadView.as_view(), name='notification_mark_read'),
+    path('notifications/stream/', NotificationStreamView.as_view(), name='notification_stream'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('sync/', views.SyncView.as_view(), name='sync'),
     path('register/', views.RegisterView.as_view(), name='register'),
     path('profile/', views.ProfileView.as_view(), name='profile'),
 ]
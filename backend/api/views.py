@@ -1,24 +1,71 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth.models import User
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.decorators import permission_classes
-from .serializers import UserSerializer, ClientSerializer, CaseSerializer, HearingSerializer
-from core.models import Client, Case, Hearing
+from .bulk import CaseBulkWriter, ClientBulkWriter, HearingBulkWriter
+from .caching import add_validators, conditional_response, etag_matches, list_etag, make_etag
+from .compression import get_compression_stats
+from .dbstats import get_database_stats
+from .export import EXPORTS, stream_csv, stream_ndjson
+from .filters import CaseFilter, ClientFilter, HearingFilter
+from .ical import HearingFeed, make_feed_token, read_feed_token
+from .notifications import get_profile_id
+from .pagination import KeysetPagination
+from .renderers import CSVRenderer, ICalendarRenderer, NDJSONRenderer
+from .replicas import ReplicaReadMixin, current_replica
+from .scheduling import find_conflicts, get_case_lawyer
+from .search import SEARCH_TARGETS, search
+from .signals import collect_deletions
+from .stats import get_dashboard_stats
+from .sync import SyncTokenError, SyncTokenExpired, get_changes
+from .serializers import UserSerializer, ClientSerializer, CaseSerializer, HearingSerializer, NotificationSerializer
+from .serializers import HearingCalendarQuerySerializer, HearingConflictQuerySerializer, HearingConflictSerializer
+from .serializers import FastCaseSerializer, FastClientSerializer, FastHearingSerializer, get_fieldset
+from core.models import Client, Case, Hearing, Notification
 
 @permission_classes([AllowAny])
 def health_check(request):
     return JsonResponse({'status': 'ok', 'message': 'Backend is running'})
 
-class CaseListView(APIView):
+class DatabaseStatsView(APIView):
+    """Connection pooling metrics for this worker process (staff only)."""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response(get_database_stats())
+
+class CompressionStatsView(APIView):
+    """Raw vs compressed response bytes per endpoint for this worker (staff only)."""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return Response(get_compression_stats())
+
+class CaseListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    replica_models = (Case, Client)
     
     def get(self, request):
-        cases = Case.objects.all()
-        serializer = CaseSerializer(cases, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        etag = list_etag(request, Case, Client)
+        return conditional_response(request, etag, lambda: self.get_list_response(request))
+    
+    def get_list_response(self, request):
+        case_filter = CaseFilter(request.query_params)
+        cases = case_filter.filter_queryset(Case.objects.with_client_name())
+        paginator = KeysetPagination(ordering=case_filter.get_ordering())
+        fields = get_fieldset(request.query_params, CaseSerializer)
+        # Cursors are built from the ordering columns, selected or not
+        rows = FastCaseSerializer.get_values(cases, fields, extra=[name for name, _ in paginator.get_fields()])
+        page = paginator.paginate_queryset(rows, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(FastCaseSerializer(page, fields).data)
+        return Response(FastCaseSerializer(rows, fields).data, status=status.HTTP_200_OK)
     
     def post(self, request):
         serializer = CaseSerializer(data=request.data)
@@ -27,24 +74,31 @@ class CaseListView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class CaseDetailView(APIView):
+class CaseDetailView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    replica_models = (Case, Client)
+    read_queryset = Case.objects.with_client_name().with_last_modified()
+    write_queryset = Case.objects.select_related('client')
     
-    def get_object(self, case_id):
+    def get_object(self, case_id, queryset):
         try:
-            return Case.objects.get(case_id=case_id)
+            return queryset.get(case_id=case_id)
         except Case.DoesNotExist:
             return None
     
     def get(self, request, case_id):
-        case = self.get_object(case_id)
+        fields = get_fieldset(request.query_params, CaseSerializer)
+        case = self.get_object(case_id, CaseSerializer.only_fields(self.read_queryset, fields))
         if not case:
             return Response({'error': 'Case not found'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = CaseSerializer(case)
-        return Response(serializer.data)
+        etag = make_etag('case', case.case_id, case.last_modified.isoformat(), *(fields or ()))
+        return conditional_response(
+            request, etag, lambda: Response(CaseSerializer(case, fields=fields).data),
+            last_modified=case.last_modified,
+        )
     
     def put(self, request, case_id):
-        case = self.get_object(case_id)
+        case = self.get_object(case_id, self.write_queryset)
         if not case:
             return Response({'error': 'Case not found'}, status=status.HTTP_404_NOT_FOUND)
         serializer = CaseSerializer(case, data=request.data, partial=True)
@@ -54,19 +108,32 @@ class CaseDetailView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     def delete(self, request, case_id):
-        case = self.get_object(case_id)
+        case = self.get_object(case_id, Case.objects.all())
         if not case:
             return Response({'error': 'Case not found'}, status=status.HTTP_404_NOT_FOUND)
-        case.delete()
+        with collect_deletions():
+            case.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class ClientListView(APIView):
+class ClientListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    replica_models = (Client,)
     
     def get(self, request):
-        clients = Client.objects.all()
-        serializer = ClientSerializer(clients, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        etag = list_etag(request, Client)
+        return conditional_response(request, etag, lambda: self.get_list_response(request))
+    
+    def get_list_response(self, request):
+        client_filter = ClientFilter(request.query_params)
+        clients = client_filter.filter_queryset(Client.objects.all())
+        paginator = KeysetPagination(ordering=client_filter.get_ordering())
+        fields = get_fieldset(request.query_params, ClientSerializer)
+        # Cursors are built from the ordering columns, selected or not
+        rows = FastClientSerializer.get_values(clients, fields, extra=[name for name, _ in paginator.get_fields()])
+        page = paginator.paginate_queryset(rows, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(FastClientSerializer(page, fields).data)
+        return Response(FastClientSerializer(rows, fields).data, status=status.HTTP_200_OK)
     
     def post(self, request):
         serializer = ClientSerializer(data=request.data)
@@ -75,24 +142,31 @@ class ClientListView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ClientDetailView(APIView):
+class ClientDetailView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    replica_models = (Client,)
+    read_queryset = Client.objects.with_last_modified()
+    write_queryset = Client.objects.all()
     
-    def get_object(self, client_id):
+    def get_object(self, client_id, queryset):
         try:
-            return Client.objects.get(client_id=client_id)
+            return queryset.get(client_id=client_id)
         except Client.DoesNotExist:
             return None
     
     def get(self, request, client_id):
-        client = self.get_object(client_id)
+        fields = get_fieldset(request.query_params, ClientSerializer)
+        client = self.get_object(client_id, ClientSerializer.only_fields(self.read_queryset, fields))
         if not client:
             return Response({'error': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = ClientSerializer(client)
-        return Response(serializer.data)
+        etag = make_etag('client', client.client_id, client.last_modified.isoformat(), *(fields or ()))
+        return conditional_response(
+            request, etag, lambda: Response(ClientSerializer(client, fields=fields).data),
+            last_modified=client.last_modified,
+        )
     
     def put(self, request, client_id):
-        client = self.get_object(client_id)
+        client = self.get_object(client_id, self.write_queryset)
         if not client:
             return Response({'error': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
         serializer = ClientSerializer(client, data=request.data, partial=True)
@@ -102,19 +176,32 @@ class ClientDetailView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     def delete(self, request, client_id):
-        client = self.get_object(client_id)
+        client = self.get_object(client_id, Client.objects.all())
         if not client:
             return Response({'error': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
-        client.delete()
+        with collect_deletions():
+            client.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class HearingListView(APIView):
+class HearingListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    replica_models = (Hearing, Case, Client)
     
     def get(self, request):
-        hearings = Hearing.objects.all().order_by('-hearing_date')
-        serializer = HearingSerializer(hearings, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        etag = list_etag(request, Hearing, Case, Client)
+        return conditional_response(request, etag, lambda: self.get_list_response(request))
+    
+    def get_list_response(self, request):
+        hearing_filter = HearingFilter(request.query_params)
+        hearings = hearing_filter.filter_queryset(Hearing.objects.with_case_details())
+        paginator = KeysetPagination(ordering=hearing_filter.get_ordering())
+        fields = get_fieldset(request.query_params, HearingSerializer)
+        # Cursors are built from the ordering columns, selected or not
+        rows = FastHearingSerializer.get_values(hearings, fields, extra=[name for name, _ in paginator.get_fields()])
+        page = paginator.paginate_queryset(rows, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(FastHearingSerializer(page, fields).data)
+        return Response(FastHearingSerializer(rows, fields).data, status=status.HTTP_200_OK)
     
     def post(self, request):
         serializer = HearingSerializer(data=request.data)
@@ -123,24 +210,31 @@ class HearingListView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class HearingDetailView(APIView):
+class HearingDetailView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    replica_models = (Hearing, Case, Client)
+    read_queryset = Hearing.objects.with_case_details().with_last_modified()
+    write_queryset = Hearing.objects.select_related('case__client')
     
-    def get_object(self, hearing_id):
+    def get_object(self, hearing_id, queryset):
         try:
-            return Hearing.objects.get(hearing_id=hearing_id)
+            return queryset.get(hearing_id=hearing_id)
         except Hearing.DoesNotExist:
             return None
     
     def get(self, request, hearing_id):
-        hearing = self.get_object(hearing_id)
+        fields = get_fieldset(request.query_params, HearingSerializer)
+        hearing = self.get_object(hearing_id, HearingSerializer.only_fields(self.read_queryset, fields))
         if not hearing:
             return Response({'error': 'Hearing not found'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = HearingSerializer(hearing)
-        return Response(serializer.data)
+        etag = make_etag('hearing', hearing.hearing_id, hearing.last_modified.isoformat(), *(fields or ()))
+        return conditional_response(
+            request, etag, lambda: Response(HearingSerializer(hearing, fields=fields).data),
+            last_modified=hearing.last_modified,
+        )
     
     def put(self, request, hearing_id):
-        hearing = self.get_object(hearing_id)
+        hearing = self.get_object(hearing_id, self.write_queryset)
         if not hearing:
             return Response({'error': 'Hearing not found'}, status=status.HTTP_404_NOT_FOUND)
         serializer = HearingSerializer(hearing, data=request.data, partial=True)
@@ -150,12 +244,92 @@ class HearingDetailView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     def delete(self, request, hearing_id):
-        hearing = self.get_object(hearing_id)
+        hearing = self.get_object(hearing_id, Hearing.objects.all())
         if not hearing:
             return Response({'error': 'Hearing not found'}, status=status.HTTP_404_NOT_FOUND)
-        hearing.delete()
+        with collect_deletions():
+            hearing.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class HearingConflictView(APIView):
+    """
+    Scheduled hearings that would clash with a proposed slot:
+    ?hearing_date=&duration_minutes=&case_id= (or lawyer=)&judge_name=&location=&exclude=
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        query = HearingConflictQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = query.validated_data
+        lawyer = params.get('lawyer')
+        if lawyer is None and 'case_id' in params:
+            lawyer = get_case_lawyer(params['case_id'])
+        conflicts = find_conflicts(
+            params['hearing_date'], params['duration_minutes'], lawyer=lawyer,
+            judge_name=params.get('judge_name'), location=params.get('location'), exclude_pk=params.get('exclude'),
+        )
+        return Response({'conflicts': HearingConflictSerializer(conflicts, many=True).data})
+
+class HearingCalendarView(ReplicaReadMixin, APIView):
+    """
+    Hearings starting in [start, end), oldest first, for the calendar UI.
+    A range scan on hearings_date_idx instead of the whole list.
+    """
+    permission_classes = [IsAuthenticated]
+    replica_models = (Hearing, Case, Client)
+    
+    def get(self, request):
+        query = HearingCalendarQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+        etag = list_etag(request, Hearing, Case, Client)
+        return conditional_response(request, etag, lambda: self.get_calendar_response(query.validated_data))
+    
+    def get_calendar_response(self, params):
+        hearings = Hearing.objects.with_case_details().filter(
+            hearing_date__gte=params['start'], hearing_date__lt=params['end'],
+        )
+        if 'lawyer' in params:
+            hearings = hearings.filter(case__lawyer_assigned=params['lawyer'])
+        if 'status' in params:
+            hearings = hearings.filter(status=params['status'])
+        hearings = hearings.order_by('hearing_date', 'hearing_id')
+        return Response(HearingSerializer(hearings, many=True).data)
+
+class HearingFeedLinkView(APIView):
+    """Subscription URL for a lawyer's .ics feed (?lawyer=)."""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        lawyer = request.query_params.get('lawyer')
+        if not lawyer:
+            return Response({'error': 'lawyer is required'}, status=status.HTTP_400_BAD_REQUEST)
+        path = reverse('hearing_feed', kwargs={'token': make_feed_token(lawyer)})
+        return Response({'lawyer': lawyer, 'url': request.build_absolute_uri(path)})
+
+class HearingFeedView(APIView):
+    """
+    A lawyer's hearings as iCalendar. Calendar apps cannot send a bearer
+    token, so access is granted by the signed token in the URL.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    renderer_classes = [ICalendarRenderer]
+    
+    def get(self, request, token):
+        lawyer = read_feed_token(token)
+        if lawyer is None:
+            return Response({'error': 'Feed not found'}, status=status.HTTP_404_NOT_FOUND)
+        feed = HearingFeed(lawyer)
+        etag = feed.get_etag()
+        if etag_matches(request, etag):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(feed.render(etag), content_type='text/calendar; charset=utf-8')
+        return add_validators(response, etag, None)
+
 class RegisterView(APIView):
     permission_classes = [AllowAny]
     
@@ -172,3 +346,155 @@ class ProfileView(APIView):
     def get(self, request):
         serializer = UserSerializer(request.user)
         return Response(serializer.data)
+
+class SearchView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    replica_models = (Client, Case, Hearing)
+    
+    def get(self, request):
+        term = request.query_params.get('q', '').strip()
+        if not term:
+            return Response({'error': 'Query parameter q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        types = [t.strip() for t in request.query_params.get('type', '').split(',') if t.strip()]
+        types = types or list(SEARCH_TARGETS)
+        unknown = [t for t in types if t not in SEARCH_TARGETS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown type(s): {', '.join(unknown)}. Use {', '.join(SEARCH_TARGETS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        try:
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', settings.SEARCH_PAGE_SIZE))
+        except ValueError:
+            return Response({'error': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if page < 1 or page_size < 1:
+            return Response({'error': 'page and page_size must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = min(page_size, settings.API_MAX_PAGE_SIZE)
+        offset = (page - 1) * page_size
+        if offset >= settings.SEARCH_MAX_RESULTS:
+            return Response(
+                {'error': f'Only the first {settings.SEARCH_MAX_RESULTS} results can be paged through'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        results, has_more = search(term, types, offset, page_size)
+        return Response({
+            'page': page,
+            'next': page + 1 if has_more else None,
+            'results': results,
+        })
+
+class DashboardStatsView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    replica_models = (Client, Case, Hearing)
+    
+    def get(self, request):
+        return Response(get_dashboard_stats())
+
+class BulkView(APIView):
+    """
+    POST a list of records to create them, PUT a list of partial records
+    (each with its id) to update them, DELETE a list of ids to remove them.
+    The whole batch is rejected with per-item errors if any item is invalid.
+    """
+    permission_classes = [IsAuthenticated]
+    writer_class = None
+    
+    def post(self, request):
+        writer = self.writer_class()
+        ids = writer.create(request.data)
+        if ids is None:
+            return Response({'errors': writer.get_errors()}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'created': len(ids), 'ids': ids}, status=status.HTTP_201_CREATED)
+    
+    def put(self, request):
+        writer = self.writer_class()
+        count = writer.update(request.data)
+        if count is None:
+            return Response({'errors': writer.get_errors()}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'updated': count})
+    
+    def delete(self, request):
+        writer = self.writer_class()
+        count = writer.delete(request.data)
+        if count is None:
+            return Response({'errors': writer.get_errors()}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'deleted': count})
+
+class ClientBulkView(BulkView):
+    writer_class = ClientBulkWriter
+
+class CaseBulkView(BulkView):
+    writer_class = CaseBulkWriter
+
+class HearingBulkView(BulkView):
+    writer_class = HearingBulkWriter
+
+class ExportView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    replica_models = (Client, Case, Hearing)
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    
+    def get(self, request, entity):
+        export = EXPORTS.get(entity)
+        if export is None:
+            return Response({'error': f"Unknown export '{entity}'"}, status=status.HTTP_404_NOT_FOUND)
+        
+        # Rows are read while streaming, after the request's replica is reset
+        rows = export.get_rows(request.query_params, using=current_replica.get())
+        file_format = request.accepted_renderer.format
+        if file_format == 'csv':
+            content = stream_csv(export.columns, rows)
+        else:
+            content = stream_ndjson(export.columns, rows)
+        response = StreamingHttpResponse(content, content_type=request.accepted_renderer.media_type)
+        filename = f"{entity}-{timezone.localdate():%Y%m%d}.{file_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class SyncView(APIView):
+    """
+    Delta sync for offline copies of clients, cases and hearings. Call
+    without ``since`` for everything, then with the returned ``next`` token.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            return Response(get_changes(request.query_params.get('since')))
+        except SyncTokenExpired as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_410_GONE)
+        except SyncTokenError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+class NotificationListView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        notifications = Notification.objects.filter(user_id=get_profile_id(request.user))
+        if request.query_params.get('unread') in ('1', 'true'):
+            notifications = notifications.filter(is_read=False)
+        paginator = KeysetPagination(ordering=('-created_at', '-notification_id'))
+        page = paginator.paginate_queryset(notifications, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(NotificationSerializer(page, many=True).data)
+        notifications = notifications.order_by('-created_at', '-notification_id')
+        return Response(NotificationSerializer(notifications, many=True).data)
+
+class NotificationMarkReadView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        notifications = Notification.objects.filter(user_id=get_profile_id(request.user), is_read=False)
+        if request.data.get('all') is not True:
+            ids = request.data.get('ids')
+            if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+                return Response(
+                    {'error': 'Send {"ids": [...]} with notification ids, or {"all": true}'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            notifications = notifications.filter(notification_id__in=ids)
+        return Response({'updated': notifications.update(is_read=True)})
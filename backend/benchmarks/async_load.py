@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Load test the list/detail endpoints at increasing concurrency to compare the
+WSGI path, the sync views under ASGI and the async views (API_ASYNC_VIEWS).
+
+Start one single-worker server per configuration, then point this script at
+it. The client is a small asyncio HTTP/1.1 keep-alive loop (standard library
+only), so it can hold hundreds of connections without becoming the
+bottleneck:
+
+    gunicorn casevault.wsgi -w 1 --threads 8 -b 127.0.0.1:8001
+    uvicorn casevault.asgi:application --workers 1 --port 8002
+    API_ASYNC_VIEWS=1 uvicorn casevault.asgi:application --workers 1 --port 8003
+
+    python benchmarks/async_load.py --url http://127.0.0.1:8003 \\
+        --email admin@nmmlaw.com --password admin123 --concurrency 10,50,200
+
+--bust-cache adds a unique query parameter to every request so each one
+misses the response cache and reaches the database.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    '/api/cases/?page_size=50',
+    '/api/clients/?page_size=50',
+    '/api/hearings/?page_size=50',
+]
+
+
+def get_token(url, email, password):
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/api/token/",
+        data=json.dumps({'username': email, 'password': password}).encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())['access']
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+async def client(host, port, token, paths, deadline, bust_cache, counter, results):
+    reader = writer = None
+    while time.monotonic() < deadline:
+        path = next(paths)
+        if bust_cache:
+            path += f"{'&' if '?' in path else '?'}_={next(counter)}"
+        request = (
+            f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAuthorization: Bearer {token}\r\n'
+            f'Accept: application/json\r\n\r\n'
+        ).encode()
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            results['errors'] += 1
+            writer = None
+            continue
+        results['latencies'].append(time.perf_counter() - started)
+        if status != 200:
+            results['errors'] += 1
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_level(url, token, paths, concurrency, seconds, bust_cache):
+    parts = urlsplit(url)
+    results = {'latencies': [], 'errors': 0}
+    deadline = time.monotonic() + seconds
+    path_cycle = itertools.cycle(paths)
+    counter = itertools.count()
+    await asyncio.gather(*(
+        client(parts.hostname, parts.port or 80, token, path_cycle, deadline, bust_cache, counter, results)
+        for _ in range(concurrency)
+    ))
+    latencies = sorted(results['latencies'])
+    if not latencies:
+        print(f'{concurrency:>5} connections: no successful requests ({results["errors"]} errors)')
+        return
+    print(
+        f'{concurrency:>5} connections: {len(latencies) / seconds:>8,.1f} req/s  '
+        f'p50 {statistics.median(latencies) * 1000:>7.1f} ms  '
+        f'p95 {latencies[int(len(latencies) * 0.95)] * 1000:>7.1f} ms  '
+        f'errors {results["errors"]}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--path', action='append', help='endpoint to request (repeatable)')
+    parser.add_argument('--concurrency', default='10,50,200', help='comma-separated connection counts')
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--bust-cache', action='store_true', help='make every request miss the response cache')
+    args = parser.parse_args()
+
+    token = get_token(args.url, args.email, args.password)
+    paths = args.path or DEFAULT_PATHS
+    print(f'{args.url}: {", ".join(paths)}')
+    for concurrency in (int(value) for value in args.concurrency.split(',')):
+        asyncio.run(run_level(args.url, token, paths, concurrency, args.seconds, args.bust_cache))
+
+
+if __name__ == '__main__':
+    main()
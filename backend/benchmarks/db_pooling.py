@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Compare per-request latency with each DB_POOL_MODE: a new connection per
+request ('none'), persistent health-checked connections ('persistent') and
+the psycopg 3 pool ('pool', needs ``pip install "psycopg[binary,pool]"``).
+
+Each mode runs in its own process, because the mode is read from the
+environment when settings load. ``--threads`` workers send authenticated
+GET /api/clients/<id>/ requests straight to the WSGI application for
+``--seconds``. Unlike Django's test client, this keeps the
+request_started/request_finished connection handling, so connections are
+opened and closed exactly as they are under a real server. The connection
+counters from /api/health/database/ are printed with each result.
+
+The savings grow with the cost of a connection, so point DATABASES at the
+real database host (TLS, network round trips) rather than a local socket:
+
+    python benchmarks/db_pooling.py --modes none,persistent,pool --threads 8
+"""
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from seed import BENCH_EMAIL_DOMAIN
+
+
+def run_worker(threads, seconds):
+    from seed import setup_django
+    setup_django()
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.dbstats import get_database_stats
+    from core.models import Client
+
+    client, _ = Client.objects.get_or_create(
+        email=f'pooling@{BENCH_EMAIL_DOMAIN}', defaults={'first_name': 'Bench', 'last_name': 'Pooling'},
+    )
+    user, _ = User.objects.get_or_create(username='bench-pooling', defaults={'email': f'bench-pooling@{BENCH_EMAIL_DOMAIN}'})
+    token = str(AccessToken.for_user(user))
+    connection.close()
+    application = get_wsgi_application()
+    host = settings.ALLOWED_HOSTS[0]
+    statuses = []
+
+    def get(path):
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+            'SERVER_NAME': host, 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_HOST': host,
+            'HTTP_AUTHORIZATION': f'Bearer {token}', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+            'wsgi.url_scheme': 'http', 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+            'wsgi.run_once': False, 'wsgi.version': (1, 0),
+        }
+        response = application(environ, lambda status, headers: statuses.append(status))
+        b''.join(response)
+        # What the server does after sending the body: fires request_finished
+        response.close()
+
+    deadline = time.monotonic() + seconds
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            get(f'/api/clients/{client.client_id}/')
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    latencies.sort()
+    stats = get_database_stats()
+    print(
+        f"{settings.DB_POOL_MODE:>10}: {len(latencies) / seconds:>8,.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:>6.2f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:>6.2f} ms  "
+        f"connections opened {stats['connections_opened']}  "
+        f"errors {sum(not status.startswith('200') for status in statuses)}"
+    )
+    if 'pool' in stats:
+        pool = stats['pool']
+        print(
+            f"{'':>10}  pool size {pool.get('pool_size')}  "
+            f"waits {pool.get('requests_waiting', 0)} queued / {pool.get('requests_wait_ms', 0)} ms total"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='none,persistent,pool', help='comma-separated DB_POOL_MODE values')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.threads, args.seconds)
+        return
+    print(f'{args.threads} threads, {args.seconds}s per mode')
+    for mode in args.modes.split(','):
+        result = subprocess.run(
+            [sys.executable, __file__, '--worker', '--threads', str(args.threads), '--seconds', str(args.seconds)],
+            env={**os.environ, 'DB_POOL_MODE': mode}, capture_output=True, text=True,
+        )
+        if result.returncode:
+            print(f'{mode:>10}: failed\n{result.stderr.strip().splitlines()[-1]}')
+        else:
+            print(result.stdout, end='')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Show query plans for the hot list/dashboard queries with and without the
+indexes added in core/migrations/0002_hot_query_indexes.py.
+
+The "before" plans are captured inside a transaction that drops the indexes
+and is then rolled back, so the schema is left untouched. DROP INDEX holds an
+exclusive lock on the table until the rollback; use a development database.
+
+    python benchmarks/explain_indexes.py --seed --clients 100000
+    python benchmarks/explain_indexes.py --cleanup
+"""
+import argparse
+
+from seed import cleanup, seed, setup_django
+
+setup_django()
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Case, Hearing, Notification, UserProfile
+
+INDEXES = [
+    'cases_created_idx',
+    'cases_status_priority_idx',
+    'cases_lawyer_status_idx',
+    'cases_active_lawyer_idx',
+    'clients_created_idx',
+    'clients_name_idx',
+    'hearings_date_idx',
+    'hearings_upcoming_idx',
+    'notifications_user_idx',
+    'notifications_unread_idx',
+]
+
+
+def hot_queries():
+    profile = UserProfile.objects.filter(django_user__username__startswith='bench-').first()
+    now = timezone.now()
+    queries = {
+        'Case list, newest first': Case.objects.with_client_name().order_by('-created_at', '-case_id')[:50],
+        'Cases by status and priority': Case.objects.filter(status='pending', priority='high')[:50],
+        'Active cases per lawyer': Case.objects.filter(
+            status='active', lawyer_assigned='Atty. Ylde Mendez').order_by('-created_at')[:50],
+        'Hearing list by date': Hearing.objects.with_case_details().order_by('-hearing_date', '-hearing_id')[:50],
+        'Upcoming scheduled hearings': Hearing.objects.filter(
+            status='scheduled', hearing_date__gte=now).order_by('hearing_date')[:50],
+    }
+    if profile is not None:
+        queries['Unread notifications for a user'] = Notification.objects.filter(
+            user=profile, is_read=False).order_by('-created_at')[:50]
+    return queries
+
+
+def explain_all(label, analyze):
+    print(f'\n===== {label} =====')
+    options = {'analyze': True} if analyze and connection.vendor == 'postgresql' else {}
+    for name, queryset in hot_queries().items():
+        print(f'\n-- {name}')
+        print(queryset.explain(**options))
+
+
+class Rollback(Exception):
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', action='store_true', help='insert a synthetic dataset first')
+    parser.add_argument('--clients', type=int, default=10000)
+    parser.add_argument('--cleanup', action='store_true', help='remove the synthetic dataset and exit')
+    parser.add_argument('--no-analyze', action='store_true', help='plan only, do not execute the queries')
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed:
+        seed(clients=args.clients)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE clients, cases, hearings, notifications')
+
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for name in INDEXES:
+                    cursor.execute(f'DROP INDEX IF EXISTS {connection.ops.quote_name(name)}')
+            explain_all('Before (new indexes dropped)', analyze=not args.no_analyze)
+            raise Rollback
+    except Rollback:
+        pass
+
+    explain_all('After', analyze=not args.no_analyze)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Measure /api/token/ logins per second, the "morning login storm".
+
+Creates ``--users`` accounts (``bench-login-<n>`` with a
+``@bench.casevault.test`` email), then has ``--threads`` workers log in with
+mixed-case emails for ``--seconds`` and reports throughput and latency
+percentiles. Wrong passwords are mixed in (``--fail-ratio``) because failed
+logins cost a full hash too. The lookup's query plan is printed first so you
+can confirm auth_user_email_lower_idx is used.
+
+Requests go through Django's test client in-process unless ``--url`` points
+at a running server (e.g. http://localhost:8000). The hasher cost comes from
+PASSWORD_HASH_ITERATIONS, so compare runs with different values:
+
+    PASSWORD_HASH_ITERATIONS=260000 python benchmarks/login_throughput.py
+    python benchmarks/login_throughput.py --url http://localhost:8000 --threads 16
+    python benchmarks/login_throughput.py --cleanup
+"""
+import argparse
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from seed import BENCH_EMAIL_DOMAIN, cleanup, setup_django
+
+setup_django()
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.test import Client
+
+PASSWORD = 'bench-password-123'
+
+
+def create_users(count):
+    existing = User.objects.filter(username__startswith='bench-login-').count()
+    if existing >= count:
+        return
+    # One hash shared by all accounts keeps seeding fast
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(username=f'bench-login-{i}', email=f'bench-login-{i}@{BENCH_EMAIL_DOMAIN}', password=password)
+        for i in range(existing, count)
+    )
+
+
+def explain_lookup():
+    email = f'bench-login-0@{BENCH_EMAIL_DOMAIN}'
+    queryset = User.objects.alias(email_lower=Lower('email')).filter(Q(email_lower=email) | Q(username=email))
+    print('-- EmailBackend lookup')
+    print(queryset.explain())
+
+
+def login_in_process(email, password):
+    response = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0]).post(
+        '/api/token/', {'username': email, 'password': password}
+    )
+    return response.status_code
+
+
+def make_login_over_http(url):
+    def login(email, password):
+        body = json.dumps({'username': email, 'password': password}).encode()
+        request = urllib.request.Request(
+            f"{url.rstrip('/')}/api/token/", data=body, headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+    return login
+
+
+def run(login, users, threads, seconds, fail_ratio):
+    deadline = time.monotonic() + seconds
+    latencies, unexpected = [], []
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local, bad = [], 0
+        while time.monotonic() < deadline:
+            n = rng.randrange(users)
+            email = f'Bench-Login-{n}@{BENCH_EMAIL_DOMAIN.upper()}'
+            fail = rng.random() < fail_ratio
+            started = time.perf_counter()
+            code = login(email, 'wrong-password' if fail else PASSWORD)
+            local.append(time.perf_counter() - started)
+            if code != (401 if fail else 200):
+                bad += 1
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            unexpected.append(bad)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    latencies.sort()
+    print(f'\n{len(latencies)} logins in {seconds}s with {threads} threads: {len(latencies) / seconds:,.1f} logins/s')
+    if latencies:
+        print(f'p50 {statistics.median(latencies) * 1000:.1f} ms, '
+              f'p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms, '
+              f'max {latencies[-1] * 1000:.1f} ms')
+    print(f'Unexpected status codes: {sum(unexpected)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--fail-ratio', type=float, default=0.1)
+    parser.add_argument('--url', help='log in against a running server instead of in-process')
+    parser.add_argument('--cleanup', action='store_true', help='remove the benchmark users and exit')
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    # Every failed login would otherwise log an "Unauthorized" warning
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    create_users(args.users)
+    explain_lookup()
+    iterations = settings.PASSWORD_HASH_ITERATIONS or 'Django default'
+    print(f'PBKDF2 iterations: {iterations}')
+    login = make_login_over_http(args.url) if args.url else login_in_process
+    run(login, args.users, args.threads, args.seconds, args.fail_ratio)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+Seeded rows are tagged so they can be removed again: clients use the
+``@bench.casevault.test`` email domain and users are named ``bench-<n>``.
+Run the benchmarks against a development database, never production.
+"""
+import os
+import random
+import sys
+from datetime import timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'casevault.settings')
+    import django
+    django.setup()
+
+
+BENCH_EMAIL_DOMAIN = 'bench.casevault.test'
+LAWYERS = [
+    'Atty. Prince Arthur M. Neyra',
+    'Atty. Cloydie Mark A. Marcos',
+    'Atty. Ylde Mendez',
+    'Atty. Carl Jungco',
+]
+
+
+def seed(clients=10000, cases_per_client=3, hearings_per_case=2, users=20,
+         notifications_per_user=500, batch_size=5000, stdout=sys.stdout):
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from core.models import Client, Case, Hearing, Notification, UserProfile
+
+    rng = random.Random(42)
+    now = timezone.now()
+
+    stdout.write(f'Seeding {clients} clients...\n')
+    Client.objects.bulk_create(
+        (Client(first_name=f'Bench{i}', last_name=f'Client{i % 997}',
+                email=f'client{i}@{BENCH_EMAIL_DOMAIN}', phone_number=f'0917{i:07d}')
+         for i in range(clients)),
+        batch_size=batch_size,
+    )
+    client_ids = list(
+        Client.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}').values_list('client_id', flat=True)
+    )
+
+    stdout.write(f'Seeding {len(client_ids) * cases_per_client} cases...\n')
+    statuses = [choice for choice, _ in Case.STATUS_CHOICES]
+    priorities = [choice for choice, _ in Case.PRIORITY_CHOICES]
+    Case.objects.bulk_create(
+        (Case(client_id=client_id, case_title=f'Bench case {client_id}-{n}',
+              status=rng.choice(statuses), priority=rng.choice(priorities),
+              lawyer_assigned=rng.choice(LAWYERS))
+         for client_id in client_ids for n in range(cases_per_client)),
+        batch_size=batch_size,
+    )
+    case_ids = list(
+        Case.objects.filter(client_id__in=client_ids).values_list('case_id', flat=True).iterator()
+    )
+
+    stdout.write(f'Seeding {len(case_ids) * hearings_per_case} hearings...\n')
+    hearing_statuses = [choice for choice, _ in Hearing.STATUS_CHOICES]
+
+    def make_hearing(case_id):
+        hearing = Hearing(case_id=case_id, status=rng.choice(hearing_statuses),
+                          hearing_date=now + timedelta(hours=rng.randint(-24 * 365, 24 * 365)))
+        hearing.set_ends_at()  # bulk_create skips save(), which normally sets it
+        return hearing
+
+    Hearing.objects.bulk_create(
+        (make_hearing(case_id) for case_id in case_ids for n in range(hearings_per_case)),
+        batch_size=batch_size,
+    )
+
+    stdout.write(f'Seeding {users} users with {notifications_per_user} notifications each...\n')
+    profiles = []
+    for i in range(users):
+        user, _ = User.objects.get_or_create(
+            username=f'bench-{i}', defaults={'email': f'bench-{i}@{BENCH_EMAIL_DOMAIN}'}
+        )
+        profile, _ = UserProfile.objects.get_or_create(django_user=user)
+        profiles.append(profile)
+    Notification.objects.bulk_create(
+        (Notification(user=profile, title=f'Bench notification {n}', is_read=rng.random() < 0.9)
+         for profile in profiles for n in range(notifications_per_user)),
+        batch_size=batch_size,
+    )
+
+
+def cleanup(stdout=sys.stdout):
+    from django.contrib.auth.models import User
+    from core.models import Client
+
+    deleted, _ = Client.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}').delete()
+    stdout.write(f'Removed {deleted} seeded client/case/hearing rows\n')
+    deleted, _ = User.objects.filter(username__startswith='bench-').delete()
+    stdout.write(f'Removed {deleted} seeded user/profile/notification rows\n')
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Rows per second for the client, case and hearing list payloads, built the
+old way (model instances through the ModelSerializer, rendered with DRF's
+JSONRenderer) and the new way (``.values()`` rows through the Fast*
+serializers, rendered with ORJSONRenderer).
+
+The newest ``--rows`` rows of each table are used and each stage is timed
+separately, best of ``--repeat`` runs. "fetch" covers the query plus
+building the rows, "serialize" the row-to-dict step and "render" the JSON
+encoding. Both rendered payloads are compared byte for byte, so a shape
+difference fails the run.
+
+    python benchmarks/serializer_throughput.py --seed --clients 10000
+    python benchmarks/serializer_throughput.py --rows 5000 --repeat 10
+    python benchmarks/serializer_throughput.py --cleanup
+"""
+import argparse
+import time
+
+from seed import cleanup, seed, setup_django
+
+setup_django()
+
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer, orjson
+from api.serializers import (
+    CaseSerializer, ClientSerializer, FastCaseSerializer, FastClientSerializer, FastHearingSerializer,
+    HearingSerializer,
+)
+from core.models import Client, Case, Hearing
+
+TARGETS = [
+    ('clients', Client.objects.all(), ClientSerializer, FastClientSerializer),
+    ('cases', Case.objects.with_client_name(), CaseSerializer, FastCaseSerializer),
+    ('hearings', Hearing.objects.with_case_details(), HearingSerializer, FastHearingSerializer),
+]
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def measure(name, queryset, serializer_class, fast_class, rows, repeat):
+    queryset = queryset.order_by('-created_at', '-pk')[:rows]
+    stages = {
+        'DRF': (
+            lambda: list(queryset.all()),
+            lambda objects: serializer_class(objects, many=True).data,
+            JSONRenderer().render,
+        ),
+        'fast': (
+            lambda: list(fast_class.get_values(queryset)),
+            lambda values: fast_class(values).data,
+            ORJSONRenderer().render,
+        ),
+    }
+    results = {}
+    for label, (fetch, serialize, render) in stages.items():
+        fetch_time, objects = best_of(repeat, fetch)
+        serialize_time, data = best_of(repeat, lambda: serialize(objects))
+        render_time, body = best_of(repeat, lambda: render(data))
+        results[label] = (len(objects), fetch_time, serialize_time, render_time, body)
+
+    count = results['DRF'][0]
+    if not count:
+        print(f'{name:>8}: no rows, run with --seed first')
+        return
+    print(f'\n{name} ({count} rows, {len(results["DRF"][4]) / 1024:,.0f} KiB)')
+    print(f'{"":>6}  {"fetch":>12}  {"serialize":>12}  {"render":>12}  {"total":>12}')
+    for label, (_, *timings, _) in results.items():
+        per_second = [f'{count / timing:>12,.0f}' for timing in (*timings, sum(timings))]
+        print(f'{label:>6}  {"  ".join(per_second)}  rows/s')
+    speedups = [old / new for old, new in zip(results['DRF'][1:4], results['fast'][1:4])]
+    speedups.append(sum(results['DRF'][1:4]) / sum(results['fast'][1:4]))
+    print(f'{"gain":>6}  {"  ".join(f"{speedup:>11.1f}x" for speedup in speedups)}')
+    if results['DRF'][4] != results['fast'][4]:
+        raise SystemExit(f'{name}: the fast payload differs from the DRF payload')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000, help='rows per table')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', action='store_true', help='insert a synthetic dataset first')
+    parser.add_argument('--clients', type=int, default=10000)
+    parser.add_argument('--cleanup', action='store_true', help='remove the synthetic dataset and exit')
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed:
+        seed(clients=args.clients)
+    if orjson is None:
+        print('orjson is not installed; ORJSONRenderer falls back to JSONRenderer')
+    for name, queryset, serializer_class, fast_class in TARGETS:
+        measure(name, queryset, serializer_class, fast_class, args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
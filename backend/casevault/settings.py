@@ -10,8 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import copy
+import os
+import sys
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -37,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -46,6 +52,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'api.compression.compression_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,6 +60,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.audit.audit_context_middleware',
+    'api.replicas.replica_middleware',
 ]
 
 ROOT_URLCONF = 'casevault.urls'
@@ -89,6 +98,48 @@ DATABASES = {
     }
 }
 
+# How requests get a database connection (DB_POOL_MODE):
+#   persistent - each worker thread keeps its connection for DB_CONN_MAX_AGE
+#                seconds and checks it before reuse (the default)
+#   pool       - a psycopg 3 pool per process, DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE
+#                connections, waiting up to DB_POOL_TIMEOUT seconds for one
+#                (requires `pip install "psycopg[binary,pool]"`)
+#   none       - a new connection for every request
+DB_POOL_MODE = os.environ.get('DB_POOL_MODE', 'persistent')
+if DB_POOL_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_POOL_MODE == 'pool':
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+elif DB_POOL_MODE != 'none':
+    raise ImproperlyConfigured(f"DB_POOL_MODE must be 'persistent', 'pool' or 'none', not {DB_POOL_MODE!r}")
+
+# Read replicas for the list, detail, search, report and export GETs (see
+# api/replicas.py). DB_REPLICA_HOSTS is a comma-separated list of host or
+# host:port; each becomes a 'replicaN' alias with the default database's
+# other settings. Tests read replicas through the default test database.
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+    host, _, port = host.strip().partition(':')
+    alias = f'replica{index}'
+    DATABASES[alias] = copy.deepcopy(DATABASES['default'])
+    DATABASES[alias].update({'HOST': host, 'PORT': port or DATABASES['default']['PORT'], 'TEST': {'MIRROR': 'default'}})
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+# After a user changes something, their reads stay on the primary this long
+READ_REPLICA_STICKY_SECONDS = 10
+# Reads of a table stay on the primary this long after it is written, and
+# replicas further behind than this are skipped
+READ_REPLICA_MAX_LAG = 5
+# How often each worker rechecks a replica's connection and lag
+READ_REPLICA_CHECK_INTERVAL = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -131,10 +182,23 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# Use email as username field
+# Use email as username field. EmailBackend also accepts usernames, so it
+# replaces ModelBackend rather than falling through to it.
 AUTHENTICATION_BACKENDS = [
     'api.backends.EmailBackend',
-    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Every /api/token/ login runs the password hasher once; its cost dominates
+# login throughput. PASSWORD_HASH_ITERATIONS overrides the PBKDF2 iteration
+# count (unset keeps Django's default; lowering it weakens stored hashes).
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 0)) or None
+
+PASSWORD_HASHERS = [
+    'api.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
 ]
 
 # CORS settings
@@ -151,16 +215,134 @@ CORS_ALLOW_ALL_ORIGINS = True  # For development only
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Same output as DRF's JSONRenderer, encoded with orjson when installed
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.ORJSONRenderer',
     ],
 }
 
+# Cache used for dashboard stats, table versions and cached API responses.
+# LocMemCache is per process: set REDIS_URL (requires the redis package) when
+# running more than one worker so ETags and invalidation are shared.
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'casevault',
+        }
+    }
+
+# Response compression (api/compression.py). The client's preferred
+# encoding wins, ties go to the first in COMPRESSION_ENCODINGS. 'zstd' needs
+# the zstandard package and 'br' the brotli package; gzip always works.
+COMPRESSION_ENCODINGS = ('zstd', 'br', 'gzip')
+COMPRESSION_LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+# Smaller bodies save little and can even grow, so they are sent as is
+COMPRESSION_MIN_SIZE = 1024
+# No text/html: admin pages carry CSRF tokens (BREACH), and no SSE streams
+COMPRESSION_CONTENT_TYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/calendar')
+
+# Serialized list/detail payloads are cached under their ETag
+API_RESPONSE_CACHE_TIMEOUT = 300
+
+# Keyset pagination for list endpoints, opt-in via ?cursor= or ?page_size=
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+
+# Seconds CachedJWTAuthentication keeps a token's user (and profile) cached.
+# Saves and deletes expire it immediately; this bounds writes that skip signals.
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Serve the client/case/hearing list and detail GETs from the async views in
+# api/async_views.py. Only useful under an ASGI server (casevault.asgi).
+API_ASYNC_VIEWS = os.environ.get('API_ASYNC_VIEWS', '').lower() in ('1', 'true', 'yes')
+
+# /api/notifications/stream/ (SSE): seconds between keep-alive comments and
+# events buffered per open stream before new ones are dropped. Set
+# NOTIFICATIONS_PG_CHANNEL to fan notifications out between processes with
+# PostgreSQL LISTEN/NOTIFY; otherwise only the creating process's streams see them.
+NOTIFICATION_STREAM_HEARTBEAT = 25
+NOTIFICATION_QUEUE_SIZE = 100
+NOTIFICATIONS_PG_CHANNEL = os.environ.get('NOTIFICATIONS_PG_CHANNEL')
+
+# Client/Case/Hearing changes are written to admin_logs by a background
+# thread in batches (api/audit.py). A full queue blocks the request for up to
+# AUDIT_QUEUE_TIMEOUT seconds, then the entry is written synchronously.
+# Tests write synchronously: the writer thread's connection cannot see a
+# TestCase's transaction and would keep the test database open.
+AUDIT_ENABLED = True
+AUDIT_ASYNC = sys.argv[1:2] != ['test']
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL = 1.0
+AUDIT_QUEUE_TIMEOUT = 2.0
+
+# admin_logs and notifications are partitioned by month on created_at
+# (PostgreSQL). `manage.py manage_partitions` keeps PARTITION_MONTHS_AHEAD
+# future months created and drops or detaches (archives) older partitions.
+PARTITIONED_TABLES = {
+    'admin_logs': {'retention_months': 24, 'expire': 'detach'},
+    'notifications': {'retention_months': 12, 'expire': 'drop'},
+}
+PARTITION_MONTHS_AHEAD = 3
+
+# /api/search/ pages by offset, so cap how deep a client can page
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_RESULTS = 1000
+
+# Bulk endpoints (/api/<entity>/bulk/): request size cap and rows per INSERT/UPDATE
+BULK_MAX_ITEMS = 5000
+BULK_BATCH_SIZE = 1000
+# Large bulk payloads exceed Django's 2.5 MB default
+DATA_UPLOAD_MAX_MEMORY_SIZE = 25 * 1024 * 1024
+
+# /api/export/<entity>/: rows fetched per server-side cursor round trip, and
+# rows joined into each chunk written to the client
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_ROWS_PER_CHUNK = 500
+
+# /api/hearings/calendar/: widest start..end window a request may ask for.
+# .ics feeds cover hearings from HEARING_FEED_PAST_DAYS ago onwards; rendered
+# feeds and events are cached, keyed by the rows' updated_at.
+HEARING_CALENDAR_MAX_DAYS = 366
+HEARING_FEED_PAST_DAYS = 90
+HEARING_FEED_CACHE_TIMEOUT = 24 * 60 * 60
+
+# manage.py run_scheduler: minutes before a hearing its lawyer is notified,
+# seconds between ticks, and hearings handled per page
+HEARING_REMINDER_LEAD_MINUTES = (24 * 60, 60)
+SCHEDULER_INTERVAL = 60
+HEARING_REMINDER_BATCH_SIZE = 1000
+
+# /api/sync/: rows per table per response, how far each watermark is moved
+# back to catch rows committed late, and days deletions are remembered
+# (older sync tokens get 410 and must start a full sync)
+SYNC_PAGE_SIZE = 1000
+SYNC_OVERLAP_SECONDS = 30
+SYNC_TOMBSTONE_DAYS = 30
+
+# manage.py import_casevault: rows validated and inserted per transaction
+IMPORT_BATCH_SIZE = 2000
+
+# /api/dashboard/stats/ is cached and expired by Client/Case/Hearing signals;
+# the timeout only bounds how stale the "upcoming hearings" window can get.
+DASHBOARD_STATS_TIMEOUT = 60
+DASHBOARD_UPCOMING_HEARINGS = 10
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
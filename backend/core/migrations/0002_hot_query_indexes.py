@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adminlog',
+            index=models.Index(fields=['-created_at'], name='admin_logs_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminlog',
+            index=models.Index(fields=['table_name', '-created_at'], name='admin_logs_table_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['-created_at', '-case_id'], name='cases_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['status', 'priority'], name='cases_status_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['lawyer_assigned', 'status'], name='cases_lawyer_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['lawyer_assigned', '-created_at'], name='cases_active_lawyer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['-created_at', '-client_id'], name='clients_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['last_name', 'first_name'], name='clients_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hearing',
+            index=models.Index(fields=['-hearing_date', '-hearing_id'], name='hearings_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hearing',
+            index=models.Index(condition=models.Q(('status', 'scheduled')), fields=['hearing_date'], name='hearings_upcoming_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', '-created_at'], name='notifications_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['user', '-created_at'], name='notifications_unread_idx'),
+        ),
+    ]
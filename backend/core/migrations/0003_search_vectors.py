@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:07
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Each table keeps search_vector up to date with a BEFORE INSERT/UPDATE
+# trigger, so bulk_create/bulk_update and raw SQL writes stay searchable.
+# Weights: A = names/titles, B = contact details/judge, C/D = free text.
+SEARCH_TRIGGERS = {
+    'clients': {
+        'columns': ['first_name', 'middle_name', 'last_name', 'email', 'phone_number', 'opposing_parties', 'notes'],
+        'vector': """
+            setweight(to_tsvector('english', coalesce(NEW.first_name, '') || ' ' || coalesce(NEW.middle_name, '') || ' ' || coalesce(NEW.last_name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.email, '') || ' ' || coalesce(NEW.phone_number, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.opposing_parties, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(NEW.notes, '')), 'D')
+        """,
+    },
+    'cases': {
+        'columns': ['case_title', 'case_type', 'description'],
+        'vector': """
+            setweight(to_tsvector('english', coalesce(NEW.case_title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.case_type, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C')
+        """,
+    },
+    'hearings': {
+        'columns': ['judge_name', 'location', 'hearing_type', 'notes'],
+        'vector': """
+            setweight(to_tsvector('english', coalesce(NEW.judge_name, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.location, '') || ' ' || coalesce(NEW.hearing_type, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(NEW.notes, '')), 'D')
+        """,
+    },
+}
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, spec in SEARCH_TRIGGERS.items():
+        schema_editor.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {spec['vector']};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {', '.join(spec['columns'])} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update();
+        """)
+        # Touch one indexed column so the trigger backfills existing rows
+        first_column = spec['columns'][0]
+        schema_editor.execute(f'UPDATE {table} SET {first_column} = {first_column}')
+        schema_editor.execute(
+            f'CREATE INDEX {table}_search_vector_idx ON {table} USING gin (search_vector)'
+        )
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SEARCH_TRIGGERS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_vector_idx')
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}')
+        schema_editor.execute(f'DROP FUNCTION IF EXISTS {table}_search_vector_update()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='hearing',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:05
+
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+# admin_logs and notifications become tables range-partitioned by month on
+# created_at. PostgreSQL requires the partition key in the primary key, so
+# the PK becomes (id, created_at); the id column keeps its own sequence.
+# Rows outside every monthly partition land in <table>_default.
+# New partitions and retention are handled by `manage.py manage_partitions`.
+PARTITIONED_TABLES = {
+    'admin_logs': 'log_id',
+    'notifications': 'notification_id',
+}
+MONTHS_AHEAD = 3
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def fetch(cursor, sql, params=None):
+    cursor.execute(sql, params)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def rebuild(schema_editor, table, pk, partitioned):
+    with schema_editor.connection.cursor() as cursor:
+        index_defs = fetch(cursor, """
+            SELECT indexdef FROM pg_indexes
+            WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s
+        """, [table, f'{table}_pkey'])
+        foreign_keys = [
+            f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}'
+            for name, definition in (
+                row.split('\t') for row in fetch(cursor, """
+                    SELECT conname || chr(9) || pg_get_constraintdef(oid) FROM pg_constraint
+                    WHERE conrelid = %s::regclass AND contype = 'f'
+                """, [table])
+            )
+        ]
+        first_month = fetch(cursor, f"SELECT date_trunc('month', min(created_at) AT TIME ZONE 'UTC') FROM {table}")[0]
+
+    new_table = f'{table}_rebuilt'
+    sequence = f'{table}_{pk}_seq'
+    schema_editor.execute(f'CREATE SEQUENCE {sequence}_rebuilt')
+    if partitioned:
+        schema_editor.execute(f'CREATE TABLE {new_table} (LIKE {table}) PARTITION BY RANGE (created_at)')
+        schema_editor.execute(f'CREATE TABLE {table}_default PARTITION OF {new_table} DEFAULT')
+        now = datetime.now(timezone.utc)
+        month = (first_month or now).replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=timezone.utc)
+        last = add_months(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0), MONTHS_AHEAD)
+        while month <= last:
+            schema_editor.execute(
+                f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {new_table} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00+00') TO ('{add_months(month, 1):%Y-%m-%d} 00:00+00')"
+            )
+            month = add_months(month, 1)
+        primary_key = f'{pk}, created_at'
+    else:
+        schema_editor.execute(f'CREATE TABLE {new_table} (LIKE {table})')
+        primary_key = pk
+    schema_editor.execute(f'ALTER TABLE {new_table} ADD PRIMARY KEY ({primary_key})')
+    schema_editor.execute(f"ALTER TABLE {new_table} ALTER COLUMN {pk} SET DEFAULT nextval('{sequence}_rebuilt')")
+    schema_editor.execute(f'INSERT INTO {new_table} SELECT * FROM {table}')
+    schema_editor.execute(f"SELECT setval('{sequence}_rebuilt', COALESCE(max({pk}), 0) + 1, false) FROM {table}")
+
+    schema_editor.execute(f'DROP TABLE {table}')
+    schema_editor.execute(f'ALTER TABLE {new_table} RENAME TO {table}')
+    schema_editor.execute(f'ALTER TABLE {table} RENAME CONSTRAINT {new_table}_pkey TO {table}_pkey')
+    schema_editor.execute(f'ALTER SEQUENCE {sequence}_rebuilt RENAME TO {sequence}')
+    schema_editor.execute(f'ALTER SEQUENCE {sequence} OWNED BY {table}.{pk}')
+    for index_def in index_defs:
+        # Indexes on a partitioned table are listed as "ON ONLY <table>"
+        schema_editor.execute(index_def.replace(' ON ONLY ', ' ON '))
+    for foreign_key in foreign_keys:
+        schema_editor.execute(foreign_key)
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, pk in PARTITIONED_TABLES.items():
+        rebuild(schema_editor, table, pk, partitioned=True)
+
+
+def unpartition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, pk in PARTITIONED_TABLES.items():
+        rebuild(schema_editor, table, pk, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_search_vectors'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
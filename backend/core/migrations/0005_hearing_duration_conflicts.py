@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:40
+
+from datetime import timedelta
+
+import django.core.validators
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+# GiST indexes over (resource, tstzrange(hearing_date, ends_at)) for the
+# scheduled hearings, so a conflict check is an index probe for the resource
+# and period (the same index an EXCLUDE constraint would build). Conflicts
+# are reported by the API rather than rejected by the database because the
+# lawyer lives on cases, and an exclusion constraint cannot reach it.
+CONFLICT_INDEXES = {
+    'hearings_case_period_idx': 'case_id',
+    'hearings_judge_period_idx': 'judge_name',
+    'hearings_location_period_idx': 'location',
+}
+
+
+def backfill_ends_at(apps, schema_editor):
+    Hearing = apps.get_model('core', 'Hearing')
+    Hearing.objects.update(ends_at=models.F('hearing_date') + timedelta(minutes=60))
+
+
+def create_conflict_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, column in CONFLICT_INDEXES.items():
+        schema_editor.execute(f"""
+            CREATE INDEX {name} ON hearings USING gist ({column}, tstzrange(hearing_date, ends_at))
+            WHERE status = 'scheduled'
+        """)
+
+
+def drop_conflict_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in CONFLICT_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_partition_logs_and_notifications'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name='hearing',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=60, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddField(
+            model_name='hearing',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_ends_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='hearing',
+            name='ends_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.RunPython(create_conflict_indexes, drop_conflict_indexes),
+    ]
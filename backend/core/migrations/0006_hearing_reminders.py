@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_hearing_duration_conflicts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HearingReminder',
+            fields=[
+                ('reminder_id', models.AutoField(primary_key=True, serialize=False)),
+                ('lead_minutes', models.PositiveIntegerField()),
+                ('hearing_date', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('hearing', models.ForeignKey(db_column='hearing_id', on_delete=django.db.models.deletion.CASCADE, to='core.hearing')),
+                ('user', models.ForeignKey(db_column='user_id', on_delete=django.db.models.deletion.CASCADE, to='core.userprofile')),
+            ],
+            options={
+                'db_table': 'hearing_reminders',
+                'indexes': [models.Index(fields=['hearing_date'], name='hearing_reminders_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('hearing', 'user', 'lead_minutes', 'hearing_date'), name='hearing_reminders_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_hearing_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('tombstone_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('table_name', models.CharField(max_length=100)),
+                ('record_id', models.IntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'tombstones',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['updated_at', 'case_id'], name='cases_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['updated_at', 'client_id'], name='clients_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hearing',
+            index=models.Index(fields=['updated_at', 'hearing_id'], name='hearings_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstones_deleted_idx'),
+        ),
+    ]
@@ -1,6 +1,17 @@
-from django.db import models
+from datetime import timedelta
+
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MinValueValidator
+from django.db import connections, models
+from django.db.models import F, Func, Q, Value
+from django.db.models.functions import Concat, Greatest
 from django.contrib.auth.models import User
 
+class ClientQuerySet(models.QuerySet):
+    def with_last_modified(self):
+        return self.annotate(last_modified=F('updated_at'))
+
 class Client(models.Model):
     client_id = models.AutoField(primary_key=True)
     first_name = models.CharField(max_length=100)
@@ -18,9 +29,28 @@ class Client(models.Model):
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger, see core/migrations/0003_search_vectors.py
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
+
+    objects = ClientQuerySet.as_manager()
 
     class Meta:
         db_table = 'clients'
+        indexes = [
+            models.Index(fields=['-created_at', '-client_id'], name='clients_created_idx'),
+            models.Index(fields=['updated_at', 'client_id'], name='clients_updated_idx'),
+            models.Index(fields=['last_name', 'first_name'], name='clients_name_idx'),
+        ]
+
+class CaseQuerySet(models.QuerySet):
+    def with_client_name(self):
+        return self.annotate(
+            client_name=Concat('client__first_name', Value(' '), 'client__last_name')
+        )
+
+    # Latest change to anything a serialized case shows, used for ETags
+    def with_last_modified(self):
+        return self.annotate(last_modified=Greatest('updated_at', 'client__updated_at'))
 
 class Case(models.Model):
     STATUS_CHOICES = [
@@ -48,9 +78,23 @@ class Case(models.Model):
     lawyer_assigned = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
+
+    objects = CaseQuerySet.as_manager()
 
     class Meta:
         db_table = 'cases'
+        indexes = [
+            models.Index(fields=['-created_at', '-case_id'], name='cases_created_idx'),
+            models.Index(fields=['updated_at', 'case_id'], name='cases_updated_idx'),
+            models.Index(fields=['status', 'priority'], name='cases_status_priority_idx'),
+            models.Index(fields=['lawyer_assigned', 'status'], name='cases_lawyer_status_idx'),
+            models.Index(
+                fields=['lawyer_assigned', '-created_at'],
+                name='cases_active_lawyer_idx',
+                condition=Q(status='active'),
+            ),
+        ]
 
 class UserProfile(models.Model):
     ROLE_CHOICES = [
@@ -71,6 +115,48 @@ class UserProfile(models.Model):
     class Meta:
         db_table = 'users'
 
+class HearingQuerySet(models.QuerySet):
+    def with_case_details(self):
+        return self.annotate(
+            case_title=F('case__case_title'),
+            client_name=Concat('case__client__first_name', Value(' '), 'case__client__last_name'),
+        )
+
+    def with_last_modified(self):
+        return self.annotate(
+            last_modified=Greatest('updated_at', 'case__updated_at', 'case__client__updated_at')
+        )
+
+    def overlapping(self, start, end):
+        """Hearings whose [hearing_date, ends_at) period overlaps [start, end)."""
+        if connections[self.db].vendor == 'postgresql':
+            # Same expression as the GiST indexes in migration 0005
+            return self.annotate(period=TsTzRange('hearing_date', 'ends_at')).filter(period__overlap=(start, end))
+        return self.filter(hearing_date__lt=end, ends_at__gt=start)
+
+    def conflicting(self, start, end, lawyer=None, judge_name=None, location=None, exclude_pk=None):
+        """
+        Scheduled hearings in the same period that share the lawyer (through
+        Case.lawyer_assigned), the judge or the location.
+        """
+        resources = Q()
+        if lawyer:
+            resources |= Q(case_id__in=Case.objects.filter(lawyer_assigned=lawyer).values('case_id'))
+        if judge_name:
+            resources |= Q(judge_name=judge_name)
+        if location:
+            resources |= Q(location=location)
+        if not resources:
+            return self.none()
+        queryset = self.filter(resources, status='scheduled').overlapping(start, end)
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        return queryset
+
+class TsTzRange(Func):
+    function = 'TSTZRANGE'
+    output_field = DateTimeRangeField()
+
 class Hearing(models.Model):
     STATUS_CHOICES = [
         ('scheduled', 'Scheduled'),
@@ -82,6 +168,10 @@ class Hearing(models.Model):
     hearing_id = models.AutoField(primary_key=True)
     case = models.ForeignKey(Case, on_delete=models.CASCADE, db_column='case_id')
     hearing_date = models.DateTimeField()
+    duration_minutes = models.PositiveIntegerField(default=60, validators=[MinValueValidator(1)])
+    # hearing_date + duration_minutes, kept by save() and the bulk writer so
+    # the period can be indexed (timestamptz + interval is not immutable)
+    ends_at = models.DateTimeField(editable=False)
     hearing_type = models.CharField(max_length=100, blank=True, null=True)
     location = models.CharField(max_length=255, blank=True, null=True)
     judge_name = models.CharField(max_length=255, blank=True, null=True)
@@ -89,9 +179,56 @@ class Hearing(models.Model):
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='scheduled')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(blank=True, null=True, editable=False)
+
+    objects = HearingQuerySet.as_manager()
 
     class Meta:
         db_table = 'hearings'
+        indexes = [
+            models.Index(fields=['-hearing_date', '-hearing_id'], name='hearings_date_idx'),
+            models.Index(fields=['updated_at', 'hearing_id'], name='hearings_updated_idx'),
+            models.Index(
+                fields=['hearing_date'],
+                name='hearings_upcoming_idx',
+                condition=Q(status='scheduled'),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.set_ends_at()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'hearing_date', 'duration_minutes'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'ends_at'}
+        super().save(*args, **kwargs)
+
+    def set_ends_at(self):
+        self.ends_at = self.hearing_date + timedelta(minutes=self.duration_minutes)
+
+class HearingReminder(models.Model):
+    """
+    One row per reminder sent by `manage.py run_scheduler`, so a hearing is
+    never announced twice for the same lead time. Kept outside the
+    partitioned notifications table, whose unique keys must include
+    created_at. A rescheduled hearing gets new reminders.
+    """
+    reminder_id = models.AutoField(primary_key=True)
+    hearing = models.ForeignKey(Hearing, on_delete=models.CASCADE, db_column='hearing_id')
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, db_column='user_id')
+    lead_minutes = models.PositiveIntegerField()
+    hearing_date = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'hearing_reminders'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['hearing', 'user', 'lead_minutes', 'hearing_date'], name='hearing_reminders_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['hearing_date'], name='hearing_reminders_date_idx'),
+        ]
 
 class Notification(models.Model):
     TYPE_CHOICES = [
@@ -111,6 +248,27 @@ class Notification(models.Model):
 
     class Meta:
         db_table = 'notifications'
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at'], name='notifications_user_idx'),
+            models.Index(
+                fields=['user', '-created_at'],
+                name='notifications_unread_idx',
+                condition=Q(is_read=False),
+            ),
+        ]
+
+class Tombstone(models.Model):
+    """Deleted client/case/hearing ids, served by /api/sync/ to offline copies."""
+    tombstone_id = models.BigAutoField(primary_key=True)
+    table_name = models.CharField(max_length=100)
+    record_id = models.IntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'tombstones'
+        indexes = [
+            models.Index(fields=['deleted_at'], name='tombstones_deleted_idx'),
+        ]
 
 class AdminLog(models.Model):
     log_id = models.AutoField(primary_key=True)
@@ -126,3 +284,7 @@ class AdminLog(models.Model):
 
     class Meta:
         db_table = 'admin_logs'
+        indexes = [
+            models.Index(fields=['-created_at'], name='admin_logs_created_idx'),
+            models.Index(fields=['table_name', '-created_at'], name='admin_logs_table_idx'),
+        ]